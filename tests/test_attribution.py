@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from uber_valuation_v1 import UberValuation
+from uber_valuation_v2_ceo_mode import UberCEOInterview
+from valuation_attribution import attribute, exact_shapley, sampled_shapley, waterfall
+
+CHANGES = {
+    'v1': (UberValuation, {'ebitda_margin_2027': 14},
+           {'ebitda_margin_2027': 19, 'ebitda_multiple': 18, 'regulatory_cost_annual': 1.2,
+            'revenue_growth_2025_2027': 15}),
+    'v2': (UberCEOInterview, {'ebitda_margin_current_quarter': 10},
+           {'ebitda_margin_current_quarter': 14, 'revenue_last_week': 800, 'advertising_margin': 55,
+            'monthly_active_riders_growth': 2.5}),
+}
+
+
+def quadratic(d, seed=0):
+    """
+    Linear plus pairwise terms, the two states, and its Shapley split
+    (which paired random orders give exactly)
+    """
+    rng = np.random.default_rng(seed)
+    b, q = rng.normal(size=d), rng.normal(size=(d, d))
+    x_a, x_b = rng.normal(size=d), rng.normal(size=d)
+    pair = (q + q.T) / 2
+    np.fill_diagonal(pair, 0)
+    shapley = (b * (x_b - x_a) + np.diag(q) * (x_b ** 2 - x_a ** 2)
+               + (x_b - x_a) * (pair @ (x_a + x_b)))
+    return (lambda x: x @ b + np.einsum('ni,ij,nj->n', x, q, x)), x_a, x_b, shapley
+
+
+def fair_value(model_class, answers):
+    model = model_class()
+    model.cache = None
+    return model.calculate_fair_value(dict(answers))['fair_value_per_share']
+
+
+@pytest.mark.parametrize('model_key', sorted(CHANGES))
+@pytest.mark.parametrize('method', ['shapley', 'waterfall'])
+def test_contributions_add_up_to_the_change(model_key, method):
+    model_class, before, after = CHANGES[model_key]
+    result = attribute(model_key, model_class(), before, after, method)
+    assert result['method'] == ('exact shapley' if method == 'shapley' else 'waterfall')
+    assert sum(c['contribution'] for c in result['contributions']) == pytest.approx(result['total'], abs=1e-9)
+    assert result['before'] == pytest.approx(fair_value(model_class, before), abs=0.005)
+    assert result['after'] == pytest.approx(fair_value(model_class, after), abs=0.005)
+
+
+@pytest.mark.parametrize('model_key', sorted(CHANGES))
+def test_sampled_shapley_stays_within_budget(model_key):
+    model_class, before, after = CHANGES[model_key]
+    result = attribute(model_key, model_class(), before, after, budget=500, exact_limit=0, seed=0)
+    assert result['method'] == 'sampled shapley'
+    assert result['evaluations'] <= 500
+    assert sum(c['contribution'] for c in result['contributions']) == pytest.approx(result['total'], abs=1e-9)
+
+
+def test_exact_shapley_matches_closed_form():
+    evaluate, x_a, x_b, shapley = quadratic(8)
+    assert np.allclose(exact_shapley(evaluate, x_a, x_b)['contributions'], shapley)
+
+
+def test_sampled_shapley_is_exact_for_pairwise_interactions():
+    evaluate, x_a, x_b, shapley = quadratic(10)
+    assert np.allclose(sampled_shapley(evaluate, x_a, x_b, budget=200, seed=3)['contributions'], shapley)
+
+    # 30 inputs: 2^30 coalitions for exact Shapley, 2,000 evaluations sampled
+    evaluate, x_a, x_b, shapley = quadratic(30, seed=1)
+    result = sampled_shapley(evaluate, x_a, x_b, budget=2_000, seed=0)
+    assert result['evaluations'] <= 2_000
+    assert np.allclose(result['contributions'], shapley)
+    assert result['contributions'].sum() == pytest.approx(result['after'] - result['before'])
+
+
+def test_waterfall_order_changes_the_split_not_the_total():
+    evaluate, x_a, x_b, _ = quadratic(6)
+    forward = waterfall(evaluate, x_a, x_b)
+    backward = waterfall(evaluate, x_a, x_b, order=range(5, -1, -1))
+    assert forward['contributions'].sum() == pytest.approx(backward['contributions'].sum())
+    assert not np.allclose(forward['contributions'], backward['contributions'])
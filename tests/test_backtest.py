@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from uber_valuation_v2_ceo_mode import valuation_action
+from valuation_backtest import ACTION_EXPOSURE, BANDS, PIT_BINS, replay, run_backtest
+from valuation_portfolio import DEFAULT_POSITION, Portfolio
+
+
+def scalar_replay(fair_values, scenarios, active, prices, horizon, band):
+    """replay() one day at a time, with the interview's own valuation_action"""
+    totals = {'days': 0, 'scored_days': 0, 'buys': 0, 'trims': 0, 'hits': 0, 'direction_hits': 0,
+              'pnl': 0.0, 'hold_pnl': 0.0, 'covered': {level: 0 for level in BANDS}, 'pit': [0] * PIT_BINS}
+    for day, save in enumerate(active):
+        if save < 0:
+            continue
+        fair, price = fair_values[save], prices[day]
+        action = valuation_action(fair, price, band)
+        if day + 1 < len(prices):
+            daily = prices[day + 1] / price - 1
+            totals['days'] += 1
+            totals['pnl'] += DEFAULT_POSITION * ACTION_EXPOSURE[action] * daily
+            totals['hold_pnl'] += DEFAULT_POSITION * daily
+        if day + horizon < len(prices):
+            later = prices[day + horizon]
+            change = later / price - 1
+            totals['scored_days'] += 1
+            totals['buys'] += action == 'buy'
+            totals['trims'] += action == 'trim'
+            totals['hits'] += (action == 'buy' and change > 0) or (action == 'trim' and change < 0)
+            totals['direction_hits'] += np.sign(fair - price) == np.sign(change)
+            pit = sum(value < later for value in scenarios[:, save]) / len(scenarios)
+            for level in BANDS:
+                tail = (1 - level / 100) / 2
+                totals['covered'][level] += tail <= pit <= 1 - tail
+            totals['pit'][min(int(pit * PIT_BINS), PIT_BINS - 1)] += 1
+    return totals
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_replay_matches_a_day_by_day_loop(seed):
+    rng = np.random.default_rng(seed)
+    days, saves = 400, 6
+    prices = 75 * np.exp(np.cumsum(rng.normal(0, 0.02, days)))
+    fair_values = rng.uniform(40, 110, saves)
+    scenarios = fair_values + rng.normal(0, 15, (200, saves))
+    saved_on = np.sort(rng.choice(days, saves, replace=False))
+    active = np.searchsorted(saved_on, np.arange(days), side='right') - 1
+
+    vectorized = replay(fair_values, scenarios, active, prices, horizon=21, band=10)
+    expected = scalar_replay(fair_values, scenarios, active, prices, horizon=21, band=10)
+    for key in ('pnl', 'hold_pnl'):
+        assert vectorized.pop(key) == pytest.approx(expected.pop(key))
+    assert vectorized == expected
+
+
+def test_replay_before_the_first_save_is_empty():
+    totals = replay(np.array([80.0]), np.ones((10, 1)), np.full(50, -1), np.full(50, 75.0))
+    assert totals['days'] == totals['scored_days'] == 0
+
+
+def test_companies_default_does_not_depend_on_the_working_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert 'UBER' in Portfolio(scenarios=10).companies
+    with pytest.raises(ValueError, match='no such companies directory'):
+        Portfolio(str(tmp_path / 'missing'), scenarios=10)
+    with pytest.raises(ValueError, match='no such companies directory'):
+        run_backtest(str(tmp_path / 'sessions.db'), {}, companies=str(tmp_path / 'missing'))
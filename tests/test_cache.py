@@ -0,0 +1,93 @@
+from uber_valuation_v1 import UberValuation
+from uber_valuation_v2_ceo_mode import MODEL_DEFAULTS, UberCEOInterview
+from valuation_assumptions import Assumptions
+from valuation_cache import ValuationCache
+
+
+def cached(model):
+    model.cache = ValuationCache()
+    return model
+
+
+def test_hits_return_the_computed_result():
+    for model, answers in ((UberValuation(), {'ebitda_margin_2027': 17}),
+                           (UberCEOInterview(), {'ebitda_margin_current_quarter': 13})):
+        expected = model.calculate_fair_value(Assumptions(answers))   # model.cache is the shared one
+        model = cached(model)
+        first = model.calculate_fair_value(Assumptions(answers))
+        assert model.calculate_fair_value(Assumptions(answers)) == first == expected
+        assert model.calculate_fair_value(dict(answers)) == expected
+        assert model.cache.hits == 2
+
+
+def test_key_ignores_answer_order_and_default_answers():
+    for model, answers in ((UberValuation(), {'ebitda_margin_2027': 17, 'ebitda_multiple': 16}),
+                           (UberCEOInterview(), {'ebitda_margin_current_quarter': 13, 'advertising_margin': 80})):
+        model = cached(model)
+        first = model.calculate_fair_value(dict(answers))
+        assert model.calculate_fair_value(dict(reversed(list(answers.items())))) == first
+        assert model.cache.hits == 1
+
+        defaults = model.calculate_fair_value(Assumptions())
+        param = next(iter(answers))
+        default = model.consensus[param] if isinstance(model, UberValuation) else MODEL_DEFAULTS[param]
+        assert model.calculate_fair_value(Assumptions({param: default})) == defaults
+        assert model.cache.hits == 2
+
+
+def test_spec_interview_keys_on_resolved_inputs():
+    interview = cached(UberCEOInterview())
+    interview.load_spec()
+    base = interview.calculate_fair_value(Assumptions())
+    assert interview.calculate_fair_value(Assumptions({'advertising_margin': 85})) == base
+    assert interview.calculate_fair_value(Assumptions({'not_a_model_input': 1})) == base
+    assert interview.cache.hits == 2
+
+
+def test_callers_get_copies_of_cached_results():
+    for model in (cached(UberValuation()), cached(UberCEOInterview())):
+        first = model.calculate_fair_value()
+        expected = dict(first)
+        first['fair_value_per_share'] = -1
+        second = model.calculate_fair_value()
+        assert second == expected
+        second.clear()
+        assert model.calculate_fair_value() == expected
+        assert model.cache.hits == 2
+
+
+def test_changed_facts_or_consensus_miss():
+    model = cached(UberValuation())
+    before = model.calculate_fair_value()
+    model.consensus = dict(model.consensus, ebitda_margin_2027=20)
+    assert model.calculate_fair_value() != before
+    model.net_debt = 50.0
+    model.calculate_fair_value()
+    assert model.cache.hits == 0
+
+    interview = cached(UberCEOInterview())
+    interview.calculate_fair_value()
+    interview.market_price = 90
+    interview.calculate_fair_value()
+    assert interview.cache.hits == 0
+
+
+def test_answers_changed_in_place_miss():
+    interview = cached(UberCEOInterview())
+    interview.answers['ebitda_margin_current_quarter'] = 12
+    low = interview.calculate_fair_value()
+    interview.answers['ebitda_margin_current_quarter'] = 16
+    assert interview.calculate_fair_value()['fair_value_per_share'] > low['fair_value_per_share']
+
+
+def test_lru_evicts_oldest_and_ttl_expires():
+    now = [0.0]
+    cache = ValuationCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+    assert cache.get('b') is None and cache.get('a') == 1
+    now[0] = 11
+    assert cache.get('a') is None
+    assert cache.stats()['evictions'] == 1 and cache.stats()['expirations'] == 1
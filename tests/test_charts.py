@@ -0,0 +1,66 @@
+import struct
+import zlib
+
+import pytest
+
+from uber_valuation_v1 import UberValuation
+from uber_valuation_v2_ceo_mode import UberCEOInterview
+from valuation_charts import export, heatmaps, tornado
+
+CASES = [
+    ('v1', UberValuation, ('ebitda_margin_2027', 'ebitda_multiple')),
+    ('v2', UberCEOInterview, ('ebitda_margin_current_quarter', 'monthly_active_riders_growth')),
+]
+
+
+def scalar(model, answers):
+    return model.calculate_fair_value(model.snapshot().with_answers(answers))['fair_value_per_share']
+
+
+@pytest.mark.parametrize('model_key, make, pair', CASES)
+def test_grid_cells_are_scalar_fair_values(model_key, make, pair):
+    model = make()
+    model.cache = None
+    chart, = heatmaps(model_key, model, [pair], points=21)
+    x, y = pair
+    for i, j in [(0, 0), (20, 20), (3, 17), (10, 10), (15, 4)]:
+        expected = scalar(model, {x: chart['x_values'][j], y: chart['y_values'][i]})
+        assert chart['grid'][i, j] == pytest.approx(expected, abs=0.0051)
+
+
+@pytest.mark.parametrize('model_key, make, pair', CASES)
+def test_tornado_ends_are_scalar_fair_values(model_key, make, pair):
+    model = make()
+    result = tornado(model_key, model, list(pair))
+    for row in result['rows']:
+        assert row['low_fv'] == pytest.approx(scalar(model, {row['input']: row['low_input']}), abs=0.0051)
+        assert row['high_fv'] == pytest.approx(scalar(model, {row['input']: row['high_input']}), abs=0.0051)
+    swings = [abs(r['high_fv'] - r['low_fv']) for r in result['rows']]
+    assert swings == sorted(swings, reverse=True)
+
+
+def test_png_is_well_formed(tmp_path):
+    model = UberCEOInterview()
+    chart, = heatmaps('v2', model, [CASES[1][2]], points=30)
+    written = export([chart], tornado('v2', model, list(CASES[1][2])), str(tmp_path), formats=('png',),
+                     market_price=model.market_price)
+    png = next(path for path in written if path.endswith('.png'))
+    with open(png, 'rb') as f:
+        data = f.read()
+
+    assert data[:8] == b'\x89PNG\r\n\x1a\n'
+    chunks, offset = [], 8
+    while offset < len(data):
+        length, = struct.unpack('>I', data[offset:offset + 4])
+        tag, body = data[offset + 4:offset + 8], data[offset + 8:offset + 8 + length]
+        crc, = struct.unpack('>I', data[offset + 8 + length:offset + 12 + length])
+        assert crc == zlib.crc32(tag + body) & 0xffffffff
+        chunks.append((tag, body))
+        offset += 12 + length
+    assert [tag for tag, _ in chunks] == [b'IHDR', b'IDAT', b'IEND']
+
+    width, height, depth, colour = struct.unpack('>IIBB', chunks[0][1][:10])
+    assert (width, height, depth, colour) == (60, 60, 8, 2)   # 30 points x scale 2, 8-bit RGB
+    raw = zlib.decompress(chunks[1][1])
+    assert len(raw) == height * (width * 3 + 1)
+    assert all(raw[row * (width * 3 + 1)] == 0 for row in range(height))
@@ -0,0 +1,72 @@
+import copy
+import json
+
+import pytest
+
+from uber_valuation_v1 import UberValuation
+from valuation_companies import UBER, CompanyBook, load_company
+from valuation_ordering import rank_questions
+
+
+def other_company(tmp_path, **changes):
+    spec = load_company(UBER)
+    spec.update(ticker='ACME', name='Acme Mobility')
+    spec['facts'].update(shares_outstanding=0.8, net_debt=-1.5, current_revenue=12.0, current_ad_revenue=0.2,
+                         market_price=31)
+    spec['consensus'].update(ebitda_margin_2027=22, ebitda_multiple=11)
+    spec.update(changes)
+    path = tmp_path / 'acme.json'
+    path.write_text(json.dumps(spec))
+    return str(path)
+
+
+def test_uber_valuation_reads_the_company_spec():
+    spec = load_company(UBER)
+    model = UberValuation()
+    assert model.ticker == 'UBER'
+    assert model.consensus == spec['consensus']
+    assert model.questions == spec['questions']
+    for name in ('shares_outstanding', 'net_debt', 'current_revenue', 'current_ad_revenue', 'market_price'):
+        assert getattr(model, name) == spec['facts'][name]
+
+
+def test_any_company_values_like_the_book(tmp_path):
+    spec = load_company(other_company(tmp_path))
+    model = UberValuation(spec)
+    book = CompanyBook([spec])
+    assert model.ticker == 'ACME'
+    assert book.value_all()['fair_value_per_share'][0] == pytest.approx(
+        model.calculate_fair_value()['fair_value_per_share'], abs=0.01)
+
+    book.set_estimate('ACME', 'ebitda_margin_2027', 25)
+    model.user_estimates['ebitda_margin_2027'] = 25
+    assert book.value_all()['fair_value_per_share'][0] == pytest.approx(
+        model.calculate_fair_value()['fair_value_per_share'], abs=0.01)
+    assert model.calculate_fair_value() != UberValuation().calculate_fair_value(model.snapshot())
+
+
+def test_question_uncertainty_weights_the_ordering(tmp_path):
+    spec = load_company(UBER)
+    weighted = copy.deepcopy(spec)
+    for q in weighted['questions']:
+        q['uncertainty'] = 100.0 if q['id'] == 'stock_based_comp_pct' else 0.01
+
+    assert rank_questions(UberValuation(spec))[0]['question']['id'] != 'stock_based_comp_pct'
+    top = rank_questions(UberValuation(weighted))[0]
+    assert top['question']['id'] == 'stock_based_comp_pct' and top['std'] == 100.0
+
+
+@pytest.mark.parametrize('questions, error', [
+    ([{'id': 'ebitda_margin_2027', 'text': 'Margin?', 'unit': '%'}], 'missing impact_per_point'),
+    ([{'id': 'churn', 'text': 'Churn?', 'unit': '%', 'impact_per_point': 1}], 'no consensus value'),
+])
+def test_bad_question_libraries_are_rejected(tmp_path, questions, error):
+    with pytest.raises(ValueError, match=error):
+        load_company(other_company(tmp_path, questions=questions))
+
+
+def test_optional_question_fields_get_defaults(tmp_path):
+    questions = [{'id': 'ebitda_multiple', 'text': 'Multiple?', 'unit': 'x', 'impact_per_point': 4}]
+    spec = load_company(other_company(tmp_path, questions=questions))
+    assert spec['questions'][0]['current_estimate'] == 11
+    assert spec['questions'][0]['context'] == ''
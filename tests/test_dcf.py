@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from uber_valuation_v2_ceo_mode import UberCEOInterview, quarterly_revenue_from_week
+from valuation_dcf import dcf_inputs, project
+
+
+def flat_inputs(growth):
+    """Interview inputs with every margin and cost a constant share of revenue, growing `growth` % a year"""
+    inputs = dcf_inputs(UberCEOInterview())
+    monthly = ((1 + growth / 100) ** (1 / 12) - 1) * 100
+    inputs.update({
+        'mobility_gmv_growth_mom': monthly, 'delivery_gmv_growth_mom': monthly,
+        'freight_growth_mom': monthly, 'advertising_growth_mom': monthly, 'long_run_growth': growth,
+        'margin_expansion_per_year': 0, 'sbc_trend_per_year': 0,
+        'regulatory_liabilities_on_books': 0, 'regulatory_annual': 0,
+        'terminal_growth': growth,
+    })
+    return inputs
+
+
+def closed_form(inputs, years, per_year):
+    """Growing annuity plus Gordon terminal value: the DCF worked by hand"""
+    quarter = quarterly_revenue_from_week(inputs['revenue_last_week'])
+    freight, ads = inputs['freight_quarterly_revenue'] / 1000, inputs['advertising_revenue_run_rate'] / 1000
+    core = quarter - freight - ads
+    ebitda = (core * inputs['ebitda_margin_current_quarter'] + freight * inputs['freight_margin']
+              + ads * inputs['advertising_margin']) / 100
+    operating = ebitda - inputs['stock_based_comp_run_rate'] / 1000
+    cash = (operating * (1 - inputs['tax_rate'] / 100) - inputs['capex_run_rate'] / 1000) * 4 / per_year
+
+    wacc, g = inputs['wacc'] / 100, inputs['terminal_growth'] / 100
+    r, q = (1 + wacc) ** (1 / per_year) - 1, (1 + g) ** (1 / per_year) - 1
+    n = years * per_year
+    x = (1 + q) / (1 + r)
+    pv_cash_flows = cash * x * (1 - x ** n) / (1 - x)
+    last_year = cash * sum((1 + q) ** t for t in range(n - per_year + 1, n + 1))
+    pv_terminal = last_year * (1 + g) / (wacc - g) / (1 + wacc) ** years
+    return (pv_cash_flows + pv_terminal - inputs['net_debt']) / inputs['shares_outstanding']
+
+
+@pytest.mark.parametrize('growth', [0.0, 4.0])
+@pytest.mark.parametrize('step, per_year', [('quarter', 4), ('month', 12)])
+def test_matches_the_closed_form(growth, step, per_year):
+    inputs = flat_inputs(growth)
+    result = project(inputs, horizon_months=60, step=step)
+    assert result['fair_value_per_share'][0] == pytest.approx(closed_form(inputs, 5, per_year), rel=1e-10)
+
+
+def test_scenario_arrays_match_one_at_a_time():
+    inputs = flat_inputs(4.0)
+    waccs = np.array([7.0, 9.0, 11.0])
+    batch = project(dict(inputs, wacc=waccs))['fair_value_per_share']
+    single = [project(dict(inputs, wacc=w))['fair_value_per_share'][0] for w in waccs]
+    assert batch == pytest.approx(single, rel=1e-12)
+    assert batch[0] > batch[1] > batch[2]
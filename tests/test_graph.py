@@ -0,0 +1,57 @@
+import random
+
+import pytest
+
+from uber_valuation_v2_ceo_mode import MODEL_DEFAULTS, UberCEOInterview
+from valuation_graph import ValuationGraph
+
+
+def interview(spec):
+    model = UberCEOInterview()
+    model.cache = None
+    if spec:
+        model.load_spec()
+    return model
+
+
+@pytest.mark.parametrize('spec', [False, True])
+def test_incremental_updates_match_a_full_recompute(spec):
+    model = interview(spec)
+    rng = random.Random(0)
+    names = list(MODEL_DEFAULTS) + ['revenue_last_week']
+    for _ in range(200):
+        qid = rng.choice(names)
+        value = 700 * rng.uniform(0.7, 1.3) if qid == 'revenue_last_week' else MODEL_DEFAULTS[qid] * rng.uniform(0, 2)
+        update = model.update_answer(qid, value)
+        assert update['new_fair_value'] == model.calculate_fair_value()['fair_value_per_share']
+    assert model._graph.result() == model.calculate_fair_value()
+
+
+@pytest.mark.parametrize('spec', [False, True])
+def test_fact_changes_reach_the_graph(spec):
+    model = interview(spec)
+    model.update_answer('share_buyback_last_quarter', 2000)
+    for fact, value in (('market_price', 90), ('net_debt', 7.5), ('shares_outstanding', 2.3),
+                        ('last_quarter_revenue', 10.1)):
+        setattr(model, fact, value)
+        update = model.update_answer('ebitda_margin_current_quarter', 12 + value % 3)
+        assert update['new_fair_value'] == model.calculate_fair_value()['fair_value_per_share']
+
+
+def test_answers_changed_outside_update_answer_are_picked_up():
+    model = interview(False)
+    model.update_answer('advertising_margin', 60)
+    model.answers = {'revenue_last_week': 820, 'monthly_active_riders_growth': 2.5}  # e.g. load_state
+    update = model.update_answer('ebitda_margin_current_quarter', 14)
+    assert update['new_fair_value'] == model.calculate_fair_value()['fair_value_per_share']
+
+
+def test_only_downstream_nodes_recompute():
+    graph = ValuationGraph.from_interview(interview(False))
+    graph.result()
+    assert graph.set_input('advertising_margin', 80) == {
+        'ad_ebitda', 'true_ebitda', 'enterprise_value', 'equity_value', 'fair_value_per_share'}
+    graph.value('fair_value_per_share')
+    assert sorted(graph.recomputed) == ['ad_ebitda', 'enterprise_value', 'equity_value',
+                                        'fair_value_per_share', 'true_ebitda']
+    assert graph.set_input('advertising_margin', 80) == set()
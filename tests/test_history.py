@@ -0,0 +1,47 @@
+import random
+
+import numpy as np
+
+from valuation_history import DAY, HistoryStore
+
+PARAMS = ['ebitda_margin_current_quarter', 'advertising_margin', 'monthly_active_riders_growth']
+START = 1_700_000_000 // DAY * DAY
+
+
+def filled(path, days=200, seed=0):
+    rng = random.Random(seed)
+    changes = []
+    for day in range(days):
+        for offset in sorted(rng.uniform(0, DAY - 10) for _ in range(rng.randint(0, 6))):
+            param = rng.choice(PARAMS + [None])
+            changes.append((param, None if param is None else rng.uniform(0, 20), rng.uniform(10, 30),
+                            START + day * DAY + offset))
+    with HistoryStore(path) as store:
+        store.record_many(changes)
+    return changes
+
+
+def test_compaction_keeps_day_end_replays_and_recent_detail(tmp_path):
+    path = str(tmp_path / 'h.history')
+    filled(path)
+    now = START + 200 * DAY
+    store = HistoryStore(path)
+    day_ends = [START + (day + 1) * DAY - 1 for day in range(200)]
+    before = [store.answers_at(t) for t in day_ends]
+    recent = store.query(start=now - 90 * DAY)
+    rows = len(store)
+
+    removed = store.compact(keep_days=90, now=now)
+    assert removed > 0 and len(store) == rows - removed
+    assert [store.answers_at(t) for t in day_ends] == before
+    for name, column in store.query(start=now - 90 * DAY).items():
+        assert np.array_equal(column, recent[name], equal_nan=True)
+
+    # Reopened from disk, and still appendable
+    reopened = HistoryStore(path)
+    assert len(reopened) == len(store) and reopened.params == store.params
+    assert [reopened.answers_at(t) for t in day_ends] == before
+    reopened.record('advertising_margin', 70.0, 21.0, timestamp=now + 1)
+    assert reopened.answers_at()['advertising_margin'] == 70.0
+    assert np.all(np.diff(reopened.columns()['timestamp']) >= 0)
+    assert reopened.compact(keep_days=90, now=now) == 0
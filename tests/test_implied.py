@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from uber_valuation_v1 import UberValuation
+from uber_valuation_v2_ceo_mode import UberCEOInterview
+from valuation_assumptions import Assumptions
+from valuation_implied import implied_deviations, implied_input
+from valuation_sweep import batch_fair_values
+
+
+def interview():
+    model = UberCEOInterview()
+    model.cache = None
+    return model
+
+
+@pytest.mark.parametrize('model_key, model, name, price', [
+    ('v2', interview(), 'advertising_margin', 15.0),
+    ('v1', UberValuation(), 'ebitda_margin_2027', 40.0),
+])
+def test_smooth_input_converges_to_a_root(model_key, model, name, price):
+    result = implied_input(model_key, model, name, [price])
+    assert result['status'][0] == 'converged'
+    assert abs(result['fair_value'][0] - price) <= 0.005
+    fair_value = model.calculate_fair_value(Assumptions({name: result['value'][0]}))['fair_value_per_share']
+    assert fair_value == pytest.approx(price, abs=0.01)
+
+
+def test_growth_multiple_step_is_reported_as_a_jump():
+    # Default answers: 15x just below 2.0% MoM rider growth ($16.82), 18x above ($20.67)
+    result = implied_input('v2', interview(), 'monthly_active_riders_growth', [19.0])
+    assert result['status'][0] == 'jump'
+    assert result['value'][0] == pytest.approx(2.0, abs=1e-9)
+
+
+def test_price_above_the_highest_multiple_has_no_bracket():
+    model = interview()
+    ceiling = model.calculate_fair_value(Assumptions({'monthly_active_riders_growth': 3.0}))['fair_value_per_share']
+    assert ceiling == 20.67
+    result = implied_input('v2', model, 'monthly_active_riders_growth', [21.0, 19.0])
+    assert list(result['status']) == ['no_bracket', 'jump']
+    assert np.isnan(result['value'][0])
+    assert result['fair_value'][0] == pytest.approx(ceiling, abs=0.005)
+
+
+def test_min_norm_solution_is_the_smallest_change():
+    model = interview()
+    names = ['advertising_margin', 'ebitda_margin_current_quarter']
+    scales = np.array([5.0, 1.0])
+    result = implied_deviations('v2', model, names, [15.0, 17.0], scales=scales)
+    assert list(result['status']) == ['converged', 'converged']
+
+    for i, price in enumerate((15.0, 17.0)):
+        z = np.array([result['deviations'][name][i] for name in names]) / scales
+        # Fair value is linear in both inputs: the minimum-norm step is along the scaled gradient
+        point = {name: result['values'][name][i] for name in names}
+        gradient = np.array([
+            (batch_fair_values('v2', model, {**point, name: np.array([point[name] + scale])}, 1)[0] -
+             batch_fair_values('v2', model, {**point, name: np.array([point[name] - scale])}, 1)[0]) / 2
+            for name, scale in zip(names, scales)])
+        assert z[0] * gradient[1] == pytest.approx(z[1] * gradient[0], rel=1e-6)
+
+        # Any single-input answer to the same price is a bigger change
+        for name, scale in zip(names, scales):
+            alone = implied_input('v2', model, name, [price])['value'][0] - model.model_input(name)
+            assert abs(alone / scale) >= np.hypot(*z) - 1e-9
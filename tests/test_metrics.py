@@ -0,0 +1,47 @@
+import os
+import subprocess
+import sys
+
+import uber_valuation_v2_ceo_mode
+import valuation_metrics
+from valuation_metrics import Metrics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_graph_imported_after_instrument_is_timed_and_restored():
+    script = (
+        "import sys\n"
+        "import valuation_metrics\n"
+        "assert 'valuation_graph' not in sys.modules\n"
+        "metrics = valuation_metrics.instrument(valuation_metrics.Metrics())\n"
+        "from uber_valuation_v2_ceo_mode import UberCEOInterview\n"
+        "from valuation_graph import ValuationGraph\n"
+        "ValuationGraph.from_interview(UberCEOInterview()).value('fair_value_per_share')\n"
+        "timed = sum(sum(counts) for counts, _ in metrics.histograms.values())\n"
+        "valuation_metrics.uninstrument()\n"
+        "ValuationGraph.from_interview(UberCEOInterview()).value('fair_value_per_share')\n"
+        "print(timed, sum(sum(counts) for counts, _ in metrics.histograms.values()))\n"
+    )
+    out = subprocess.run([sys.executable, '-c', script], cwd=ROOT, capture_output=True, text=True, check=True)
+    timed, after = map(int, out.stdout.split())
+    assert timed == len(valuation_metrics.STAGES) - 1   # no revenue_last_week answer: no run-rate stage
+    assert after == timed
+
+
+def test_label_values_are_escaped():
+    metrics = Metrics()
+    metrics.inc('valuation_menu_choices_total', (('choice', 'a"b\\c\nd'),))
+    assert 'valuation_menu_choices_total{choice="a\\"b\\\\c\\nd"} 1' in metrics.to_prometheus().splitlines()
+
+
+def test_unknown_menu_choices_are_counted_as_other(tmp_path, monkeypatch):
+    metrics = Metrics()
+    typed = iter(['', '2', 'x"}', '7', 'q'])
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(valuation_metrics, 'from_env', lambda module=None: metrics)
+    monkeypatch.setattr('builtins.input', lambda prompt='': next(typed))
+
+    uber_valuation_v2_ceo_mode.interactive_interview()
+    choices = {dict(labels)['choice']: count for (name, labels), count in metrics.counters.items()}
+    assert choices == {'2': 1, 'other': 2, 'q': 1}
@@ -0,0 +1,87 @@
+import json
+import math
+import os
+
+import numpy as np
+import pytest
+
+from uber_valuation_v2_ceo_mode import MODEL_SPEC, UberCEOInterview
+from valuation_ordering import QuestionRanker, answer_std, rank_questions
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def interview(spec=None):
+    model = UberCEOInterview()
+    model.cache = None
+    if spec is not None:
+        model.load_spec(spec)
+    return model
+
+
+def fair_value(model, **answers):
+    """Unrounded fair value (the batch engine doesn't round to cents)"""
+    columns = {name: np.array([value], dtype=float) for name, value in answers.items()}
+    return float(model.calculate_fair_value_batch(columns)['fair_value_per_share'][0])
+
+
+def spec_file(tmp_path, multiple, drop=()):
+    """The V2 spec with another multiple node, without the inputs in `drop`"""
+    with open(os.path.join(ROOT, MODEL_SPEC)) as f:
+        spec = json.load(f)
+    spec['nodes']['multiple'] = multiple
+    for name in drop:
+        del spec['inputs'][name]
+    path = tmp_path / 'spec.json'
+    path.write_text(json.dumps(spec))
+    return str(path)
+
+
+def test_ranking_is_by_variance_and_skips_answers():
+    model = interview()
+    model.answers['ebitda_margin_current_quarter'] = 13
+    ranked = rank_questions(model)
+    assert {r['question']['id'] for r in ranked} == {q['id'] for q in model.questions} - {'ebitda_margin_current_quarter'}
+    assert [(-r['variance'], r['position']) for r in ranked] == sorted((-r['variance'], r['position']) for r in ranked)
+    assert QuestionRanker(model).remaining_std() == pytest.approx(math.sqrt(sum(r['variance'] for r in ranked)))
+
+
+def test_smooth_question_variance_is_the_linearized_one():
+    model = interview()
+    entry = next(r for r in rank_questions(model) if r['question']['id'] == 'advertising_margin')
+    std = answer_std(entry['question'], 85)
+    slope = (fair_value(model, advertising_margin=86) - fair_value(model, advertising_margin=84)) / 2
+    assert entry['std'] == std
+    assert entry['variance'] == pytest.approx((slope * std) ** 2, rel=1e-9)
+
+
+def test_rider_growth_variance_comes_from_the_steps():
+    model = interview()
+    entry = next(r for r in rank_questions(model) if r['question']['id'] == 'monthly_active_riders_growth')
+    std = entry['std']
+    cdf = [0.5 * (1 + math.erf((x - 1.0) / (std * math.sqrt(2)))) for x in (1.0, 2.0)]
+    outcomes = [(cdf[0], fair_value(model, monthly_active_riders_growth=0.5)),
+                (cdf[1] - cdf[0], fair_value(model, monthly_active_riders_growth=1.5)),
+                (1 - cdf[1], fair_value(model, monthly_active_riders_growth=2.5))]
+    mean = sum(p * v for p, v in outcomes)
+    assert entry['variance'] == pytest.approx(sum(p * (v - mean) ** 2 for p, v in outcomes), rel=1e-9)
+
+
+def test_spec_without_rider_growth_ranks_it_last(tmp_path):
+    model = interview(spec_file(tmp_path, '15', drop=['monthly_active_riders_growth']))
+    ranked = rank_questions(model)
+    growth = next(r for r in ranked if r['question']['id'] == 'monthly_active_riders_growth')
+    assert growth['variance'] == 0.0 and growth['std'] is None
+    assert ranked[0]['variance'] > 0
+
+    model.answers['monthly_active_riders_growth'] = 2.5
+    assert len(rank_questions(model)) == len(ranked) - 1
+    model.sensitivity_analysis()
+
+
+def test_spec_with_other_multiples_falls_back_to_the_gradient(tmp_path):
+    model = interview(spec_file(tmp_path, '20 if monthly_active_riders_growth > 2.0 else 10'))
+    ranked = rank_questions(model)
+    growth = next(r for r in ranked if r['question']['id'] == 'monthly_active_riders_growth')
+    assert growth['variance'] == 0.0   # flat away from the step
+    assert len(ranked) == len(model.questions)
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from uber_valuation_v2_ceo_mode import UberCEOInterview
+from valuation_paths import CORRELATIONS, PROCESSES, correlation_matrix, path_inputs, simulate, simulate_block
+
+
+def inputs():
+    return path_inputs(UberCEOInterview())
+
+
+def test_output_shapes_and_saved_paths(tmp_path):
+    out, paths_out = str(tmp_path / 'fv.npy'), str(tmp_path / 'paths.npy')
+    fair_values = simulate(inputs(), 250, months=24, seed=1, block_size=100, out=out, paths_out=paths_out)
+    assert fair_values.shape == (250,) and np.isfinite(fair_values).all()
+    assert np.array_equal(np.load(out), fair_values)
+    saved = np.load(paths_out)
+    assert saved.shape == (250, 24, len(PROCESSES)) and saved.dtype == np.float32
+
+
+def test_same_seed_same_paths():
+    first = simulate(inputs(), 300, months=12, seed=7, block_size=128)
+    assert np.array_equal(first, simulate(inputs(), 300, months=12, seed=7, block_size=128))
+    assert not np.array_equal(first, simulate(inputs(), 300, months=12, seed=8, block_size=128))
+
+
+def test_without_volatility_every_path_is_the_mean_reversion():
+    calm = {name: dict(process, volatility=0.0) for name, process in PROCESSES.items()}
+    values = inputs()
+    fair_values = simulate(values, 50, months=12, seed=0, processes=calm)
+    assert np.ptp(fair_values) == pytest.approx(0, abs=1e-9)
+
+    names = list(PROCESSES)
+    starts = {name: float(values[PROCESSES[name]['answer']]) for name in names}
+    paths = simulate_block(starts, {name: 0.0 for name in names}, calm, np.eye(len(names)), 12, 3,
+                           np.random.default_rng(0))
+    for name in names:
+        assert paths[name][:, 0] == pytest.approx(starts[name])
+    # Churn's deviation from its mean (0 here) halves every 6 months
+    assert paths['driver_churn'][:, 6] == pytest.approx(starts['driver_churn'] / 2)
+
+
+def test_monthly_shocks_carry_the_correlations():
+    names = list(PROCESSES)
+    cholesky = np.linalg.cholesky(correlation_matrix(names, CORRELATIONS))
+    zero = {name: 0.0 for name in names}
+    paths = simulate_block(zero, zero, PROCESSES, cholesky, 3, 40_000, np.random.default_rng(3))
+    # Month 1 is the first shock alone
+    first = np.corrcoef([paths[name][:, 0] for name in names])
+    for (a, b), rho in CORRELATIONS.items():
+        assert first[names.index(a), names.index(b)] == pytest.approx(rho, abs=0.03)
@@ -0,0 +1,91 @@
+import time
+
+import numpy as np
+import pytest
+
+from uber_valuation_v1 import UberValuation
+from uber_valuation_v2_ceo_mode import UberCEOInterview
+from valuation_assumptions import Assumptions
+from valuation_portfolio import Portfolio
+from valuation_sessions import SessionStore
+
+SESSIONS = [
+    ('alice', 'UBER', 'v2', {'ebitda_margin_current_quarter': 13, 'share_buyback_last_quarter': 900}),
+    ('bob', 'UBER', 'v1', {'ebitda_margin_2027': 18}),
+    ('carol', 'UBER', 'v2', {'monthly_active_riders_growth': 2.5}),
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    with SessionStore(str(tmp_path / 'sessions.db')) as store:
+        for user, ticker, model, answers in SESSIONS:
+            store.save(user, ticker, model, answers, saved_at=time.time() - 60)
+        yield store
+
+
+def portfolio(store=None, prices=None):
+    book = Portfolio(scenarios=200)
+    if prices:
+        book.set_market_prices(prices)
+    return book if store is None else book.load(store)
+
+
+def assert_same_book(book, fresh):
+    """Same positions, fair values and scenarios (compared by session, whatever the order)"""
+    assert sorted(book.keys) == sorted(fresh.keys)
+    order = [book.index[key] for key in fresh.keys]
+    for name in ('fair_value_per_share', 'market_price'):
+        assert book.positions()[name][order] == pytest.approx(fresh.positions()[name])
+    assert np.allclose(book.scenario_fair_values()[:, order], fresh.scenario_fair_values())
+
+
+def test_positions_match_the_scalar_models(store):
+    book = portfolio(store)
+    fair_values = dict(zip(book.keys, book.positions()['fair_value_per_share']))
+    for user, ticker, model, answers in SESSIONS:
+        scalar = (UberValuation() if model == 'v1' else UberCEOInterview()).calculate_fair_value(Assumptions(answers))
+        assert fair_values[(user, ticker, model)] == pytest.approx(scalar['fair_value_per_share'], abs=0.006)
+
+
+def test_update_matches_a_fresh_load(store):
+    book = portfolio(store)
+    changes = [('alice', 'UBER', 'v2', {'advertising_margin': 60}),
+               ('bob', 'UBER', 'v1', {'ebitda_multiple': 12}),
+               ('dave', 'UBER', 'v2', {'delivery_gmv_growth_mom': 3})]
+    for user, ticker, model, answers in changes:
+        store.save(user, ticker, model, answers)
+        book.update(user, ticker, model, answers)
+    assert_same_book(book, portfolio(store))
+
+
+def test_refresh_matches_a_fresh_load(store):
+    book = portfolio(store)
+    assert book.refresh(store) == 0
+    store.save('carol', 'UBER', 'v2', {'monthly_active_riders_growth': 0.5}, saved_at=time.time() + 1)
+    store.save('erin', 'UBER', 'v1', {'stock_based_comp_pct': 6}, saved_at=time.time() + 1)
+    assert book.refresh(store) == 2
+    assert_same_book(book, portfolio(store))
+
+
+def test_new_prices_revalue_v2_positions(store):
+    book = portfolio(store)
+    before = book.positions()['fair_value_per_share'].copy()
+    book.set_market_prices({'UBER': 40})
+
+    after = book.positions()
+    v2 = book.models == 'v2'
+    assert (after['market_price'] == 40).all()
+    assert after['fair_value_per_share'][~v2] == pytest.approx(before[~v2])
+    assert not np.allclose(after['fair_value_per_share'][v2], before[v2])
+
+    interview = UberCEOInterview()
+    interview.market_price = 40
+    alice = book.index[('alice', 'UBER', 'v2')]
+    expected = interview.calculate_fair_value(Assumptions(SESSIONS[0][3]))['fair_value_per_share']
+    assert after['fair_value_per_share'][alice] == pytest.approx(expected, abs=0.006)
+
+    # Positions added after the price change value at it too
+    book.update('dave', 'UBER', 'v2', {'delivery_gmv_growth_mom': 3})
+    store.save('dave', 'UBER', 'v2', {'delivery_gmv_growth_mom': 3})
+    assert_same_book(book, portfolio(store, {'UBER': 40}))
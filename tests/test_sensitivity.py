@@ -0,0 +1,27 @@
+from uber_valuation_v1 import UberValuation
+from uber_valuation_v2_ceo_mode import UberCEOInterview
+
+
+def test_v1_sensitivity_revalues_exactly(capsys):
+    model = UberValuation()
+    model.user_estimates = {'ebitda_margin_2027': 17, 'ebitda_multiple': 14}
+    for row in model.sensitivity_analysis():
+        value = model.get_estimate(row['param'])
+        low = model.calculate_fair_value(model.snapshot().with_answer(row['param'], value * 0.8))
+        high = model.calculate_fair_value(model.snapshot().with_answer(row['param'], value * 1.2))
+        assert row['low_fv'] == low['fair_value_per_share']
+        assert row['high_fv'] == high['fair_value_per_share']
+
+
+def test_v2_sensitivity_revalues_exactly(capsys):
+    interview = UberCEOInterview()
+    interview.answers = {'ebitda_margin_current_quarter': 13, 'mobility_gmv_growth_mom': 2.4,
+                         'monthly_active_riders_growth': 1.9, 'revenue_last_week': 760}
+    rows = interview.sensitivity_analysis()
+    assert len(rows) == 4
+    for row in rows:
+        value = interview.answers[row['param']]
+        low = interview.calculate_fair_value(interview.snapshot().with_answer(row['param'], value * 0.8))
+        high = interview.calculate_fair_value(interview.snapshot().with_answer(row['param'], value * 1.2))
+        assert row['low'] == low['fair_value_per_share']
+        assert row['high'] == high['fair_value_per_share']
@@ -0,0 +1,44 @@
+import asyncio
+import random
+
+from valuation_assumptions import Assumptions
+from valuation_service import ValuationService
+
+SERVICE = ValuationService()
+
+SCENARIOS = {
+    'v1': ({'ebitda_margin_2027': 17},
+           [{'ebitda_multiple': 12 + i % 9, 'revenue_growth_2025_2027': 8 + i % 5} for i in range(40)]
+           + [{'regulatory_cost_annual': 0.1 * i} for i in range(20)] + [{}]),
+    'v2': ({'ebitda_margin_current_quarter': 14},
+           [{'revenue_last_week': 600 + 10 * i, 'monthly_active_riders_growth': i % 4} for i in range(40)]
+           + [{'monthly_active_riders_growth': 0.5 * i} for i in range(20)] + [{}]),
+}
+
+
+def request(path, payload):
+    return asyncio.run(SERVICE.handle('POST', path, payload))
+
+
+def test_batch_matches_scalar_values():
+    for model_key, (answers, scenarios) in SCENARIOS.items():
+        scenarios = random.Random(0).sample(scenarios, len(scenarios))
+        status, result = request(f'/{model_key}/batch', {'answers': answers, 'scenarios': scenarios})
+        assert status == 200
+        model = SERVICE.models[model_key]
+        assert result['fair_value_per_share'] == [
+            model.calculate_fair_value(Assumptions({**answers, **s}))['fair_value_per_share'] for s in scenarios]
+
+
+def test_batch_bypasses_the_cache():
+    from valuation_cache import FAIR_VALUE_CACHE
+
+    before = FAIR_VALUE_CACHE.stats()
+    request('/v2/batch', {'scenarios': [{'advertising_margin': 41 + i} for i in range(10)]})
+    assert FAIR_VALUE_CACHE.stats() == before
+
+
+def test_batch_rejects_bad_scenarios():
+    assert request('/v1/batch', {'scenarios': []})[0] == 400
+    status, result = request('/v1/batch', {'scenarios': [{'ebitda_margin_2027': 'x'}]})
+    assert status == 400 and 'ebitda_margin_2027' in result['error']
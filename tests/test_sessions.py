@@ -0,0 +1,46 @@
+import threading
+
+from valuation_sessions import SessionStore
+
+USERS = [f'user{i}' for i in range(8)]
+SAVES = 60
+T0 = 1_700_000_000.0
+
+
+def test_concurrent_saves_and_since_filtering(tmp_path):
+    path = str(tmp_path / 'sessions.db')
+    stores = [SessionStore(path, batch_size=7), SessionStore(path, batch_size=7)]   # two writers on one file
+    errors = []
+
+    def writer(i, user):
+        store = stores[i % 2]
+        try:
+            for n in range(SAVES):
+                # Saves of every user interleave in time: save n of user i is at T0 + n + i/10
+                store.save(user, 'UBER', 'v2', {'n': n}, fair_value=float(n), saved_at=T0 + n + i / 10,
+                           defer=n % 2 == 0)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(i, user)) for i, user in enumerate(USERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for store in stores:
+        store.close()
+    assert not errors
+
+    with SessionStore(path) as store:
+        assert store.count() == len(USERS) * SAVES
+        latest = store.sessions(ticker='UBER')
+        assert [s['user'] for s in latest] == USERS
+        assert all(s['answers'] == {'n': SAVES - 1} for s in latest)
+
+        # Only users with a save at or after `since` show up, with their latest state in range
+        since = T0 + SAVES - 1 + 0.35
+        assert [s['user'] for s in store.sessions(since=since)] == USERS[4:]
+        window = store.sessions(since=T0 + 10, until=T0 + 20)
+        assert all(s['answers'] == {'n': 19} for s in window) and len(window) == len(USERS)
+        assert [row['answers']['n'] for row in store.history('user3', 'UBER', 'v2', since=T0 + 55)] == \
+            list(range(55, SAVES))
@@ -0,0 +1,56 @@
+import json
+import os
+
+import numpy as np
+
+from uber_valuation_v2_ceo_mode import MODEL_SPEC, UberCEOInterview
+from valuation_surfaces import model_version
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SPEC = os.path.join(ROOT, MODEL_SPEC)
+
+
+def interviews():
+    builtin, compiled = UberCEOInterview(), UberCEOInterview()
+    builtin.cache = compiled.cache = None
+    compiled.load_spec(SPEC)
+    return builtin, compiled
+
+
+def test_spec_matches_builtin_scalar():
+    builtin, compiled = interviews()
+    rng = np.random.default_rng(1)
+    defaults = compiled.spec.defaults
+    for _ in range(500):
+        answers = {qid: float(value * rng.uniform(0.2, 2.5)) for qid, value in defaults.items() if rng.random() < 0.6}
+        if rng.random() < 0.5:
+            answers['revenue_last_week'] = float(rng.uniform(500, 900))
+        builtin.answers = compiled.answers = answers
+        assert compiled.calculate_fair_value() == builtin.calculate_fair_value()
+
+
+def test_spec_matches_builtin_batch():
+    builtin, compiled = interviews()
+    rng = np.random.default_rng(2)
+    n = 10_000
+    columns = {qid: rng.uniform(0.2, 2.5, n) * value for qid, value in compiled.spec.defaults.items()}
+    columns['revenue_last_week'] = rng.uniform(500, 900, n)
+    a = builtin.calculate_fair_value_batch(columns)
+    b = compiled.calculate_fair_value_batch(columns)
+    for key in ('fair_value_per_share', 'annual_revenue', 'true_ebitda', 'enterprise_value'):
+        assert np.array_equal(a[key], b[key])
+
+
+def test_environment_spec_reaches_every_interview(tmp_path, monkeypatch):
+    with open(SPEC) as f:
+        spec = json.load(f)
+    spec['nodes']['ebitda'] = 'annual_revenue * (ebitda_margin_current_quarter / 100) * 1.5'
+    path = tmp_path / 'mine.json'
+    path.write_text(json.dumps(spec))
+
+    builtin = UberCEOInterview()
+    monkeypatch.setenv('VALUATION_SPEC', str(path))
+    mine = UberCEOInterview()
+    assert mine.spec is not None
+    assert mine.calculate_fair_value() != builtin.calculate_fair_value()
+    assert model_version('v2', mine) != model_version('v2', builtin)
@@ -0,0 +1,44 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = ('uber_valuation_v1.py', 'uber_valuation_v2_ceo_mode.py')
+
+# Modules the --demo path must not pull in (each costs tens of ms)
+HEAVY = ('numpy', 'sqlite3', 'asyncio', 'multiprocessing')
+
+RUN_DEMO = """
+import contextlib, io, runpy, sys
+sys.argv = [{script!r}, '--demo']
+with contextlib.redirect_stdout(io.StringIO()):
+    runpy.run_path({script!r}, run_name='__main__')
+print(' '.join(name for name in {heavy!r} if name in sys.modules))
+"""
+
+
+@pytest.mark.parametrize('script', SCRIPTS)
+def test_demo_imports_nothing_heavy(script):
+    code = RUN_DEMO.format(script=script, heavy=HEAVY)
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.split() == []
+
+
+def _median_seconds(args, runs=5):
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(args, cwd=ROOT, stdout=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - started)
+    return sorted(times)[runs // 2]
+
+
+@pytest.mark.parametrize('script', SCRIPTS)
+def test_demo_starts_quickly(script):
+    # Over the bare interpreter's own startup; the demo needs ~20 ms of that
+    # budget, importing NumPy alone takes more than the rest
+    interpreter = _median_seconds([sys.executable, '-c', 'pass'])
+    assert _median_seconds([sys.executable, script, '--demo']) - interpreter < 0.075
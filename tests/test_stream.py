@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from uber_valuation_v1 import UberValuation
+from uber_valuation_v2_ceo_mode import UberCEOInterview
+from valuation_stream import MispricingMonitor, _parse_tick, run_stream, tail_file
+
+
+@pytest.mark.parametrize('line', ['timestamp,price\n', '\n', 'n/a\n', '1700000000,abc\n', '12,0\n', 'nan\n'])
+def test_unparseable_lines_are_skipped(line):
+    assert _parse_tick(line) is None
+
+
+def test_price_and_timestamped_lines():
+    assert _parse_tick('1700000000.5,81.25\n') == (1700000000.5, 81.25)
+    assert _parse_tick('79.5\n')[1] == 79.5
+
+
+def test_file_feed_survives_headers_and_bad_rows(tmp_path):
+    path = tmp_path / 'prices.csv'
+    path.write_text('timestamp,price\n\n1,70\ngarbage\n2,abc\n3,95\n')
+
+    async def first(n):
+        ticks = []
+        async for tick in tail_file(str(path), poll_interval=0.001):
+            ticks.append(tick)
+            if len(ticks) == n:
+                return ticks
+
+    assert asyncio.run(asyncio.wait_for(first(2), 5)) == [(1.0, 70.0), (3.0, 95.0)]
+
+
+def test_v2_fair_value_follows_the_price():
+    model = UberCEOInterview()
+    model.answers = {'share_buyback_last_quarter': 2500, 'ebitda_margin_current_quarter': 14}
+    monitor = MispricingMonitor(model)
+
+    async def feed():
+        for price in (60.0, 75.0, 120.0, 60.0):
+            yield 0.0, price
+
+    signals = []
+    asyncio.run(run_stream(monitor, feed(), signals.append, emit='all'))
+    reference = UberCEOInterview()
+    reference.cache = None
+    reference.answers = dict(model.answers)
+    for signal in signals:
+        reference.market_price = signal['price']
+        assert signal['fair_value'] == reference.calculate_fair_value()['fair_value_per_share']
+    assert signals[0]['fair_value'] != signals[2]['fair_value']
+
+    # An answer change after ticks values at the latest price
+    monitor.update_answer('advertising_margin', 70)
+    reference.answers['advertising_margin'] = 70
+    assert monitor.fair_value == reference.calculate_fair_value()['fair_value_per_share']
+
+
+def test_v1_ticks_leave_the_fair_value_alone():
+    monitor = MispricingMonitor(UberValuation())
+    before = monitor.fair_value
+    assert monitor.signal(0.0, 120.0)['fair_value'] == before
@@ -0,0 +1,16 @@
+import pytest
+
+import valuation_surfaces
+
+
+@pytest.mark.parametrize('arg', ['foo', 'ebitda_margin_2027=abc', 'nope=3', 'delivery_take_rate_2027=30'])
+def test_whatif_rejects_bad_arguments(arg, tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    assert valuation_surfaces.main(['whatif', arg], 'v1') == 1
+    assert '❌' in capsys.readouterr().out
+
+
+def test_whatif_values_a_model_input(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    assert valuation_surfaces.main(['whatif', 'ebitda_margin_2027=20'], 'v1') == 0
+    assert '$43.42/share' in capsys.readouterr().out
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from uber_valuation_v1 import UberValuation, project_fair_value
+from valuation_assumptions import Assumptions
+
+
+def scenarios(model, n, seed=0):
+    """n rows of estimates within +/-50% of consensus"""
+    rng = np.random.default_rng(seed)
+    base = np.array(model.assumption_vector(), dtype=np.float64)
+    return base * rng.uniform(0.5, 1.5, (n, base.size))
+
+
+def test_batch_matches_scalar_bit_for_bit():
+    model = UberValuation()
+    x = scenarios(model, 500)
+    batch = model.calculate_fair_value_batch(x)
+    for i, row in enumerate(x):
+        c = dict(zip(model.consensus, (float(v) for v in row)))
+        scalar = project_fair_value(
+            c['revenue_growth_2025_2027'], c['advertising_revenue_2027'], c['ebitda_margin_2027'],
+            c['regulatory_cost_annual'], c['stock_based_comp_pct'], c['ebitda_multiple'],
+            model.current_revenue, model.net_debt, model.shares_outstanding,
+        )
+        for key, value in zip(('fair_value_per_share', 'revenue_2027', 'ebitda_2027',
+                               'true_ebitda_2027', 'enterprise_value', 'equity_value'), scalar):
+            assert batch[key][i] == value, key
+
+
+def test_batch_rounds_to_calculate_fair_value():
+    model = UberValuation()
+    model.cache = None
+    x = scenarios(model, 50, seed=1)
+    batch = model.calculate_fair_value_batch(x)
+    for i, row in enumerate(x):
+        result = model.calculate_fair_value(Assumptions(dict(zip(model.consensus, row.tolist()))))
+        for key, value in result.items():
+            assert round(float(batch[key][i]), 2) == value, key
+
+
+def test_consensus_row_is_the_current_fair_value():
+    model = UberValuation()
+    batch = model.calculate_fair_value_batch([model.assumption_vector()])
+    assert round(float(batch['fair_value_per_share'][0]), 2) == model.calculate_fair_value()['fair_value_per_share']
+
+
+def test_batch_rejects_wrong_shape():
+    model = UberValuation()
+    with pytest.raises(ValueError):
+        model.calculate_fair_value_batch(np.zeros((3, len(model.consensus) - 1)))
@@ -0,0 +1,72 @@
+import numpy as np
+
+from uber_valuation_v2_ceo_mode import (
+    MODEL_DEFAULTS, MODEL_INPUTS, UberCEOInterview, growth_multiple, project_fair_value,
+    quarterly_revenue_from_week,
+)
+from valuation_assumptions import Assumptions
+
+KEYS = ('fair_value_per_share', 'annual_revenue', 'true_ebitda', 'enterprise_value',
+        'equity_value', 'shares_outstanding')
+
+
+def draws(interview, n, seed=0):
+    """{input: array} within +/-50% of each default (rider growth across every multiple step)"""
+    rng = np.random.default_rng(seed)
+    columns = {qid: value * rng.uniform(0.5, 1.5, n) for qid, value in MODEL_DEFAULTS.items()}
+    columns['revenue_last_week'] = interview.model_input('revenue_last_week') * rng.uniform(0.5, 1.5, n)
+    columns['monthly_active_riders_growth'] = rng.uniform(0.0, 3.0, n)
+    return columns
+
+
+def test_batch_matches_scalar_bit_for_bit():
+    interview = UberCEOInterview()
+    columns = draws(interview, 500)
+    batch = interview.calculate_fair_value_batch(columns)
+    for i in range(500):
+        x = {qid: float(columns[qid][i]) for qid in MODEL_INPUTS}
+        scalar = project_fair_value(
+            quarterly_revenue_from_week(x['revenue_last_week']), x['mobility_gmv_growth_mom'],
+            x['delivery_gmv_growth_mom'], x['ebitda_margin_current_quarter'], x['stock_based_comp_run_rate'],
+            x['regulatory_liabilities_on_books'], x['advertising_revenue_run_rate'], x['advertising_margin'],
+            growth_multiple(x['monthly_active_riders_growth']), x['share_buyback_last_quarter'],
+            interview.shares_outstanding, interview.net_debt, interview.market_price,
+        )
+        for key, value in zip(KEYS, scalar):
+            assert batch[key][i] == value, key
+        assert batch['multiple_used'][i] == growth_multiple(x['monthly_active_riders_growth'])
+
+
+def test_batch_rounds_to_calculate_fair_value():
+    interview = UberCEOInterview()
+    interview.cache = None
+    columns = draws(interview, 50, seed=1)
+    batch = interview.calculate_fair_value_batch(columns)
+    for i in range(50):
+        result = interview.calculate_fair_value(Assumptions({qid: float(columns[qid][i]) for qid in MODEL_INPUTS}))
+        for key in ('fair_value_per_share', 'annual_revenue', 'true_ebitda', 'enterprise_value', 'equity_value'):
+            assert round(float(batch[key][i]), 2) == result[key], key
+        assert round(float(batch['shares_outstanding'][i]), 3) == result['shares_outstanding']
+
+
+def test_unanswered_inputs_fall_back_to_answers_then_defaults():
+    interview = UberCEOInterview()
+    interview.answers = {'ebitda_margin_current_quarter': 14}
+    batch = interview.calculate_fair_value_batch({'mobility_gmv_growth_mom': np.array([2.5])})
+    expected = interview.calculate_fair_value(Assumptions({'ebitda_margin_current_quarter': 14,
+                                                           'mobility_gmv_growth_mom': 2.5}))
+    assert round(float(batch['fair_value_per_share'][0]), 2) == expected['fair_value_per_share']
+
+
+def test_monte_carlo_with_fixed_answers_is_the_point_value():
+    interview = UberCEOInterview()
+    summary = interview.monte_carlo({'ebitda_margin_current_quarter': 13.0}, draws=1000, seed=0)
+    point = interview.calculate_fair_value(Assumptions({'ebitda_margin_current_quarter': 13.0}))
+    assert summary['std'] == 0
+    assert summary['mean'] == point['fair_value_per_share']
+
+
+def test_monte_carlo_is_reproducible_with_a_seed():
+    interview = UberCEOInterview()
+    spec = {'mobility_gmv_growth_mom': {'dist': 'normal', 'mean': 2.0, 'std': 0.5}}
+    assert interview.monte_carlo(spec, draws=20_000, seed=7) == interview.monte_carlo(spec, draws=20_000, seed=7)
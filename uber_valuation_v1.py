@@ -4,148 +4,152 @@ Uber Valuation Oracle - V1
 One question at a time, starting with Wall Street consensus
 """
 
-import json
-from datetime import datetime
+from valuation_assumptions import Assumptions
+from valuation_cache import FAIR_VALUE_CACHE, answers_key
+
+# The estimates project_fair_value reads (the take-rate questions are
+# asked, but not yet wired into the model)
+MODEL_INPUTS = (
+    'revenue_growth_2025_2027',
+    'ebitda_margin_2027',
+    'advertising_revenue_2027',
+    'regulatory_cost_annual',
+    'ebitda_multiple',
+    'stock_based_comp_pct',
+)
+
+
+def project_fair_value(growth_pct, ad_revenue, margin_pct, regulatory_cost,
+                       sbc_pct, multiple, current_revenue, net_debt,
+                       shares_outstanding, current_ad_revenue=1.1):
+    """
+    The V1 model as plain arithmetic.
+
+    Works on Python floats and on NumPy arrays alike (only +, -, *, / are
+    used, so both paths round identically). Returns unrounded
+    (fair_value, revenue_2027, ebitda_2027, true_ebitda, EV, equity_value).
+    """
+    # Project to 2027 (3 years out)
+    growth = 1 + growth_pct / 100
+    revenue_2027 = current_revenue * (growth * growth * growth)
+
+    # Add advertising revenue explicitly (not in base growth)
+    revenue_2027 = revenue_2027 + (ad_revenue - current_ad_revenue)  # Subtract current ad revenue (already in base)
+
+    # Calculate EBITDA
+    ebitda_2027 = revenue_2027 * (margin_pct / 100)
+
+    # Adjust for regulatory costs
+    ebitda_adjusted = ebitda_2027 - regulatory_cost
+
+    # Adjust for stock-based comp (real cost)
+    sbc_cost = revenue_2027 * (sbc_pct / 100)
+    true_ebitda = ebitda_adjusted - sbc_cost
+
+    # Valuation
+    enterprise_value = true_ebitda * multiple
+
+    # Equity value
+    equity_value = enterprise_value - net_debt
+
+    # Per share
+    fair_value = equity_value / shares_outstanding
+
+    return fair_value, revenue_2027, ebitda_2027, true_ebitda, enterprise_value, equity_value
+
 
 class UberValuation:
-    def __init__(self):
+    def __init__(self, company=None):
+        """
+        `company` is a spec from valuation_companies.load_company
+        (default: companies/uber.json)
+        """
+        from valuation_companies import UBER, load_company
+
+        spec = load_company(UBER) if company is None else company
+
         # EDGAR baseline (known facts)
-        self.current_year = 2024
-        self.shares_outstanding = 2.1  # billion
-        self.net_debt = 5.0  # $B
-        self.current_revenue = 40.0  # $B (2024 estimate)
+        facts = spec['facts']
+        self.current_year = facts.get('current_year')
+        self.shares_outstanding = facts['shares_outstanding']  # billion
+        self.net_debt = facts['net_debt']  # $B
+        self.current_revenue = facts['current_revenue']  # $B
+        self.current_ad_revenue = facts['current_ad_revenue']  # $B
+        self.market_price = facts['market_price']  # $/share
 
         # Wall Street Consensus (starting point)
-        self.consensus = {
-            'revenue_growth_2025_2027': 12,  # % CAGR
-            'delivery_take_rate_2027': 23,  # %
-            'mobility_take_rate_2027': 25,  # %
-            'ebitda_margin_2027': 15,  # %
-            'advertising_revenue_2027': 2.5,  # $B
-            'regulatory_cost_annual': 0.5,  # $B/year
-            'ebitda_multiple': 15,  # x
-            'stock_based_comp_pct': 8,  # % of revenue
-        }
+        self.consensus = dict(spec['consensus'])
 
         # User overrides (start empty, build over time)
         self.user_estimates = {}
 
         # Question library (prioritized by impact)
-        self.questions = self._build_question_library()
+        self.questions = [dict(q) for q in spec['questions']]
+
+        # Shared fair-value cache (set to None to disable)
+        self.cache = FAIR_VALUE_CACHE
+
+        # Optional valuation_history.HistoryStore; records every change
+        self.history = None
 
-    def _build_question_library(self):
+        # valuation_ordering.QuestionRanker (built on first adaptive get_next_question)
+        self._ranker = None
+
+        # Optional valuation_sessions.SessionStore; save/load_state use it
+        # (keyed by user and ticker) instead of the JSON file when set
+        self.sessions = None
+        self.user = 'default'
+        self.ticker = spec['ticker']
+
+    def snapshot(self):
         """
-        Questions ranked by valuation impact (highest first)
+        Current user estimates as an immutable Assumptions
         """
-        return [
-            {
-                'id': 'ebitda_margin_2027',
-                'text': 'What will Uber\'s adjusted EBITDA margin be in 2027?',
-                'context': 'Wall Street consensus: 15%. Current (2024): ~10%.',
-                'unit': '%',
-                'impact_per_point': 3.2,  # $3.2/share per 1% margin
-                'current_estimate': 15,
-            },
-            {
-                'id': 'regulatory_cost_annual',
-                'text': 'What will Uber\'s total annual regulatory cost be (steady state)?',
-                'context': 'This includes CA AB5, UK settlement, EU cases, etc. Wall Street: $500M/year',
-                'unit': '$B',
-                'impact_per_point': 15.0,  # $15/share per $1B cost
-                'current_estimate': 0.5,
-            },
-            {
-                'id': 'delivery_take_rate_2027',
-                'text': 'What will Uber Eats delivery take rate be in 2027?',
-                'context': 'Current: 21%. Wall Street expects: 23%. Can it go higher?',
-                'unit': '%',
-                'impact_per_point': 2.8,  # $2.8/share per 1% take rate
-                'current_estimate': 23,
-            },
-            {
-                'id': 'revenue_growth_2025_2027',
-                'text': 'What will Uber\'s revenue growth rate be (2025-2027 CAGR)?',
-                'context': 'Wall Street: 12%. Historical: 15%+. Depends on market share.',
-                'unit': '%',
-                'impact_per_point': 1.8,  # $1.8/share per 1% growth
-                'current_estimate': 12,
-            },
-            {
-                'id': 'advertising_revenue_2027',
-                'text': 'What will Uber\'s advertising revenue be in 2027?',
-                'context': '2024: ~$1.1B. Wall Street: $2.5B. Could be $3-5B if it scales.',
-                'unit': '$B',
-                'impact_per_point': 5.0,  # $5/share per $1B ad revenue (high margin)
-                'current_estimate': 2.5,
-            },
-            {
-                'id': 'ebitda_multiple',
-                'text': 'What EBITDA multiple should Uber trade at?',
-                'context': 'Tech companies: 18-25x. Transport: 8-12x. Wall Street: 15x.',
-                'unit': 'x',
-                'impact_per_point': 4.2,  # $4.2/share per 1x multiple
-                'current_estimate': 15,
-            },
-            {
-                'id': 'mobility_take_rate_2027',
-                'text': 'What will Uber Mobility (rides) take rate be in 2027?',
-                'context': 'Current: 24%. Wall Street: 25%. Maxed out or room to grow?',
-                'unit': '%',
-                'impact_per_point': 2.1,  # $2.1/share per 1% take rate
-                'current_estimate': 25,
-            },
-            {
-                'id': 'stock_based_comp_pct',
-                'text': 'What % of revenue will stock-based compensation be in 2027?',
-                'context': 'Current: ~9%. Wall Street expects: 8% (declining). Could stay high.',
-                'unit': '%',
-                'impact_per_point': -1.5,  # -$1.5/share per 1% SBC (it\'s a cost)
-                'current_estimate': 8,
-            },
-        ]
-
-    def get_estimate(self, param):
+        return Assumptions(self.user_estimates)
+
+    def get_estimate(self, param, assumptions=None):
         """
-        Get estimate (user override if exists, else consensus)
+        Get estimate (user override if exists, else consensus).
+        Overrides come from `assumptions` if given, else self.user_estimates.
         """
-        return self.user_estimates.get(param, self.consensus.get(param))
+        estimates = self.user_estimates if assumptions is None else assumptions
+        return estimates.get(param, self.consensus.get(param))
 
-    def calculate_fair_value(self):
+    def assumption_vector(self, assumptions=None):
         """
-        Simple DCF model
+        Effective estimates as a list, in self.consensus key order
+        (the column layout expected by calculate_fair_value_batch)
         """
-        # Project to 2027 (3 years out)
-        growth_rate = self.get_estimate('revenue_growth_2025_2027') / 100
-        revenue_2027 = self.current_revenue * ((1 + growth_rate) ** 3)
-
-        # Add advertising revenue explicitly (not in base growth)
-        ad_revenue_2027 = self.get_estimate('advertising_revenue_2027')
-        revenue_2027 += ad_revenue_2027 - 1.1  # Subtract current ad revenue (already in base)
-
-        # Calculate EBITDA
-        ebitda_margin = self.get_estimate('ebitda_margin_2027') / 100
-        ebitda_2027 = revenue_2027 * ebitda_margin
-
-        # Adjust for regulatory costs
-        regulatory_cost = self.get_estimate('regulatory_cost_annual')
-        ebitda_adjusted = ebitda_2027 - regulatory_cost
-
-        # Adjust for stock-based comp (real cost)
-        sbc_pct = self.get_estimate('stock_based_comp_pct') / 100
-        sbc_cost = revenue_2027 * sbc_pct
-        true_ebitda = ebitda_adjusted - sbc_cost
-
-        # Valuation
-        multiple = self.get_estimate('ebitda_multiple')
-        enterprise_value = true_ebitda * multiple
-
-        # Equity value
-        equity_value = enterprise_value - self.net_debt
-
-        # Per share
-        fair_value = equity_value / self.shares_outstanding
+        return [self.get_estimate(param, assumptions) for param in self.consensus]
 
-        return {
+    def calculate_fair_value(self, assumptions=None):
+        """
+        Simple DCF model, for the current estimates or an Assumptions
+        snapshot (which leaves the model untouched)
+        """
+        if self.cache is not None:
+            inputs = {param: self.get_estimate(param, assumptions) for param in self.consensus}
+            key = ('v1', self.current_revenue, self.net_debt, self.shares_outstanding,
+                   self.current_ad_revenue, answers_key(inputs))
+            cached = self.cache.get(key)
+            if cached is not None:
+                return dict(cached)
+
+        (fair_value, revenue_2027, ebitda_2027, true_ebitda,
+         enterprise_value, equity_value) = project_fair_value(
+            self.get_estimate('revenue_growth_2025_2027', assumptions),
+            self.get_estimate('advertising_revenue_2027', assumptions),
+            self.get_estimate('ebitda_margin_2027', assumptions),
+            self.get_estimate('regulatory_cost_annual', assumptions),
+            self.get_estimate('stock_based_comp_pct', assumptions),
+            self.get_estimate('ebitda_multiple', assumptions),
+            self.current_revenue,
+            self.net_debt,
+            self.shares_outstanding,
+            self.current_ad_revenue,
+        )
+
+        result = {
             'fair_value_per_share': round(fair_value, 2),
             'revenue_2027': round(revenue_2027, 2),
             'ebitda_2027': round(ebitda_2027, 2),
@@ -154,15 +158,65 @@ class UberValuation:
             'equity_value': round(equity_value, 2),
         }
 
+        if self.cache is not None:
+            self.cache.put(key, dict(result))
+        return result
+
+    def calculate_fair_value_batch(self, assumptions):
+        """
+        Vectorized fair value for many scenarios in one pass.
+
+        `assumptions` is a 2-D array with one row per scenario and one column
+        per key in self.consensus (same order as assumption_vector()).
+        Returns a dict of unrounded float64 column arrays with the same keys
+        as calculate_fair_value(); row i matches the scalar model bit-for-bit
+        before rounding.
+        """
+        import numpy as np
+
+        x = np.asarray(assumptions, dtype=np.float64)
+        if x.ndim != 2 or x.shape[1] != len(self.consensus):
+            raise ValueError(
+                f"assumptions must have shape (n, {len(self.consensus)}), got {x.shape}"
+            )
+        columns = dict(zip(self.consensus, x.T))
+
+        (fair_value, revenue_2027, ebitda_2027, true_ebitda,
+         enterprise_value, equity_value) = project_fair_value(
+            columns['revenue_growth_2025_2027'],
+            columns['advertising_revenue_2027'],
+            columns['ebitda_margin_2027'],
+            columns['regulatory_cost_annual'],
+            columns['stock_based_comp_pct'],
+            columns['ebitda_multiple'],
+            self.current_revenue,
+            self.net_debt,
+            self.shares_outstanding,
+            self.current_ad_revenue,
+        )
+
+        return {
+            'fair_value_per_share': fair_value,
+            'revenue_2027': revenue_2027,
+            'ebitda_2027': ebitda_2027,
+            'true_ebitda_2027': true_ebitda,
+            'enterprise_value': enterprise_value,
+            'equity_value': equity_value,
+        }
+
     def update_estimate(self, param, value):
         """
         User updates one estimate
         """
-        old_fv = self.calculate_fair_value()
+        before = self.snapshot()
+        after = before.with_answer(param, value)
+        old_fv = self.calculate_fair_value(before)
+        new_fv = self.calculate_fair_value(after)
 
         self.user_estimates[param] = value
 
-        new_fv = self.calculate_fair_value()
+        if self.history is not None:
+            self.history.record(param, value, new_fv['fair_value_per_share'])
 
         impact = new_fv['fair_value_per_share'] - old_fv['fair_value_per_share']
 
@@ -173,12 +227,21 @@ class UberValuation:
             'impact_pct': round((impact / old_fv['fair_value_per_share']) * 100, 1),
         }
 
-    def get_next_question(self):
+    def get_next_question(self, assumptions=None, adaptive=False):
         """
-        Get the next highest-impact question user hasn't answered
+        Get the next highest-impact question user hasn't answered.
+        adaptive=True picks the one that settles the most fair-value
+        uncertainty given the estimates so far (see valuation_ordering).
         """
+        if adaptive:
+            if self._ranker is None:
+                from valuation_ordering import QuestionRanker
+                self._ranker = QuestionRanker(self)
+            return self._ranker.next_question(assumptions)
+
+        estimates = self.user_estimates if assumptions is None else assumptions
         for q in self.questions:
-            if q['id'] not in self.user_estimates:
+            if q['id'] not in estimates:
                 return q
         return None
 
@@ -192,10 +255,10 @@ class UberValuation:
         print("UBER VALUATION ORACLE")
         print("="*60)
         print(f"\n💰 FAIR VALUE: ${fv['fair_value_per_share']}/share")
-        print(f"\nCurrent market price: ~$75/share (as of Jan 2025)")
+        print(f"\nCurrent market price: ~${self.market_price}/share (as of Jan 2025)")
 
-        diff = fv['fair_value_per_share'] - 75
-        diff_pct = (diff / 75) * 100
+        diff = fv['fair_value_per_share'] - self.market_price
+        diff_pct = (diff / self.market_price) * 100
 
         if diff > 0:
             print(f"📈 UNDERVALUED by ${abs(diff):.2f} ({abs(diff_pct):.1f}%)")
@@ -226,11 +289,39 @@ class UberValuation:
 
         print("\n" + "="*60)
 
+    def fair_value_gradient(self, assumptions=None):
+        """
+        Exact partial derivative and elasticity of fair value with respect
+        to every estimate, in a single forward pass (no bump-and-revalue)
+        """
+        from valuation_sensitivity import seed, gradient_report
+
+        params = list(self.consensus)
+        values = self.assumption_vector(assumptions)
+        x = dict(zip(params, seed(values)))
+
+        fair_value = project_fair_value(
+            x['revenue_growth_2025_2027'],
+            x['advertising_revenue_2027'],
+            x['ebitda_margin_2027'],
+            x['regulatory_cost_annual'],
+            x['stock_based_comp_pct'],
+            x['ebitda_multiple'],
+            self.current_revenue,
+            self.net_debt,
+            self.shares_outstanding,
+            self.current_ad_revenue,
+        )[0]
+
+        return gradient_report(params, values, fair_value)
+
     def sensitivity_analysis(self):
         """
-        Show which estimates matter most
+        Show which estimates matter most: ranked by their exact derivative,
+        with the fair value at -20% / +20% of each revalued exactly
         """
-        base_fv = self.calculate_fair_value()['fair_value_per_share']
+        report = self.fair_value_gradient()
+        snapshot = self.snapshot()
 
         print("\n" + "="*60)
         print("SENSITIVITY ANALYSIS")
@@ -241,51 +332,31 @@ class UberValuation:
 
         for q in self.questions:
             param = q['id']
-            current_value = self.get_estimate(param)
+            g = report['gradient'][param]
 
-            # Test +20% and -20%
-            if 'pct' in param or 'margin' in param or 'growth' in param:
-                # For percentages, add/subtract absolute points
-                high_value = current_value + (current_value * 0.2)
-                low_value = current_value - (current_value * 0.2)
-            else:
-                # For absolute values
-                high_value = current_value * 1.2
-                low_value = current_value * 0.8
-
-            # Calculate impact
-            original = self.user_estimates.get(param)
-
-            self.user_estimates[param] = high_value
-            fv_high = self.calculate_fair_value()['fair_value_per_share']
-
-            self.user_estimates[param] = low_value
-            fv_low = self.calculate_fair_value()['fair_value_per_share']
-
-            # Reset
-            if original is None:
-                self.user_estimates.pop(param, None)
-            else:
-                self.user_estimates[param] = original
-
-            impact_range = fv_high - fv_low
+            # 16 scalar revaluations: cheaper than importing NumPy for a batch
+            fv_low = self.calculate_fair_value(snapshot.with_answer(param, g['value'] * 0.8))['fair_value_per_share']
+            fv_high = self.calculate_fair_value(snapshot.with_answer(param, g['value'] * 1.2))['fair_value_per_share']
 
             sensitivities.append({
                 'question': q['text'][:60] + '...' if len(q['text']) > 60 else q['text'],
                 'param': param,
-                'impact': abs(impact_range),
+                'impact': abs(fv_high - fv_low),
+                'derivative': g['derivative'],
+                'elasticity': g['elasticity'],
                 'low_fv': fv_low,
                 'high_fv': fv_high,
-                'current': current_value,
+                'current': g['value'],
                 'unit': q['unit'],
             })
 
-        # Sort by impact
-        sensitivities.sort(key=lambda x: x['impact'], reverse=True)
+        # Rank by the derivative's effect over the ±20% range
+        sensitivities.sort(key=lambda x: abs(x['derivative'] * x['current']), reverse=True)
 
         for i, s in enumerate(sensitivities[:5], 1):
             print(f"{i}. {s['question']}")
             print(f"   Current estimate: {s['current']}{s['unit']}")
+            print(f"   Each +1{s['unit']}: ${s['derivative']:+.2f}/share (elasticity {s['elasticity']:.2f})")
             print(f"   If -20%: FV = ${s['low_fv']:.2f}")
             print(f"   If +20%: FV = ${s['high_fv']:.2f}")
             print(f"   Impact range: ${s['impact']:.2f}/share")
@@ -295,23 +366,43 @@ class UberValuation:
         print("\n💡 Focus on validating the top 3 estimates above.")
         print("   They drive 70%+ of your valuation uncertainty.\n")
 
+        return sensitivities
+
     def save_state(self, filename='uber_estimates.json'):
         """
-        Save user estimates to file
+        Save user estimates to file (or to the session store, if set)
         """
+        import json
+        from datetime import datetime
+
         data = {
             'timestamp': datetime.now().isoformat(),
             'user_estimates': self.user_estimates,
             'fair_value': self.calculate_fair_value()['fair_value_per_share'],
         }
-        with open(filename, 'w') as f:
-            json.dump(data, f, indent=2)
-        print(f"\n✓ Saved to {filename}")
+        if self.sessions is not None:
+            self.sessions.save(self.user, self.ticker, 'v1', self.user_estimates, data['fair_value'])
+            print(f"\n✓ Saved {self.user}'s {self.ticker} estimates to {self.sessions.path}")
+        else:
+            with open(filename, 'w') as f:
+                json.dump(data, f, indent=2)
+            print(f"\n✓ Saved to {filename}")
+        if self.history is not None:
+            self.history.record(None, None, data['fair_value'])
 
     def load_state(self, filename='uber_estimates.json'):
         """
-        Load user estimates from file
+        Load user estimates from file (or from the session store, if set)
         """
+        if self.sessions is not None:
+            session = self.sessions.load(self.user, self.ticker, 'v1')
+            if session is None:
+                return False
+            self.user_estimates = session['answers']
+            print(f"\n✓ Loaded {len(self.user_estimates)} estimates for {self.user} ({self.ticker})")
+            return True
+
+        import json
         try:
             with open(filename, 'r') as f:
                 data = json.load(f)
@@ -322,11 +413,21 @@ class UberValuation:
             return False
 
 
-def interactive_mode():
+def interactive_mode(user=None):
     """
-    Interactive CLI for daily use
+    Interactive CLI for daily use. With a user name, the session is kept
+    in the shared session store instead of uber_estimates.json.
     """
+    from valuation_history import HistoryStore
+
     model = UberValuation()
+    if user is None:
+        model.history = HistoryStore('uber_estimates.history')
+    else:
+        from valuation_sessions import SessionStore
+        model.sessions = SessionStore()
+        model.user = user
+        model.history = HistoryStore(f'uber_estimates.{user}.history')
 
     # Try to load previous state
     is_first_time = not model.load_state()
@@ -388,7 +489,7 @@ def interactive_mode():
                 is_first_time = False
 
         elif choice == '2':
-            question = model.get_next_question()
+            question = model.get_next_question(adaptive=True)
             if question is None:
                 print("\n" + "="*70)
                 print("✓ YOU'VE ANSWERED ALL 8 QUESTIONS!")
@@ -522,6 +623,26 @@ if __name__ == '__main__':
         print("Ready to use interactively?")
         print("Run: python3 uber_valuation_v1.py (without --demo)")
         print("-"*60 + "\n")
+    elif len(sys.argv) > 1 and sys.argv[1] == 'sweep':
+        from valuation_sweep import main
+        sys.exit(main(sys.argv[2:], 'v1'))
+    elif len(sys.argv) > 1 and sys.argv[1] == 'implied':
+        from valuation_implied import main
+        sys.exit(main(sys.argv[2:], 'v1'))
+    elif len(sys.argv) > 1 and sys.argv[1] == 'charts':
+        from valuation_charts import main
+        sys.exit(main(sys.argv[2:], 'v1'))
+    elif len(sys.argv) > 1 and sys.argv[1] == 'attribute':
+        from valuation_attribution import main
+        sys.exit(main(sys.argv[2:], 'v1'))
+    elif len(sys.argv) > 1 and sys.argv[1] in ('stream', 'publish'):
+        from valuation_stream import main
+        sys.exit(main(sys.argv[1:], 'v1'))
+    elif len(sys.argv) > 1 and sys.argv[1] in ('surface', 'whatif'):
+        from valuation_surfaces import main
+        sys.exit(main(sys.argv[1:], 'v1'))
+    elif len(sys.argv) > 2 and sys.argv[1] == '--user':
+        interactive_mode(user=sys.argv[2])
     else:
         # Go straight to interactive mode
         interactive_mode()
@@ -6,8 +6,171 @@ Roleplay as Uber CEO answering analyst questions.
 Forces concrete beliefs about current reality to remove bias from valuation.
 """
 
-import json
-from datetime import datetime
+import os
+
+from valuation_assumptions import Assumptions
+from valuation_cache import FAIR_VALUE_CACHE, answers_key
+
+# Model inputs read by calculate_fair_value, and the value assumed when a
+# question hasn't been answered (revenue_last_week falls back to last quarter)
+MODEL_DEFAULTS = {
+    'mobility_gmv_growth_mom': 2.0,
+    'delivery_gmv_growth_mom': 1.5,
+    'ebitda_margin_current_quarter': 11.5,
+    'stock_based_comp_run_rate': 750,
+    'regulatory_liabilities_on_books': 800,
+    'advertising_revenue_run_rate': 350,
+    'advertising_margin': 85,
+    'monthly_active_riders_growth': 1.0,
+    'share_buyback_last_quarter': 500,
+}
+
+# Every answer the fair-value model reads
+MODEL_INPUTS = ('revenue_last_week',) + tuple(MODEL_DEFAULTS)
+
+# The same model as a declarative spec (see valuation_spec), used instead
+# of the functions below after UberCEOInterview.load_spec()
+MODEL_SPEC = 'models/uber_v2.json'
+
+# Keys of calculate_fair_value()'s result; a spec's outputs must cover them
+RESULT_KEYS = ('fair_value_per_share', 'annual_revenue', 'true_ebitda', 'enterprise_value',
+               'equity_value', 'multiple_used', 'shares_outstanding')
+
+
+def quarterly_revenue_from_week(revenue_last_week):
+    """Extrapolate last week's revenue ($M) to a quarterly run rate ($B)"""
+    return (revenue_last_week / 1000) * (365/4) / 7
+
+
+def growth_multiple(user_growth):
+    """EBITDA multiple by monthly active rider growth (% MoM)"""
+    if user_growth > 2.0:
+        return 18  # High growth
+    elif user_growth > 1.0:
+        return 15  # Medium growth
+    else:
+        return 12  # Low growth
+
+
+def growth_multiple_batch(user_growth):
+    """growth_multiple for a NumPy array of growth rates"""
+    import numpy as np
+
+    return np.where(user_growth > 2.0, 18.0, np.where(user_growth > 1.0, 15.0, 12.0))
+
+
+# === Pipeline stages (plain arithmetic: floats, NumPy arrays or duals) ===
+
+def annualize_revenue(quarterly_revenue, mobility_growth, delivery_growth):
+    """Annual revenue ($B): run rate compounded 12 months at avg MoM growth"""
+    avg_growth_monthly = (mobility_growth + delivery_growth) / 2
+
+    # Compound 12 months out
+    growth = 1 + avg_growth_monthly/100
+    growth_2 = growth * growth
+    growth_4 = growth_2 * growth_2
+    growth_12 = (growth_4 * growth_4) * growth_4
+    return quarterly_revenue * 4 * growth_12
+
+
+def apply_margin(annual_revenue, ebitda_margin_pct):
+    """Adjusted EBITDA ($B)"""
+    return annual_revenue * (ebitda_margin_pct / 100)
+
+
+def annual_sbc(sbc_run_rate):
+    """Stock-based comp: quarterly $M -> annual $B"""
+    return (sbc_run_rate / 1000) * 4
+
+
+def regulatory_drag(regulatory_liabilities):
+    """Regulatory liabilities on the books: $M -> $B"""
+    return regulatory_liabilities / 1000
+
+
+def advertising_ebitda(ad_run_rate, ad_margin_pct):
+    """Annual advertising EBITDA ($B) from the quarterly run rate ($M)"""
+    return ((ad_run_rate / 1000) * 4) * (ad_margin_pct / 100)
+
+
+def combine_true_ebitda(ebitda, sbc, regulatory_cost, ad_ebitda):
+    """EBITDA after SBC and regulatory costs, plus advertising"""
+    return ebitda - sbc - regulatory_cost + ad_ebitda
+
+
+def apply_multiple(true_ebitda, multiple):
+    """Enterprise value ($B)"""
+    return true_ebitda * multiple
+
+
+def net_of_debt(enterprise_value, net_debt):
+    """Equity value ($B)"""
+    return enterprise_value - net_debt
+
+
+def buyback_adjusted_shares(buyback_run_rate, shares_outstanding, market_price):
+    """Share count (B) after a year of buybacks at last quarter's pace"""
+    shares_bought_back = ((buyback_run_rate / 1000) * 4) / market_price
+    return shares_outstanding - shares_bought_back
+
+
+def per_share_value(equity_value, shares):
+    """Fair value per share ($)"""
+    return equity_value / shares
+
+
+def valuation_action(fair_value, market_price, band=10):
+    """'buy', 'trim' or 'hold': fair value more than $band/share above/below price"""
+    diff = fair_value - market_price
+    if diff > band:
+        return 'buy'
+    elif diff < -band:
+        return 'trim'
+    return 'hold'
+
+
+def project_fair_value(quarterly_revenue, mobility_growth, delivery_growth,
+                       ebitda_margin_pct, sbc_run_rate, regulatory_liabilities,
+                       ad_run_rate, ad_margin_pct, multiple, buyback_run_rate,
+                       shares_outstanding, net_debt, market_price):
+    """
+    The V2 model as plain arithmetic (floats or NumPy arrays).
+
+    Returns unrounded (fair_value_per_share, annual_revenue, true_ebitda,
+    enterprise_value, equity_value, shares_outstanding_adjusted).
+    """
+    # === 2. PROJECT ANNUAL REVENUE ===
+    annual_revenue = annualize_revenue(quarterly_revenue, mobility_growth, delivery_growth)
+
+    # === 3. CALCULATE TRUE EBITDA ===
+    ebitda = apply_margin(annual_revenue, ebitda_margin_pct)
+
+    # Subtract stock-based comp (REAL cost)
+    sbc = annual_sbc(sbc_run_rate)
+
+    # Subtract regulatory costs (current liabilities)
+    regulatory_cost = regulatory_drag(regulatory_liabilities)
+
+    # === 4. ADD HIGH-MARGIN ADVERTISING ===
+    ad_ebitda = advertising_ebitda(ad_run_rate, ad_margin_pct)
+
+    true_ebitda = combine_true_ebitda(ebitda, sbc, regulatory_cost, ad_ebitda)
+
+    # === 5. APPLY MULTIPLE ===
+    enterprise_value = apply_multiple(true_ebitda, multiple)
+
+    # === 6. SUBTRACT DEBT, ADD BUYBACK IMPACT ===
+    equity_value = net_of_debt(enterprise_value, net_debt)
+
+    # Account for buybacks (reduces share count)
+    shares_outstanding_adjusted = buyback_adjusted_shares(buyback_run_rate, shares_outstanding, market_price)
+
+    # === 7. PER SHARE VALUE ===
+    fair_value_per_share = per_share_value(equity_value, shares_outstanding_adjusted)
+
+    return (fair_value_per_share, annual_revenue, true_ebitda,
+            enterprise_value, equity_value, shares_outstanding_adjusted)
+
 
 class UberCEOInterview:
     def __init__(self):
@@ -23,297 +186,38 @@ class UberCEOInterview:
         # Question library
         self.questions = self._build_ceo_questions()
 
+        # Incremental fair-value graph (built on first update_answer)
+        self._graph = None
+
+        # Shared fair-value cache (set to None to disable)
+        self.cache = FAIR_VALUE_CACHE
+
+        # Optional valuation_history.HistoryStore; records every change
+        self.history = None
+
+        # valuation_ordering.QuestionRanker (built on first adaptive get_next_question)
+        self._ranker = None
+
+        # Optional valuation_sessions.SessionStore; save/load_state use it
+        # (keyed by user and ticker) instead of the JSON file when set
+        self.sessions = None
+        self.user = 'default'
+        self.ticker = 'UBER'
+
+        # Optional valuation_spec.CompiledSpec (set by load_spec); when set,
+        # formulas and defaults come from it instead of the pipeline above
+        self.spec = None
+        # VALUATION_SPEC=path loads one into every interview (--spec sets it)
+        if os.environ.get('VALUATION_SPEC'):
+            self.load_spec(os.environ['VALUATION_SPEC'])
+
     def _build_ceo_questions(self):
         """
         Questions a Goldman analyst would ask Uber CEO in private meeting.
         These are things only insiders know RIGHT NOW.
         """
-        return [
-            # === REVENUE & GROWTH (Current Reality) ===
-            {
-                'id': 'revenue_last_week',
-                'category': 'Revenue & Growth',
-                'text': 'What was Uber\'s total revenue last week?',
-                'context': 'Last quarter: $9.3B over 90 days = ~$103M/day. Current run rate tells if Q4 will beat/miss.',
-                'unit': '$M',
-                'baseline': 103 * 7,  # ~$721M per week
-                'impact_weight': 8,
-            },
-            {
-                'id': 'mobility_gmv_growth_mom',
-                'category': 'Revenue & Growth',
-                'text': 'What is Mobility GMV growth rate month-over-month right now?',
-                'context': 'Are rides accelerating or decelerating vs last month?',
-                'unit': '%',
-                'baseline': 2.0,  # 2% MoM = ~27% YoY
-                'impact_weight': 7,
-            },
-            {
-                'id': 'delivery_gmv_growth_mom',
-                'category': 'Revenue & Growth',
-                'text': 'What is Delivery GMV growth rate month-over-month right now?',
-                'context': 'Is Uber Eats growing faster or slower than last month?',
-                'unit': '%',
-                'baseline': 1.5,  # 1.5% MoM = ~20% YoY
-                'impact_weight': 7,
-            },
-
-            # === UNIT ECONOMICS (Real Take Rates & Margins) ===
-            {
-                'id': 'mobility_take_rate_current',
-                'category': 'Unit Economics',
-                'text': 'What is the ACTUAL Mobility take rate this week (after driver incentives)?',
-                'context': 'Public filings show ~24%, but what\'s the TRUE rate after all promotions?',
-                'unit': '%',
-                'baseline': 24.0,
-                'impact_weight': 9,
-            },
-            {
-                'id': 'delivery_take_rate_current',
-                'category': 'Unit Economics',
-                'text': 'What is the ACTUAL Delivery take rate this week (after restaurant incentives)?',
-                'context': 'Public filings show ~23%, but what\'s the TRUE rate after all promotions?',
-                'unit': '%',
-                'baseline': 23.0,
-                'impact_weight': 9,
-            },
-            {
-                'id': 'contribution_margin_mobility',
-                'category': 'Unit Economics',
-                'text': 'What is contribution margin on Mobility rides right now (after insurance, support)?',
-                'context': 'Revenue minus direct variable costs per ride.',
-                'unit': '%',
-                'baseline': 65,
-                'impact_weight': 8,
-            },
-            {
-                'id': 'contribution_margin_delivery',
-                'category': 'Unit Economics',
-                'text': 'What is contribution margin on Delivery orders right now (after support, fraud)?',
-                'context': 'Revenue minus direct variable costs per order.',
-                'unit': '%',
-                'baseline': 55,
-                'impact_weight': 8,
-            },
-
-            # === MARKET POSITION (Current Competitive Reality) ===
-            {
-                'id': 'us_rideshare_market_share',
-                'category': 'Market Position',
-                'text': 'What is Uber\'s ACTUAL rideshare market share in the US right now?',
-                'context': 'Versus Lyft. What % of all ride-hailing trips are Uber?',
-                'unit': '%',
-                'baseline': 74,
-                'impact_weight': 6,
-            },
-            {
-                'id': 'us_delivery_market_share',
-                'category': 'Market Position',
-                'text': 'What is Uber Eats ACTUAL market share in US food delivery right now?',
-                'context': 'Versus DoorDash, Grubhub. What % of all food delivery orders?',
-                'unit': '%',
-                'baseline': 25,
-                'impact_weight': 6,
-            },
-            {
-                'id': 'doordash_pricing_vs_uber',
-                'category': 'Market Position',
-                'text': 'How much cheaper/expensive is DoorDash than Uber Eats on average right now?',
-                'context': 'For same restaurant, same order. Positive = DoorDash more expensive.',
-                'unit': '%',
-                'baseline': -5,  # DoorDash 5% cheaper
-                'impact_weight': 5,
-            },
-
-            # === PROFITABILITY (True Economics) ===
-            {
-                'id': 'stock_based_comp_run_rate',
-                'category': 'Profitability',
-                'text': 'What is quarterly stock-based compensation run rate RIGHT NOW?',
-                'context': 'This is a REAL cost (dilutes shareholders). What\'s the current quarterly burn?',
-                'unit': '$M',
-                'baseline': 750,  # ~$3B/year
-                'impact_weight': 10,
-            },
-            {
-                'id': 'ebitda_margin_current_quarter',
-                'category': 'Profitability',
-                'text': 'What will adjusted EBITDA margin be THIS quarter?',
-                'context': 'Before stock-based comp. Last quarter was ~11%. Is it improving?',
-                'unit': '%',
-                'baseline': 11.5,
-                'impact_weight': 10,
-            },
-            {
-                'id': 'true_profit_margin_current',
-                'category': 'Profitability',
-                'text': 'What is TRUE profit margin this quarter (EBITDA minus stock-based comp)?',
-                'context': 'This is what actually flows to shareholders after dilution.',
-                'unit': '%',
-                'baseline': 3.0,  # 11.5% EBITDA - 8% SBC
-                'impact_weight': 10,
-            },
-
-            # === CHURN & RETENTION (User/Driver Health) ===
-            {
-                'id': 'monthly_active_riders_growth',
-                'category': 'Churn & Retention',
-                'text': 'What is monthly active platform consumer growth rate (MoM)?',
-                'context': 'Are you gaining or losing users vs last month?',
-                'unit': '%',
-                'baseline': 1.0,  # 1% MoM = 12.7% YoY
-                'impact_weight': 7,
-            },
-            {
-                'id': 'driver_churn_rate_monthly',
-                'category': 'Churn & Retention',
-                'text': 'What % of active drivers churn each month?',
-                'context': 'How many drivers who drove last month won\'t drive this month?',
-                'unit': '%',
-                'baseline': 8,
-                'impact_weight': 5,
-            },
-            {
-                'id': 'trips_per_active_user_mom',
-                'category': 'Churn & Retention',
-                'text': 'Are trips per active user increasing or decreasing vs last month?',
-                'context': 'Positive = users taking more trips. Negative = frequency declining.',
-                'unit': '%',
-                'baseline': 0.5,  # Slight increase
-                'impact_weight': 6,
-            },
-
-            # === REGULATORY & RISK (Current Exposure) ===
-            {
-                'id': 'regulatory_liabilities_on_books',
-                'category': 'Regulatory & Risk',
-                'text': 'What are total outstanding regulatory liabilities on the balance sheet RIGHT NOW?',
-                'context': 'CA AB5, UK employment cases, EU regulations. What\'s accrued/reserved today?',
-                'unit': '$M',
-                'baseline': 800,
-                'impact_weight': 6,
-            },
-            {
-                'id': 'insurance_cost_trend',
-                'category': 'Regulatory & Risk',
-                'text': 'Is insurance cost per trip increasing or decreasing vs last quarter?',
-                'context': 'Claims, accidents, fraud. Are costs going up or down?',
-                'unit': '%',
-                'baseline': 2,  # 2% increase
-                'impact_weight': 5,
-            },
-
-            # === CAPITAL ALLOCATION (Current Spending) ===
-            {
-                'id': 'share_buyback_last_quarter',
-                'category': 'Capital Allocation',
-                'text': 'How much did Uber spend on share buybacks last quarter?',
-                'context': 'Announced $7B authorization. What was the ACTUAL buyback amount last quarter?',
-                'unit': '$M',
-                'baseline': 500,  # $500M per quarter
-                'impact_weight': 7,
-            },
-            {
-                'id': 'capex_run_rate',
-                'category': 'Capital Allocation',
-                'text': 'What is quarterly capex run rate right now?',
-                'context': 'Data centers, office space, infrastructure. What are you spending?',
-                'unit': '$M',
-                'baseline': 100,
-                'impact_weight': 3,
-            },
-
-            # === AUTONOMOUS VEHICLES (Current Reality) ===
-            {
-                'id': 'waymo_market_share_phoenix',
-                'category': 'Autonomous Vehicles',
-                'text': 'What % of rideshare trips in Phoenix are now Waymo (not Uber/Lyft)?',
-                'context': 'Phoenix is Waymo\'s biggest market. How much share have they taken?',
-                'unit': '%',
-                'baseline': 5,
-                'impact_weight': 4,
-            },
-            {
-                'id': 'autonomous_rides_on_uber_current',
-                'category': 'Autonomous Vehicles',
-                'text': 'What % of Uber rides THIS WEEK are autonomous (Waymo partnership)?',
-                'context': 'Uber partners with Waymo in some cities. What % of total Uber rides are AV right now?',
-                'unit': '%',
-                'baseline': 0.1,  # Very small currently
-                'impact_weight': 3,
-            },
-
-            # === ADVERTISING & NEW REVENUE ===
-            {
-                'id': 'advertising_revenue_run_rate',
-                'category': 'Advertising & New Revenue',
-                'text': 'What is quarterly advertising revenue run rate RIGHT NOW?',
-                'context': 'Restaurant ads, promoted listings. Last quarter was ~$300M. Growing?',
-                'unit': '$M',
-                'baseline': 350,
-                'impact_weight': 7,
-            },
-            {
-                'id': 'advertising_margin',
-                'category': 'Advertising & New Revenue',
-                'text': 'What is gross margin on advertising revenue?',
-                'context': 'Almost pure profit, or do you have real costs to serve ads?',
-                'unit': '%',
-                'baseline': 85,
-                'impact_weight': 6,
-            },
-
-            # === COMPETITIVE DYNAMICS ===
-            {
-                'id': 'driver_switching_to_doordash',
-                'category': 'Competitive Dynamics',
-                'text': 'What % of Uber Eats drivers also drive for DoorDash?',
-                'context': 'Multi-homing weakens your pricing power with drivers.',
-                'unit': '%',
-                'baseline': 60,
-                'impact_weight': 4,
-            },
-            {
-                'id': 'consumer_switching_apps',
-                'category': 'Competitive Dynamics',
-                'text': 'What % of Uber Eats users also use DoorDash regularly?',
-                'context': 'Multi-homing weakens pricing power with consumers.',
-                'unit': '%',
-                'baseline': 40,
-                'impact_weight': 4,
-            },
-
-            # === INTERNATIONAL EXPOSURE ===
-            {
-                'id': 'international_revenue_pct',
-                'category': 'International',
-                'text': 'What % of total revenue is from outside US+Canada right now?',
-                'context': 'International growth vs US maturity. Where is the future?',
-                'unit': '%',
-                'baseline': 35,
-                'impact_weight': 5,
-            },
-            {
-                'id': 'international_margin_vs_us',
-                'category': 'International',
-                'text': 'How much lower are international margins vs US margins?',
-                'context': 'Negative = international is less profitable. E.g., -500 bps = 5% lower.',
-                'unit': 'bps',
-                'baseline': -300,  # 3% lower
-                'impact_weight': 5,
-            },
-
-            # === FREIGHT & OTHER BETS ===
-            {
-                'id': 'freight_quarterly_revenue',
-                'category': 'Other Bets',
-                'text': 'What is Uber Freight revenue THIS quarter?',
-                'context': 'Trucking logistics. Is it growing or dying?',
-                'unit': '$M',
-                'baseline': 300,
-                'impact_weight': 2,
-            },
-        ]
+        from valuation_questions import load_questions
+        return load_questions('v2')
 
     def get_question(self, idx):
         """Get question by index"""
@@ -321,79 +225,158 @@ class UberCEOInterview:
             return self.questions[idx]
         return None
 
+    def snapshot(self):
+        """Current answers as an immutable Assumptions"""
+        return Assumptions(self.answers)
+
+    def get_next_question(self, assumptions=None, adaptive=False):
+        """
+        First question not yet answered (None when the interview is done).
+        adaptive=True picks the one that settles the most fair-value
+        uncertainty given the answers so far (see valuation_ordering).
+        """
+        if adaptive:
+            if self._ranker is None:
+                from valuation_ordering import QuestionRanker
+                self._ranker = QuestionRanker(self)
+            return self._ranker.next_question(assumptions)
+
+        answers = self.answers if assumptions is None else assumptions
+        for q in self.questions:
+            if q['id'] not in answers:
+                return q
+        return None
+
     def answer_question(self, question_id, value):
         """Record answer to a question"""
         self.answers[question_id] = value
+        if self._graph is not None:
+            self._graph.set_input(question_id, value)
+        if self.history is not None:
+            self.history.record(question_id, value, self.calculate_fair_value()['fair_value_per_share'])
 
-    def calculate_fair_value(self):
+    def update_answer(self, question_id, value):
         """
-        Calculate fair value based on CEO's answers.
-        This is a simplified model - real analysts use multi-page Excel.
+        Change one answer, recomputing only the parts of the valuation it
+        touches. Reports the fair value before/after and which nodes of the
+        pipeline were dirtied.
         """
+        from valuation_graph import ValuationGraph
 
-        # === 1. ESTIMATE CURRENT QUARTERLY REVENUE ===
-        if 'revenue_last_week' in self.answers:
-            current_quarterly_revenue = (self.answers['revenue_last_week'] / 1000) * (365/4) / 7
+        if self._graph is None:
+            self._graph = ValuationGraph.from_interview(self)
         else:
-            current_quarterly_revenue = self.last_quarter_revenue
-
-        # === 2. PROJECT ANNUAL REVENUE ===
-        mobility_growth = self.answers.get('mobility_gmv_growth_mom', 2.0)
-        delivery_growth = self.answers.get('delivery_gmv_growth_mom', 1.5)
-        avg_growth_monthly = (mobility_growth + delivery_growth) / 2
-
-        # Compound 12 months out
-        annual_revenue = current_quarterly_revenue * 4 * ((1 + avg_growth_monthly/100) ** 12)
+            self._graph.sync(self)
+        old_fv = self._graph.result()['fair_value_per_share']
 
-        # === 3. CALCULATE TRUE EBITDA ===
-        ebitda_margin_pct = self.answers.get('ebitda_margin_current_quarter', 11.5)
-        ebitda = annual_revenue * (ebitda_margin_pct / 100)
+        self.answers[question_id] = value
+        dirtied = self._graph.set_input(question_id, value)
+        new_fv = self._graph.result()['fair_value_per_share']
 
-        # Subtract stock-based comp (REAL cost)
-        sbc_quarterly = self.answers.get('stock_based_comp_run_rate', 750) / 1000  # Convert to $B
-        sbc_annual = sbc_quarterly * 4
+        if self.history is not None:
+            self.history.record(question_id, value, new_fv)
 
-        true_ebitda = ebitda - sbc_annual
+        return {
+            'old_fair_value': old_fv,
+            'new_fair_value': new_fv,
+            'impact': round(new_fv - old_fv, 2),
+            'dirtied': sorted(dirtied),
+            'recomputed': list(self._graph.recomputed),
+        }
 
-        # Subtract regulatory costs (current liabilities)
-        regulatory_cost = self.answers.get('regulatory_liabilities_on_books', 800) / 1000
-        true_ebitda -= regulatory_cost
+    def load_spec(self, path=MODEL_SPEC):
+        """Value through a declarative model spec instead of the built-in formulas"""
+        from valuation_spec import compile_spec, load_spec
 
-        # === 4. ADD HIGH-MARGIN ADVERTISING ===
-        ad_revenue_quarterly = self.answers.get('advertising_revenue_run_rate', 350) / 1000
-        ad_revenue_annual = ad_revenue_quarterly * 4
-        ad_margin = self.answers.get('advertising_margin', 85) / 100
+        spec = compile_spec(load_spec(path), outputs=RESULT_KEYS)
+        self.spec = spec
+        self._graph = None
+        return spec
 
-        ad_ebitda = ad_revenue_annual * ad_margin
-        true_ebitda += ad_ebitda
+    def facts(self):
+        """Company facts by name (for a spec's fact inputs)"""
+        return {
+            'last_quarter_revenue': self.last_quarter_revenue,
+            'shares_outstanding': self.shares_outstanding,
+            'net_debt': self.net_debt,
+            'market_price': self.market_price,
+        }
 
-        # === 5. APPLY MULTIPLE ===
-        # Multiple depends on growth and market position
-        user_growth = self.answers.get('monthly_active_riders_growth', 1.0)
+    def model_input(self, question_id, assumptions=None):
+        """
+        Answer if given, else the default the model assumes. Answers come
+        from `assumptions` if given, else self.answers.
+        """
+        answers = self.answers if assumptions is None else assumptions
+        if question_id in answers:
+            return answers[question_id]
+        if question_id == 'revenue_last_week':
+            # Weekly revenue implied by last quarter's actual
+            return self.last_quarter_revenue * 1000 * 7 / (365/4)
+        if self.spec is not None:
+            return self.spec.defaults.get(question_id)
+        return MODEL_DEFAULTS[question_id]
+
+    def calculate_fair_value(self, assumptions=None):
+        """
+        Calculate fair value based on CEO's answers (or an Assumptions
+        snapshot, which leaves the interview untouched).
+        This is a simplified model - real analysts use multi-page Excel.
+        """
+        answers = self.answers if assumptions is None else assumptions
+        spec = self.spec
+
+        if self.cache is not None:
+            inputs = {q: self.model_input(q, answers) for q in (MODEL_INPUTS if spec is None else spec.inputs)}
+            key = ('v2' if spec is None else f'v2:{spec.version}', self.last_quarter_revenue,
+                   self.shares_outstanding, self.net_debt, self.market_price, answers_key(inputs))
+            cached = self.cache.get(key)
+            if cached is not None:
+                return dict(cached)
+
+        if spec is not None:
+            # Outputs come back in RESULT_KEYS order
+            (fair_value_per_share, annual_revenue, true_ebitda, enterprise_value,
+             equity_value, multiple, shares_outstanding_adjusted) = spec.from_mappings(answers, self.facts())
+            result = {
+                'fair_value_per_share': round(fair_value_per_share, 2),
+                'annual_revenue': round(annual_revenue, 2),
+                'true_ebitda': round(true_ebitda, 2),
+                'enterprise_value': round(enterprise_value, 2),
+                'equity_value': round(equity_value, 2),
+                'multiple_used': multiple,
+                'shares_outstanding': round(shares_outstanding_adjusted, 3),
+            }
+            if self.cache is not None:
+                self.cache.put(key, dict(result))
+            return result
 
-        if user_growth > 2.0:
-            multiple = 18  # High growth
-        elif user_growth > 1.0:
-            multiple = 15  # Medium growth
+        # === 1. ESTIMATE CURRENT QUARTERLY REVENUE ===
+        if 'revenue_last_week' in answers:
+            current_quarterly_revenue = quarterly_revenue_from_week(answers['revenue_last_week'])
         else:
-            multiple = 12  # Low growth
-
-        enterprise_value = true_ebitda * multiple
-
-        # === 6. SUBTRACT DEBT, ADD BUYBACK IMPACT ===
-        equity_value = enterprise_value - self.net_debt
-
-        # Account for buybacks (reduces share count)
-        # Project annual buyback from last quarter's run rate
-        buyback_quarterly = self.answers.get('share_buyback_last_quarter', 500) / 1000  # Convert to $B
-        buyback_annual = buyback_quarterly * 4
-        shares_bought_back = buyback_annual / self.market_price
-        shares_outstanding_adjusted = self.shares_outstanding - shares_bought_back
-
-        # === 7. PER SHARE VALUE ===
-        fair_value_per_share = equity_value / shares_outstanding_adjusted
+            current_quarterly_revenue = self.last_quarter_revenue
 
-        return {
+        multiple = growth_multiple(self.model_input('monthly_active_riders_growth', answers))
+
+        (fair_value_per_share, annual_revenue, true_ebitda, enterprise_value,
+         equity_value, shares_outstanding_adjusted) = project_fair_value(
+            current_quarterly_revenue,
+            self.model_input('mobility_gmv_growth_mom', answers),
+            self.model_input('delivery_gmv_growth_mom', answers),
+            self.model_input('ebitda_margin_current_quarter', answers),
+            self.model_input('stock_based_comp_run_rate', answers),
+            self.model_input('regulatory_liabilities_on_books', answers),
+            self.model_input('advertising_revenue_run_rate', answers),
+            self.model_input('advertising_margin', answers),
+            multiple,
+            self.model_input('share_buyback_last_quarter', answers),
+            self.shares_outstanding,
+            self.net_debt,
+            self.market_price,
+        )
+
+        result = {
             'fair_value_per_share': round(fair_value_per_share, 2),
             'annual_revenue': round(annual_revenue, 2),
             'true_ebitda': round(true_ebitda, 2),
@@ -403,6 +386,90 @@ class UberCEOInterview:
             'shares_outstanding': round(shares_outstanding_adjusted, 3),
         }
 
+        if self.cache is not None:
+            self.cache.put(key, dict(result))
+        return result
+
+    def calculate_fair_value_batch(self, inputs):
+        """
+        Vectorized fair value over many draws/scenarios.
+
+        `inputs` maps question ids to arrays (or scalars) that broadcast
+        together; any model input not given falls back to the current
+        answer, then to the model default. Returns unrounded arrays with
+        the same keys as calculate_fair_value().
+        """
+        import numpy as np
+
+        if self.spec is not None:
+            columns = dict(self.answers)
+            columns.update(inputs)
+            return self.spec.evaluate_batch(columns, self.facts())
+
+        def column(question_id):
+            if question_id in inputs:
+                return np.asarray(inputs[question_id], dtype=np.float64)
+            if question_id in self.answers:
+                return np.float64(self.answers[question_id])
+            return np.float64(MODEL_DEFAULTS[question_id])
+
+        if 'revenue_last_week' in inputs or 'revenue_last_week' in self.answers:
+            current_quarterly_revenue = quarterly_revenue_from_week(column('revenue_last_week'))
+        else:
+            current_quarterly_revenue = np.float64(self.last_quarter_revenue)
+
+        multiple = growth_multiple_batch(column('monthly_active_riders_growth'))
+
+        (fair_value_per_share, annual_revenue, true_ebitda, enterprise_value,
+         equity_value, shares_outstanding_adjusted) = np.broadcast_arrays(*project_fair_value(
+            current_quarterly_revenue,
+            column('mobility_gmv_growth_mom'),
+            column('delivery_gmv_growth_mom'),
+            column('ebitda_margin_current_quarter'),
+            column('stock_based_comp_run_rate'),
+            column('regulatory_liabilities_on_books'),
+            column('advertising_revenue_run_rate'),
+            column('advertising_margin'),
+            multiple,
+            column('share_buyback_last_quarter'),
+            self.shares_outstanding,
+            self.net_debt,
+            self.market_price,
+        ))
+
+        return {
+            'fair_value_per_share': fair_value_per_share,
+            'annual_revenue': annual_revenue,
+            'true_ebitda': true_ebitda,
+            'enterprise_value': enterprise_value,
+            'equity_value': equity_value,
+            'multiple_used': np.broadcast_to(multiple, fair_value_per_share.shape),
+            'shares_outstanding': shares_outstanding_adjusted,
+        }
+
+    def monte_carlo(self, distributions, draws=100_000, seed=None,
+                    percentiles=(5, 10, 25, 50, 75, 90, 95), block_size=250_000):
+        """
+        Fair value percentiles when answers are distributions, not numbers.
+
+        `distributions` maps question ids to a number or a distribution spec
+        (see valuation_montecarlo.draw). Unlisted questions use the current
+        answer. Draws are evaluated in vectorized blocks of `block_size`.
+        """
+        import numpy as np
+        from valuation_montecarlo import draw, summarize
+
+        rng = np.random.default_rng(seed)
+        fair_values = np.empty(draws, dtype=np.float64)
+
+        for start in range(0, draws, block_size):
+            n = min(block_size, draws - start)
+            sampled = {qid: draw(spec, n, rng) for qid, spec in distributions.items()}
+            block = self.calculate_fair_value_batch(sampled)['fair_value_per_share']
+            fair_values[start:start + n] = block
+
+        return summarize(fair_values, percentiles, self.market_price)
+
     def show_valuation(self):
         """Display current valuation based on answers"""
         val = self.calculate_fair_value()
@@ -416,13 +483,14 @@ class UberCEOInterview:
 
         diff = val['fair_value_per_share'] - self.market_price
         diff_pct = (diff / self.market_price) * 100
+        action = valuation_action(val['fair_value_per_share'], self.market_price)
 
-        if diff > 10:
+        if action == 'buy':
             print(f"\n📈 UNDERVALUED by ${abs(diff):.2f} ({abs(diff_pct):.1f}%)")
             print(f"   → Based on YOUR beliefs, Uber should trade at ${val['fair_value_per_share']}")
             print(f"   → Your $1M position is actually worth ${1 + (diff_pct/100):.2f}M")
             print(f"\n🎯 ACTION: Consider buying more")
-        elif diff < -10:
+        elif action == 'trim':
             print(f"\n📉 OVERVALUED by ${abs(diff):.2f} ({abs(diff_pct):.1f}%)")
             print(f"   → Based on YOUR beliefs, Uber should trade at ${val['fair_value_per_share']}")
             print(f"   → Your $1M position is actually worth ${1 + (diff_pct/100):.2f}M")
@@ -441,9 +509,103 @@ class UberCEOInterview:
 
         print("\n" + "="*70)
 
+    def fair_value_gradient(self, assumptions=None):
+        """
+        Exact partial derivative and elasticity of fair value with respect
+        to every model input, in a single forward pass.
+
+        The growth-based multiple is a step function, so its derivative is
+        zero; the fair value at each multiple is reported under 'steps'.
+        """
+        from valuation_sensitivity import Dual, seed, gradient_report
+
+        # Unanswered revenue_last_week takes the value implied by last quarter,
+        # so its derivative is still meaningful before it's answered
+        answers = self.answers if assumptions is None else assumptions
+        if self.spec is not None:
+            return self._spec_gradient(answers)
+        names = list(MODEL_INPUTS)
+        values = [self.model_input(qid, answers) for qid in names]
+        x = dict(zip(names, seed(values)))
+
+        if 'revenue_last_week' in answers:
+            current_quarterly_revenue = quarterly_revenue_from_week(x['revenue_last_week'])
+        else:
+            current_quarterly_revenue = Dual(self.last_quarter_revenue,
+                                             quarterly_revenue_from_week(x['revenue_last_week']).grad)
+
+        multiple = growth_multiple(x['monthly_active_riders_growth'])
+
+        (fair_value, _, true_ebitda, _, _, shares_outstanding_adjusted) = project_fair_value(
+            current_quarterly_revenue,
+            x['mobility_gmv_growth_mom'],
+            x['delivery_gmv_growth_mom'],
+            x['ebitda_margin_current_quarter'],
+            x['stock_based_comp_run_rate'],
+            x['regulatory_liabilities_on_books'],
+            x['advertising_revenue_run_rate'],
+            x['advertising_margin'],
+            multiple,
+            x['share_buyback_last_quarter'],
+            self.shares_outstanding,
+            self.net_debt,
+            self.market_price,
+        )
+
+        report = gradient_report(names, values, fair_value)
+        report['steps'] = {
+            m: (true_ebitda.value * m - self.net_debt) / shares_outstanding_adjusted.value
+            for m in (12, 15, 18)
+        }
+        return report
+
+    def _spec_gradient(self, answers):
+        """fair_value_gradient through the spec's scalar function"""
+        from valuation_sensitivity import Dual, seed, gradient_report
+
+        spec = self.spec
+        facts = self.facts()
+        names = [qid for qid in spec.inputs
+                 if qid in answers or qid in spec.defaults or qid == 'revenue_last_week']
+        values = [self.model_input(qid, answers) for qid in names]
+        fair_value = spec.evaluate(dict(zip(names, seed(values))), facts)['fair_value_per_share']
+
+        # Seeding every input takes the answered branch of answered() rules;
+        # keep that slope but the value the unanswered branch gives
+        exact = spec.evaluate(answers, facts)['fair_value_per_share']
+        report = gradient_report(names, values, Dual(exact, fair_value.grad))
+
+        report['steps'] = {}
+        if 'monthly_active_riders_growth' in spec.inputs:
+            for growth in (1.0, 2.0, 2.0 + 1e-9):
+                step = spec.evaluate(dict(answers, monthly_active_riders_growth=growth), facts)
+                report['steps'][step['multiple_used']] = step['fair_value_per_share']
+        return report
+
     def sensitivity_analysis(self):
-        """Show which beliefs matter most"""
-        base_val = self.calculate_fair_value()['fair_value_per_share']
+        """
+        Show which beliefs matter most: ranked by their exact derivative,
+        with the fair value at -20% / +20% of each answer revalued exactly
+        (one batch call for all of them)
+        """
+        import numpy as np
+
+        answers = self.snapshot()
+        report = self.fair_value_gradient(answers)
+        base_val = report['fair_value']
+
+        inputs = MODEL_INPUTS if self.spec is None else self.spec.inputs
+        tested = [q['id'] for q in self.questions if q['id'] in answers and q['id'] in inputs]
+        columns = {qid: np.full(2 * len(tested), float(answers[qid])) for qid in tested}
+        for i, qid in enumerate(tested):
+            columns[qid][2 * i] *= 0.8
+            columns[qid][2 * i + 1] *= 1.2
+        revalued = {}
+        if tested:
+            values = self.calculate_fair_value_batch(columns)['fair_value_per_share']
+            # Rounded like calculate_fair_value, which the batch matches exactly
+            revalued = {qid: (round(float(values[2 * i]), 2), round(float(values[2 * i + 1]), 2))
+                        for i, qid in enumerate(tested)}
 
         print("\n" + "="*70)
         print("SENSITIVITY: Which Beliefs Drive Your Valuation?")
@@ -453,34 +615,36 @@ class UberCEOInterview:
         impacts = []
 
         for q in self.questions:
-            if q['id'] not in self.answers:
+            if q['id'] not in answers:
                 continue
 
-            original = self.answers[q['id']]
-
-            # Test +20%
-            self.answers[q['id']] = original * 1.2
-            val_high = self.calculate_fair_value()['fair_value_per_share']
+            original = answers[q['id']]
 
-            # Test -20%
-            self.answers[q['id']] = original * 0.8
-            val_low = self.calculate_fair_value()['fair_value_per_share']
-
-            # Restore
-            self.answers[q['id']] = original
+            if q['id'] == 'monthly_active_riders_growth' and report['steps']:
+                # Only moves the multiple, which jumps at 1% and 2% MoM
+                rank = abs(report['steps'][growth_multiple(original * 1.2)]
+                           - report['steps'][growth_multiple(original * 0.8)])
+            elif q['id'] in report['gradient']:
+                rank = abs(report['gradient'][q['id']]['derivative'] * original * 0.4)
+            else:
+                rank = 0.0
+            # Answers that aren't (yet) inputs to the fair-value model don't move it
+            val_low, val_high = revalued.get(q['id'], (round(base_val, 2), round(base_val, 2)))
 
             impact_range = val_high - val_low
 
             impacts.append({
                 'question': q['text'][:55] + '...' if len(q['text']) > 55 else q['text'],
+                'param': q['id'],
                 'current': f"{original}{q['unit']}",
                 'impact': abs(impact_range),
                 'low': val_low,
                 'high': val_high,
+                'rank': rank,
             })
 
-        # Sort by impact
-        impacts.sort(key=lambda x: x['impact'], reverse=True)
+        # Rank by the derivative's effect over the ±20% range
+        impacts.sort(key=lambda x: x['rank'], reverse=True)
 
         for i, imp in enumerate(impacts[:8], 1):
             print(f"{i}. {imp['question']}")
@@ -493,32 +657,79 @@ class UberCEOInterview:
         print("\n💡 Focus on validating your top 5 answers above.")
         print("   These drive 80%+ of your valuation.\n")
 
+        return impacts
+
     def save_state(self, filename='uber_ceo_interview.json'):
-        """Save answers"""
+        """Save answers (to the session store, if set)"""
+        import json
+        from datetime import datetime
+
         data = {
             'timestamp': datetime.now().isoformat(),
             'answers': self.answers,
             'fair_value': self.calculate_fair_value()['fair_value_per_share'],
         }
-        with open(filename, 'w') as f:
-            json.dump(data, f, indent=2)
-        print(f"\n✓ Saved {len(self.answers)} answers to {filename}")
+        if self.sessions is not None:
+            self.sessions.save(self.user, self.ticker, 'v2', self.answers, data['fair_value'])
+            print(f"\n✓ Saved {len(self.answers)} answers for {self.user} ({self.ticker}) to {self.sessions.path}")
+        else:
+            with open(filename, 'w') as f:
+                json.dump(data, f, indent=2)
+            print(f"\n✓ Saved {len(self.answers)} answers to {filename}")
+        if self.history is not None:
+            self.history.record(None, None, data['fair_value'])
 
     def load_state(self, filename='uber_ceo_interview.json'):
-        """Load previous answers"""
+        """Load previous answers (from the session store, if set)"""
+        if self.sessions is not None:
+            session = self.sessions.load(self.user, self.ticker, 'v2')
+            if session is None:
+                return False
+            self.answers = session['answers']
+            self._graph = None
+            print(f"\n✓ Loaded {len(self.answers)} previous answers for {self.user} ({self.ticker})")
+            return True
+
+        import json
         try:
             with open(filename, 'r') as f:
                 data = json.load(f)
             self.answers = data['answers']
+            self._graph = None
             print(f"\n✓ Loaded {len(self.answers)} previous answers")
             return True
         except FileNotFoundError:
             return False
 
 
-def interactive_interview():
-    """Run the CEO interview"""
+# Menu entries; anything else typed at the menu is counted as 'other'
+MENU_CHOICES = ('1', '2', '3', '4', '5', '6', 'q')
+
+
+def interactive_interview(user=None, spec=None):
+    """
+    Run the CEO interview. With a user name, the session is kept in the
+    shared session store instead of uber_ceo_interview.json. With a spec
+    path, the model comes from that file (see valuation_spec).
+    """
+    import sys
+
+    from valuation_history import HistoryStore
+    from valuation_metrics import from_env
+
+    # VALUATION_METRICS=path turns on timing (written at exit)
+    metrics = from_env(sys.modules[__name__])
+
     interview = UberCEOInterview()
+    if spec is not None:
+        interview.load_spec(spec)
+    if user is None:
+        interview.history = HistoryStore('uber_ceo_interview.history')
+    else:
+        from valuation_sessions import SessionStore
+        interview.sessions = SessionStore()
+        interview.user = user
+        interview.history = HistoryStore(f'uber_ceo_interview.{user}.history')
 
     # Try to load previous session
     is_first_time = not interview.load_state()
@@ -564,16 +775,14 @@ def interactive_interview():
         print("q. Quit without saving")
 
         choice = input("\n👉 Your choice: ").strip()
+        if metrics is not None:
+            metrics.inc('valuation_menu_choices_total',
+                        (('choice', choice if choice in MENU_CHOICES else 'other'),))
 
         if choice == '1':
-            # Find next unanswered question
-            next_idx = None
-            for i, q in enumerate(interview.questions):
-                if q['id'] not in interview.answers:
-                    next_idx = i
-                    break
+            q = interview.get_next_question(adaptive=True)
 
-            if next_idx is None:
+            if q is None:
                 print("\n" + "="*70)
                 print("✅ INTERVIEW COMPLETE!")
                 print("="*70)
@@ -583,7 +792,6 @@ def interactive_interview():
                 print("\n💡 TIP: Use option 3 to see which beliefs drive your valuation most.")
                 continue
 
-            q = interview.questions[next_idx]
             answered = len(interview.answers)
             total = len(interview.questions)
 
@@ -664,11 +872,9 @@ def interactive_interview():
 
                 new_answer = float(input(f"New answer ({q['unit']}): "))
 
-                old_val = interview.calculate_fair_value()['fair_value_per_share']
-                interview.answers[q['id']] = new_answer
-                new_val = interview.calculate_fair_value()['fair_value_per_share']
+                result = interview.update_answer(q['id'], new_answer)
 
-                print(f"\n✓ Updated! Fair value changed by ${new_val - old_val:+.2f}/share")
+                print(f"\n✓ Updated! Fair value changed by ${result['new_fair_value'] - result['old_fair_value']:+.2f}/share")
 
             except (ValueError, IndexError):
                 print("\n❌ Invalid input.")
@@ -718,6 +924,12 @@ def interactive_interview():
 if __name__ == '__main__':
     import sys
 
+    # --spec PATH [command ...]: the interview and every subcommand (and its
+    # worker processes) value through the spec
+    if len(sys.argv) > 2 and sys.argv[1] == '--spec':
+        os.environ['VALUATION_SPEC'] = sys.argv[2]
+        del sys.argv[1:3]
+
     if len(sys.argv) > 1 and sys.argv[1] == '--demo':
         print("\n" + "="*70)
         print("DEMO MODE")
@@ -737,5 +949,37 @@ if __name__ == '__main__':
 
         print("... and 27 more questions\n")
         print("Ready to start? Run: python3 uber_valuation_v2_ceo_mode.py\n")
+    elif len(sys.argv) > 1 and sys.argv[1] == 'montecarlo':
+        from valuation_montecarlo import main
+        sys.exit(main(sys.argv[2:]))
+    elif len(sys.argv) > 1 and sys.argv[1] == 'sweep':
+        from valuation_sweep import main
+        sys.exit(main(sys.argv[2:], 'v2'))
+    elif len(sys.argv) > 1 and sys.argv[1] == 'implied':
+        from valuation_implied import main
+        sys.exit(main(sys.argv[2:], 'v2'))
+    elif len(sys.argv) > 1 and sys.argv[1] == 'charts':
+        from valuation_charts import main
+        sys.exit(main(sys.argv[2:], 'v2'))
+    elif len(sys.argv) > 1 and sys.argv[1] == 'attribute':
+        from valuation_attribution import main
+        sys.exit(main(sys.argv[2:], 'v2'))
+    elif len(sys.argv) > 1 and sys.argv[1] == 'dcf':
+        from valuation_dcf import main
+        sys.exit(main(sys.argv[2:]))
+    elif len(sys.argv) > 1 and sys.argv[1] == 'paths':
+        from valuation_paths import main
+        sys.exit(main(sys.argv[2:]))
+    elif len(sys.argv) > 1 and sys.argv[1] in ('stream', 'publish'):
+        from valuation_stream import main
+        sys.exit(main(sys.argv[1:], 'v2'))
+    elif len(sys.argv) > 1 and sys.argv[1] in ('surface', 'whatif'):
+        from valuation_surfaces import main
+        sys.exit(main(sys.argv[1:], 'v2'))
+    elif len(sys.argv) > 1 and sys.argv[1] == 'profile':
+        from valuation_metrics import main
+        sys.exit(main(sys.argv[2:]))
+    elif len(sys.argv) > 2 and sys.argv[1] == '--user':
+        interactive_interview(user=sys.argv[2])
     else:
         interactive_interview()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Valuation Oracle - Assumption Snapshots
+
+An Assumptions is a frozen set of answers ({question id: value}). The
+valuation methods of both models accept one in place of the model's
+own estimates, so any number of threads or tasks can value different
+assumption sets against one shared model: nothing is written to the
+model while valuing, and a snapshot can't change underneath a caller.
+
+    base = model.snapshot()
+    bull = base.with_answer('ebitda_margin_2027', 18)
+    model.calculate_fair_value(bull)
+
+Snapshots are hashable and compare equal when they hold the same
+answers, so they can key dicts and sets directly.
+"""
+
+from collections.abc import Mapping
+
+
+class Assumptions(Mapping):
+    """Immutable, hashable mapping of question id -> answer"""
+
+    __slots__ = ('_values', '_hash')
+
+    def __init__(self, values=()):
+        object.__setattr__(self, '_values', dict(values))
+        object.__setattr__(self, '_hash', None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Assumptions are immutable; use with_answer()")
+
+    __delattr__ = __setattr__
+
+    def __getitem__(self, question_id):
+        return self._values[question_id]
+
+    def __contains__(self, question_id):
+        return question_id in self._values
+
+    def get(self, question_id, default=None):
+        return self._values.get(question_id, default)
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __hash__(self):
+        if self._hash is None:
+            object.__setattr__(self, '_hash', hash(frozenset(self._values.items())))
+        return self._hash
+
+    def __eq__(self, other):
+        if isinstance(other, Assumptions):
+            return self._values == other._values
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Assumptions({self._values!r})"
+
+    def __reduce__(self):
+        return (Assumptions, (self._values,))
+
+    def with_answer(self, question_id, value):
+        """A new snapshot with one answer set"""
+        return self.with_answers({question_id: value})
+
+    def with_answers(self, changes):
+        """A new snapshot with several answers set"""
+        values = dict(self._values)
+        values.update(changes)
+        return Assumptions(values)
+
+    def without(self, question_id):
+        """A new snapshot with one answer removed (back to the default)"""
+        values = dict(self._values)
+        values.pop(question_id, None)
+        return Assumptions(values)
+
+    def to_dict(self):
+        """A mutable copy (e.g. for saving as JSON)"""
+        return dict(self._values)
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Valuation Oracle - Attribution
+
+Why did fair value move between two states of the answers (yesterday's
+and today's, say)? Splits the change into one contribution per input
+that changed, adding up exactly to the total:
+
+    waterfall   change the inputs one at a time in a given order; each
+                gets the move it causes at its turn (order matters when
+                inputs interact, e.g. margin x multiple)
+    shapley     each input's average contribution over every order, so
+                the split doesn't depend on an order. Exact (all 2^d
+                coalitions) up to `exact_limit` changed inputs; beyond
+                that, estimated from random orders (each paired with its
+                reverse) within a budget of model evaluations, with a
+                standard error per input
+
+Every coalition (some inputs at their new value, the rest at their old
+one) is valued in one batch call, so even sampled Shapley on 30 inputs
+is a few thousand rows of one vectorized evaluation.
+"""
+
+from math import factorial
+
+from valuation_sweep import MODELS, batch_fair_values, load_model
+
+EXACT_LIMIT = 12          # changed inputs up to which Shapley is exact (2^12 evaluations)
+DEFAULT_BUDGET = 20_000   # model evaluations for sampled Shapley
+
+
+def _points(x_a, x_b, masks):
+    """Coalition inputs: x_b where mask is 1, x_a elsewhere"""
+    return x_a + masks * (x_b - x_a)
+
+
+def waterfall(evaluate, x_a, x_b, order=None):
+    """Contributions changing inputs one at a time in `order` (default: as given)"""
+    import numpy as np
+
+    d = len(x_a)
+    order = list(range(d)) if order is None else list(order)
+    masks = np.zeros((d + 1, d))
+    for step, i in enumerate(order, 1):
+        masks[step:, i] = 1
+    values = evaluate(_points(x_a, x_b, masks))
+    contributions = np.zeros(d)
+    contributions[order] = np.diff(values)
+    return {'contributions': contributions, 'stderr': np.zeros(d),
+            'before': values[0], 'after': values[-1], 'evaluations': d + 1}
+
+
+def exact_shapley(evaluate, x_a, x_b):
+    """Shapley contributions from all 2^d coalitions"""
+    import numpy as np
+
+    d = len(x_a)
+    coalitions = np.arange(2 ** d)
+    masks = (coalitions[:, None] >> np.arange(d)) & 1
+    values = evaluate(_points(x_a, x_b, masks))
+    sizes = masks.sum(axis=1)
+    # Weight of a coalition of size s joined by one more input
+    weight = np.array([factorial(s) * factorial(d - s - 1) / factorial(d) for s in range(d)])
+
+    contributions = np.empty(d)
+    for i in range(d):
+        without = coalitions[masks[:, i] == 0]
+        contributions[i] = (weight[sizes[without]] * (values[without | (1 << i)] - values[without])).sum()
+    return {'contributions': contributions, 'stderr': np.zeros(d),
+            'before': values[0], 'after': values[-1], 'evaluations': 2 ** d}
+
+
+def sampled_shapley(evaluate, x_a, x_b, budget=DEFAULT_BUDGET, seed=None):
+    """
+    Shapley contributions averaged over random orders, each paired with
+    its reverse, using about `budget` evaluations
+    """
+    import numpy as np
+
+    d = len(x_a)
+    pairs = max(1, budget // (2 * (d + 1)))
+    rng = np.random.default_rng(seed)
+    orders = np.argsort(rng.random((pairs, d)), axis=1)
+    orders = np.concatenate([orders, orders[:, ::-1]])                 # (2 * pairs, d)
+
+    # Rank of each input in each order; a chain's step k has the first k inputs changed
+    rank = np.empty_like(orders)
+    np.put_along_axis(rank, orders, np.arange(d)[None, :], axis=1)
+    steps = np.arange(d + 1)
+    masks = (rank[:, None, :] < steps[None, :, None]).astype(np.float64)  # (orders, d + 1, d)
+    values = evaluate(_points(x_a, x_b, masks.reshape(-1, d))).reshape(len(orders), d + 1)
+
+    marginal = np.take_along_axis(np.diff(values, axis=1), rank, axis=1)  # (orders, d) by input
+    paired = 0.5 * (marginal[:pairs] + marginal[pairs:])
+    stderr = paired.std(axis=0, ddof=1) / np.sqrt(pairs) if pairs > 1 else np.full(d, np.nan)
+    return {'contributions': paired.mean(axis=0), 'stderr': stderr,
+            'before': values[0, 0], 'after': values[0, -1], 'evaluations': values.size}
+
+
+def attribute(model_key, model, before, after, method='shapley', order=None,
+              budget=DEFAULT_BUDGET, exact_limit=EXACT_LIMIT, seed=None):
+    """
+    Split the fair-value change from answers `before` to answers `after`
+    into per-input contributions. `model` is left with its own answers.
+    """
+    import numpy as np
+    from valuation_implied import model_inputs
+
+    attr = 'user_estimates' if model_key == 'v1' else 'answers'
+    saved = getattr(model, attr)
+    try:
+        setattr(model, attr, dict(after))
+        new = model_inputs(model_key, model)
+        setattr(model, attr, dict(before))
+        old = model_inputs(model_key, model)
+        names = [name for name in old if old[name] != new[name]]
+        if order is not None:
+            unknown = [name for name in order if name not in names]
+            if unknown:
+                raise ValueError(f"Not among the changed inputs: {', '.join(unknown)}")
+            names = list(order) + [name for name in names if name not in order]
+
+        x_a = np.array([float(old[name]) for name in names])
+        x_b = np.array([float(new[name]) for name in names])
+
+        def evaluate(points):
+            columns = {name: points[:, i] for i, name in enumerate(names)}
+            return batch_fair_values(model_key, model, columns, len(points))
+
+        if not names:
+            value = float(evaluate(np.zeros((1, 0)))[0])
+            result = {'contributions': np.zeros(0), 'stderr': np.zeros(0),
+                      'before': value, 'after': value, 'evaluations': 1}
+            used = 'none'
+        elif method == 'waterfall':
+            result, used = waterfall(evaluate, x_a, x_b), 'waterfall'
+        elif method == 'shapley' and len(names) <= exact_limit:
+            result, used = exact_shapley(evaluate, x_a, x_b), 'exact shapley'
+        elif method == 'shapley':
+            result, used = sampled_shapley(evaluate, x_a, x_b, budget, seed), 'sampled shapley'
+        else:
+            raise ValueError(f"Unknown method {method!r} (use shapley or waterfall)")
+    finally:
+        setattr(model, attr, saved)
+
+    changed_answers = {k for k in set(before) | set(after) if before.get(k) != after.get(k)}
+    return {
+        'method': used,
+        'before': float(result['before']),
+        'after': float(result['after']),
+        'total': float(result['after'] - result['before']),
+        'evaluations': int(result['evaluations']),
+        'contributions': [{
+            'input': name,
+            'from': float(x_a[i]),
+            'to': float(x_b[i]),
+            'contribution': float(result['contributions'][i]),
+            'stderr': float(result['stderr'][i]),
+        } for i, name in enumerate(names)],
+        # Changed answers the fair-value model doesn't read
+        'ignored': sorted(changed_answers - set(names)),
+    }
+
+
+def _parse_time(text):
+    from datetime import datetime
+
+    return datetime.fromisoformat(text).timestamp()
+
+
+def _load_state(model_key, model, source, user):
+    """Answers from a saved JSON file, or as they stood at a date/time (session store or history log)"""
+    import json
+    import os
+
+    if source is not None and os.path.exists(source):
+        with open(source, 'r') as f:
+            data = json.load(f)
+        return data.get('answers', data.get('user_estimates', {})), source
+
+    timestamp = None if source is None else _parse_time(source)
+    label = 'now' if source is None else source
+    if user is not None:
+        from valuation_sessions import SessionStore
+
+        with SessionStore() as store:
+            row = store.load(user, model.ticker, model_key, as_of=timestamp)
+        return ({} if row is None else row['answers']), label
+
+    from valuation_history import HistoryStore
+
+    path = {'v1': 'uber_estimates.history', 'v2': 'uber_ceo_interview.history'}[model_key]
+    if not os.path.isdir(path):
+        raise ValueError(f"{path}: no answer history yet (answer some questions first, or give saved files)")
+    with HistoryStore(path) as history:
+        return history.answers_at(timestamp), label
+
+
+def main(argv, model_key):
+    """
+    CLI: attribute [--from WHEN] [--to WHEN] [--user U] [--method shapley|waterfall]
+                   [--order A,B,...] [--budget N]
+
+    WHEN is a saved state file (JSON) or a date/time (YYYY-MM-DD[THH:MM]);
+    the default is the last 24 hours.
+    """
+    import argparse
+    import time
+    from datetime import datetime
+
+    parser = argparse.ArgumentParser(prog=f"{MODELS[model_key][0]}.py attribute")
+    parser.add_argument('--from', dest='start', help='earlier state: JSON file or date/time (default: 24h ago)')
+    parser.add_argument('--to', dest='end', help='later state: JSON file or date/time (default: now)')
+    parser.add_argument('--user', help="read states from this user's saved sessions")
+    parser.add_argument('--method', choices=('shapley', 'waterfall'), default='shapley')
+    parser.add_argument('--order', help='waterfall order: comma-separated inputs (rest follow)')
+    parser.add_argument('--budget', type=int, default=DEFAULT_BUDGET, help='evaluations for sampled Shapley')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+
+    start = args.start or datetime.fromtimestamp(time.time() - 86400).isoformat(timespec='minutes')
+    model = load_model(model_key)
+    try:
+        before, before_label = _load_state(model_key, model, start, args.user)
+        after, after_label = _load_state(model_key, model, args.end, args.user)
+        order = None if args.order is None else [name.strip() for name in args.order.split(',')]
+        started = time.perf_counter()
+        result = attribute(model_key, model, before, after, args.method, order, args.budget, seed=args.seed)
+    except ValueError as e:
+        print(f"\n❌ {e}")
+        return 1
+    elapsed = time.perf_counter() - started
+
+    print("\n" + "="*70)
+    print(f"WHAT MOVED FAIR VALUE ({result['method']}, {result['evaluations']:,} evaluations, {elapsed * 1000:.1f} ms)")
+    print("="*70)
+    print(f"\nFair value ({before_label}): ${result['before']:.2f}")
+    rows = result['contributions']
+    if args.method == 'shapley':
+        rows = sorted(rows, key=lambda r: abs(r['contribution']), reverse=True)
+    if not rows:
+        print("   No model input changed")
+    for row in rows:
+        marker = "📈" if row['contribution'] > 0 else "📉" if row['contribution'] < 0 else "➖"
+        error = f"  ±{row['stderr']:.2f}" if row['stderr'] > 0 else ''
+        print(f"   {marker} {row['input']:<34} {row['from']:>9g} → {row['to']:<9g} "
+              f"${row['contribution']:+.2f}{error}")
+    print(f"Fair value ({after_label}): ${result['after']:.2f}  (total ${result['total']:+.2f})")
+    if result['ignored']:
+        print(f"\n(Changed but not used by the model: {', '.join(result['ignored'])})")
+    print("\n" + "="*70)
+    return 0
+
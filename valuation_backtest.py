@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Valuation Oracle - Backtest
+
+Does the method work? Replays every saved session's history (each save
+and the fair value it gave) against a local price history and scores
+what it said on each day:
+
+    hit rate      buy calls followed by a rise, trim calls by a fall,
+                  `horizon` trading days later
+    direction     fair value above / below the price, and the price then
+                  rising / falling
+    P&L           the $1M position of show_valuation, scaled by the day's
+                  action (ACTION_EXPOSURE) and rebalanced daily, against
+                  simply holding it
+    calibration   how often the price `horizon` days later lands inside
+                  the central 50% / 80% / 90% Monte Carlo band of fair
+                  value (the portfolio's scenarios)
+
+A save counts from the first price dated after it, so nothing is known
+before it was written down. Every session is also scored with no
+answers at all (the consensus / model defaults) over the same days, so
+the two compare like for like: the CEO interview (v2) and your own
+estimates (v1) against consensus.
+
+Prices come from a CSV: date,price or date,ticker,price per row (header
+optional; dates as YYYY-MM-DD or Unix seconds). Users are spread across
+worker processes, each reading its users' sessions from the store and
+sending back only running totals, so memory stays bounded however many
+users and years there are.
+
+    python3 valuation_backtest.py --prices uber_daily.csv
+    python3 valuation_backtest.py --prices prices.csv --horizon 21 --model v2 --workers 4
+"""
+
+import os
+import sys
+import time
+
+from valuation_portfolio import DEFAULT_POSITION
+
+# Position (x the $1M) held on a day the fair value says buy / hold / trim
+ACTION_EXPOSURE = {'buy': 1.5, 'hold': 1.0, 'trim': 0.5}
+
+BANDS = (50, 80, 90)      # central Monte Carlo bands checked for calibration (%)
+PIT_BINS = 10             # histogram of where the realized price fell in the band
+
+_worker = {}
+
+
+def read_prices(path, ticker='UBER'):
+    """{ticker: (timestamps, prices)} from a CSV, each sorted by date"""
+    from datetime import datetime
+    import numpy as np
+
+    series = {}
+    with open(path, 'r') as f:
+        for line in f:
+            parts = [part.strip() for part in line.strip().split(',')]
+            if len(parts) < 2:
+                continue
+            try:
+                price = float(parts[-1])
+                stamp = float(parts[0]) if parts[0].replace('.', '', 1).isdigit() \
+                    else datetime.fromisoformat(parts[0]).timestamp()
+            except ValueError:
+                continue  # header or malformed row
+            name = parts[1].upper() if len(parts) > 2 else ticker
+            series.setdefault(name, ([], []))
+            series[name][0].append(stamp)
+            series[name][1].append(price)
+
+    prices = {}
+    for name, (stamps, values) in series.items():
+        order = np.argsort(stamps, kind='stable')
+        prices[name] = (np.asarray(stamps)[order], np.asarray(values)[order])
+    return prices
+
+
+def _signals(fair_values, prices, band):
+    """uber_valuation_v2_ceo_mode.valuation_action for arrays: 1 buy, 0 hold, -1 trim"""
+    import numpy as np
+
+    diff = fair_values - prices
+    return np.where(diff > band, 1, np.where(diff < -band, -1, 0))
+
+
+def _empty_totals():
+    return {'days': 0, 'scored_days': 0, 'buys': 0, 'trims': 0, 'hits': 0, 'direction_hits': 0,
+            'pnl': 0.0, 'hold_pnl': 0.0, 'covered': {level: 0 for level in BANDS},
+            'pit': [0] * PIT_BINS}
+
+
+def replay(fair_values, scenarios, active, prices, horizon=63, band=10):
+    """
+    Running totals for one session: fair_values (saves,), scenarios
+    (n, saves), and active (days,) the save in force on each price day
+    (-1 before the first). Counts are summable across sessions.
+    """
+    import numpy as np
+
+    totals = _empty_totals()
+    days = np.flatnonzero(active >= 0)
+    if days.size == 0:
+        return totals
+    fair = fair_values[active[days]]
+    signal = _signals(fair, prices[days], band)
+    exposure = np.array([ACTION_EXPOSURE['trim'], ACTION_EXPOSURE['hold'], ACTION_EXPOSURE['buy']])
+
+    # Daily P&L of the day's position, held to the next price
+    held = days + 1 < len(prices)
+    daily = prices[days[held] + 1] / prices[days[held]] - 1
+    totals['days'] = int(held.sum())
+    totals['pnl'] = float(DEFAULT_POSITION * (exposure[signal[held] + 1] * daily).sum())
+    totals['hold_pnl'] = float(DEFAULT_POSITION * daily.sum())
+
+    # Calls scored `horizon` days later
+    scored = days + horizon < len(prices)
+    now, later = days[scored], days[scored] + horizon
+    change = prices[later] / prices[now] - 1
+    calls = signal[scored]
+    totals['scored_days'] = int(scored.sum())
+    totals['buys'] = int((calls == 1).sum())
+    totals['trims'] = int((calls == -1).sum())
+    totals['hits'] = int(((calls == 1) & (change > 0)).sum() + ((calls == -1) & (change < 0)).sum())
+    totals['direction_hits'] = int((np.sign(fair[scored] - prices[now]) == np.sign(change)).sum())
+
+    # Share of scenarios below the realized price (uniform if the bands are calibrated).
+    # `active` never decreases, so each save's days are one contiguous run.
+    pit = np.empty(now.size)
+    ordered = np.sort(scenarios, axis=0)
+    saves, starts = np.unique(active[now], return_index=True)
+    for save, start, stop in zip(saves, starts, list(starts[1:]) + [now.size]):
+        pit[start:stop] = np.searchsorted(ordered[:, save], prices[later[start:stop]]) / len(ordered)
+    for level in BANDS:
+        tail = (1 - level / 100) / 2
+        totals['covered'][level] = int(((pit >= tail) & (pit <= 1 - tail)).sum())
+    totals['pit'] = np.bincount(np.minimum((pit * PIT_BINS).astype(np.int64), PIT_BINS - 1),
+                                minlength=PIT_BINS).tolist()
+    return totals
+
+
+def merge(into, totals):
+    """Add one set of running totals to another"""
+    for key, value in totals.items():
+        if key == 'covered':
+            for level, count in value.items():
+                into['covered'][level] += count
+        elif key == 'pit':
+            into['pit'] = [a + b for a, b in zip(into['pit'], value)]
+        else:
+            into[key] += value
+    return into
+
+
+def report(totals):
+    """Rates and P&L from running totals"""
+    calls = totals['buys'] + totals['trims']
+    scored = totals['scored_days']
+    return {
+        'days': totals['days'],
+        'scored_days': scored,
+        'calls': calls,
+        'hit_rate': totals['hits'] / calls if calls else None,
+        'direction_rate': totals['direction_hits'] / scored if scored else None,
+        'pnl': totals['pnl'],
+        'excess_pnl': totals['pnl'] - totals['hold_pnl'],
+        'coverage': {level: totals['covered'][level] / scored if scored else None for level in BANDS},
+        'pit': totals['pit'],
+    }
+
+
+# === PER-USER REPLAY (runs in a worker) ===
+
+def _init_worker(db, prices, options):
+    from valuation_portfolio import Portfolio
+    from valuation_sessions import SessionStore
+
+    _worker.update(
+        store=SessionStore(db),
+        portfolio=Portfolio(options['companies'], scenarios=options['scenarios'], seed=options['seed']),
+        prices=prices, options=options, consensus={})
+
+
+def replay_user(task):
+    """Totals for each of one user's sessions: [(user, ticker, model, method, consensus)]"""
+    import numpy as np
+
+    user, sessions = task
+    store, portfolio, options = _worker['store'], _worker['portfolio'], _worker['options']
+    results, skipped = [], []
+    for ticker, model_key in sessions:
+        if ticker not in _worker['prices']:
+            skipped.append(((user, ticker, model_key), 'no prices'))
+            continue
+        stamps, prices = _worker['prices'][ticker]
+        history = store.history(user, ticker, model_key, options['since'], options['until'])
+        try:
+            fair_values, scenarios = portfolio.value_answers(model_key, ticker, [h['answers'] for h in history])
+            key = (ticker, model_key)
+            if key not in _worker['consensus']:
+                _worker['consensus'][key] = portfolio.value_answers(model_key, ticker, [{}])
+        except ValueError as e:
+            skipped.append(((user, ticker, model_key), str(e)))
+            continue
+
+        saved_at = np.array([h['saved_at'] for h in history])
+        active = np.searchsorted(saved_at, stamps, side='right') - 1
+        method = replay(fair_values, scenarios, active, prices, options['horizon'], options['band'])
+        base, base_scenarios = _worker['consensus'][key]
+        consensus = replay(base, base_scenarios, np.where(active >= 0, 0, -1), prices,
+                           options['horizon'], options['band'])
+        results.append((user, ticker, model_key, method, consensus))
+    return results, skipped
+
+
+def run_backtest(db, prices, user=None, ticker=None, model=None, since=None, until=None,
+                 horizon=63, band=10, scenarios=500, seed=0, companies=None, workers=None):
+    """
+    Replay every matching session against `prices` (see read_prices).
+    Returns totals by model ({'v1': {'method', 'consensus'}, ...}), by
+    user, and the sessions that were skipped. `companies` is the company
+    specs directory (default valuation_companies.COMPANIES_DIR).
+    """
+    from multiprocessing import Pool
+    from valuation_companies import load_companies
+    from valuation_sessions import SessionStore
+
+    # A missing directory fails here, not in every worker's initializer
+    load_companies(companies)
+
+    with SessionStore(db) as store:
+        sessions = store.sessions(user=user, ticker=ticker, model=model, since=since, until=until)
+    by_user = {}
+    for session in sessions:
+        by_user.setdefault(session['user'], []).append((session['ticker'], session['model']))
+    tasks = list(by_user.items())
+
+    options = {'horizon': horizon, 'band': band, 'scenarios': scenarios, 'seed': seed,
+               'companies': companies, 'since': since, 'until': until}
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks)))
+    results = {'by_model': {}, 'by_user': {}, 'skipped': [], 'sessions': 0}
+
+    def collect(replayed):
+        for rows, skipped in replayed:
+            results['skipped'].extend(skipped)
+            for user_name, _, model_key, method, consensus in rows:
+                group = results['by_model'].setdefault(
+                    model_key, {'method': _empty_totals(), 'consensus': _empty_totals()})
+                merge(group['method'], method)
+                merge(group['consensus'], consensus)
+                mine = results['by_user'].setdefault(
+                    user_name, {'method': _empty_totals(), 'consensus': _empty_totals()})
+                merge(mine['method'], method)
+                merge(mine['consensus'], consensus)
+                results['sessions'] += 1
+
+    init_args = (db, prices, options)
+    if workers == 1:
+        _init_worker(*init_args)
+        try:
+            collect(replay_user(task) for task in tasks)
+        finally:
+            _worker.pop('store').close()
+    else:
+        with Pool(workers, initializer=_init_worker, initargs=init_args) as pool:
+            collect(pool.imap_unordered(replay_user, tasks, chunksize=max(1, len(tasks) // (workers * 8))))
+    return results
+
+
+def main(argv):
+    """
+    CLI: valuation_backtest.py --prices FILE [--db PATH] [--user U] [--ticker T] [--model v1|v2]
+                               [--since YYYY-MM-DD] [--until YYYY-MM-DD] [--horizon DAYS]
+                               [--band $] [--scenarios N] [--workers N]
+    """
+    import argparse
+    from datetime import datetime
+    from valuation_sessions import DEFAULT_DB
+
+    parser = argparse.ArgumentParser(prog='valuation_backtest.py')
+    parser.add_argument('--prices', required=True, help='CSV of date,price or date,ticker,price')
+    parser.add_argument('--db', default=DEFAULT_DB)
+    parser.add_argument('--user')
+    parser.add_argument('--ticker', help='only this ticker (also the ticker of a date,price CSV)')
+    parser.add_argument('--model', choices=('v1', 'v2'))
+    parser.add_argument('--since', help='only saves from this date')
+    parser.add_argument('--until', help='only saves before this date')
+    parser.add_argument('--horizon', type=int, default=63, help='trading days until a call is scored')
+    parser.add_argument('--band', type=float, default=10, help='$/share from the price before buy/trim')
+    parser.add_argument('--scenarios', type=int, default=500, help='Monte Carlo scenarios per save')
+    parser.add_argument('--companies', help='company specs directory (default: companies/ next to the code)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int)
+    args = parser.parse_args(argv)
+
+    try:
+        since, until = (None if d is None else datetime.fromisoformat(d).timestamp()
+                        for d in (args.since, args.until))
+        prices = read_prices(args.prices, (args.ticker or 'UBER').upper())
+    except (OSError, ValueError) as e:
+        print(f"\n❌ {e}")
+        return 1
+    if not prices:
+        print(f"\n❌ {args.prices}: no prices found")
+        return 1
+
+    started = time.perf_counter()
+    try:
+        results = run_backtest(args.db, prices, args.user, args.ticker and args.ticker.upper(), args.model,
+                               since, until, args.horizon, args.band, args.scenarios, args.seed,
+                               args.companies, args.workers)
+    except ValueError as e:
+        print(f"\n❌ {e}")
+        return 1
+    elapsed = time.perf_counter() - started
+
+    days = sum(len(series[1]) for series in prices.values())
+    print("\n" + "="*70)
+    print(f"BACKTEST: {results['sessions']:,} sessions, {len(results['by_user']):,} users, "
+          f"{days:,} price days in {elapsed:.2f}s")
+    print("="*70)
+    for key, reason in results['skipped'][:20]:
+        print(f"   ⚠️  skipped {'/'.join(key)}: {reason}")
+    if not results['by_model']:
+        print("\nNo sessions to replay.")
+        print("\n" + "="*70)
+        return 0
+
+    print(f"\nCalls scored {args.horizon} trading days later; P&L of a $1M position "
+          f"x{ACTION_EXPOSURE['buy']:g} on buy, x{ACTION_EXPOSURE['trim']:g} on trim:")
+    print(f"\n{'':<16}{'Days':>11}{'Calls':>11}{'Hit rate':>10}{'Direction':>11}{'P&L $M':>10}"
+          f"{'vs hold $M':>12}" + ''.join(f"{f'In {level}%':>9}" for level in BANDS))
+    names = {'v1': 'v1 estimates', 'v2': 'v2 interview'}
+    for model_key in sorted(results['by_model']):
+        group = results['by_model'][model_key]
+        for label, totals in ((names[model_key], group['method']), ('  consensus', group['consensus'])):
+            _print_row(label, report(totals))
+
+    print("\nBy user (best first):")
+    ranked = sorted(results['by_user'].items(),
+                    key=lambda item: report(item[1]['method'])['excess_pnl'], reverse=True)
+    for user_name, group in ranked[:20]:
+        mine, base = report(group['method']), report(group['consensus'])
+        beat = "📈" if mine['excess_pnl'] > base['excess_pnl'] else "📉"
+        _print_row(f"{beat} {user_name}"[:16], mine)
+    if len(ranked) > 20:
+        print(f"   ... {len(ranked) - 20:,} more")
+
+    overall = _empty_totals()
+    for group in results['by_model'].values():
+        merge(overall, group['method'])
+    pit = report(overall)['pit']
+    print(f"\nWhere the price landed in the Monte Carlo band (deciles; flat if calibrated):")
+    print("   " + ' '.join(f"{count / max(sum(pit), 1) * 100:4.0f}%" for count in pit))
+    print("\n" + "="*70)
+    return 0
+
+
+def _print_row(label, r):
+    def rate(value):
+        return f"{'—':>9}" if value is None else f"{value * 100:>8.1f}%"
+
+    print(f"{label:<16}{r['days']:>11,}{r['calls']:>11,}{rate(r['hit_rate']):>10}{rate(r['direction_rate']):>11}"
+          f"{r['pnl'] / 1e6:>10,.2f}{r['excess_pnl'] / 1e6:>+12,.2f}"
+          + ''.join(rate(r['coverage'][level]) for level in BANDS))
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Valuation Oracle - Benchmarks
+
+Times the hot paths of both models, from one valuation up to millions
+of scenarios and thousands of saved sessions, and reports throughput,
+latency percentiles and peak memory for each:
+
+    python3 valuation_bench.py                    # run everything
+    python3 valuation_bench.py -k batch --quick   # just the batch cases, short runs
+    python3 valuation_bench.py --save-baseline    # record this machine's numbers
+    python3 valuation_bench.py --compare          # exit 1 on a >20% slowdown
+
+Baselines are per machine: record one on the box that runs the nightly
+batch and compare against it there. A case regresses when its
+throughput falls below (1 - threshold) × baseline.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BASELINE_FILE = 'valuation_bench.baseline.json'
+
+# name -> setup(); setup returns (fn, operations per call of fn, cleanup or None)
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def _v1(cache=False):
+    from uber_valuation_v1 import UberValuation
+
+    model = UberValuation()
+    if not cache:
+        model.cache = None
+    return model
+
+
+def _v2(cache=False):
+    from uber_valuation_v2_ceo_mode import UberCEOInterview
+
+    interview = UberCEOInterview()
+    interview.answers.update({'revenue_last_week': 720, 'ebitda_margin_current_quarter': 12.5,
+                              'monthly_active_riders_growth': 1.4})
+    if not cache:
+        interview.cache = None
+    return interview
+
+
+def _quiet(fn):
+    """fn with its printing discarded (the interactive reports print)"""
+    def call():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn()
+    return call
+
+
+# === VALUATION ===
+
+@benchmark('v1.fair_value')
+def bench_v1_fair_value():
+    return _v1().calculate_fair_value, 1, None
+
+
+@benchmark('v1.fair_value.cached')
+def bench_v1_fair_value_cached():
+    return _v1(cache=True).calculate_fair_value, 1, None
+
+
+@benchmark('v2.fair_value')
+def bench_v2_fair_value():
+    return _v2().calculate_fair_value, 1, None
+
+
+@benchmark('v2.fair_value.cached')
+def bench_v2_fair_value_cached():
+    return _v2(cache=True).calculate_fair_value, 1, None
+
+
+@benchmark('v1.batch.1m')
+def bench_v1_batch_1m():
+    import numpy as np
+
+    model = _v1()
+    scenarios = np.tile(model.assumption_vector(), (1_000_000, 1))
+    scenarios[:, list(model.consensus).index('ebitda_margin_2027')] = np.linspace(5, 25, 1_000_000)
+    return lambda: model.calculate_fair_value_batch(scenarios), 1_000_000, None
+
+
+@benchmark('v2.batch.1m')
+def bench_v2_batch_1m():
+    import numpy as np
+
+    interview = _v2()
+    inputs = {'ebitda_margin_current_quarter': np.linspace(5, 25, 1_000_000)}
+    return lambda: interview.calculate_fair_value_batch(inputs), 1_000_000, None
+
+
+@benchmark('v2.dcf.100k_x_36m')
+def bench_v2_dcf_100k_x_36m():
+    import numpy as np
+    from valuation_dcf import dcf_inputs, project
+
+    inputs = dcf_inputs(_v2())
+    rng = np.random.default_rng(0)
+    inputs['mobility_gmv_growth_mom'] = rng.uniform(0.5, 3.5, 100_000)
+    inputs['ebitda_margin_current_quarter'] = rng.uniform(8, 16, 100_000)
+    return lambda: project(inputs, 36), 100_000, None
+
+
+# === SENSITIVITY ===
+
+@benchmark('v1.sensitivity')
+def bench_v1_sensitivity():
+    return _quiet(_v1().sensitivity_analysis), 1, None
+
+
+@benchmark('v2.sensitivity')
+def bench_v2_sensitivity():
+    return _quiet(_v2().sensitivity_analysis), 1, None
+
+
+# === UPDATES AND QUESTIONS ===
+
+@benchmark('v1.update_estimate')
+def bench_v1_update_estimate():
+    model = _v1()
+    values = [14, 15, 16, 17]
+    counter = iter(range(10**12))
+    return lambda: model.update_estimate('ebitda_margin_2027', values[next(counter) % 4]), 1, None
+
+
+@benchmark('v2.update_answer')
+def bench_v2_update_answer():
+    interview = _v2()
+    values = [10.5, 11.5, 12.5, 13.5]
+    counter = iter(range(10**12))
+    return lambda: interview.update_answer('ebitda_margin_current_quarter', values[next(counter) % 4]), 1, None
+
+
+@benchmark('v1.next_question')
+def bench_v1_next_question():
+    return _v1().get_next_question, 1, None
+
+
+@benchmark('v2.next_question')
+def bench_v2_next_question():
+    return _v2().get_next_question, 1, None
+
+
+# === PERSISTENCE ===
+
+def _session_dir(model, count, filename):
+    directory = tempfile.mkdtemp(prefix='valuation_bench_')
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(count):
+            model.save_state(os.path.join(directory, filename % i))
+    return directory
+
+
+@benchmark('v1.save_state')
+def bench_v1_save_state():
+    model = _v1()
+    directory = tempfile.mkdtemp(prefix='valuation_bench_')
+    path = os.path.join(directory, 'uber_estimates.json')
+    return _quiet(lambda: model.save_state(path)), 1, lambda: shutil.rmtree(directory)
+
+
+@benchmark('v2.save_state')
+def bench_v2_save_state():
+    interview = _v2()
+    directory = tempfile.mkdtemp(prefix='valuation_bench_')
+    path = os.path.join(directory, 'uber_ceo_interview.json')
+    return _quiet(lambda: interview.save_state(path)), 1, lambda: shutil.rmtree(directory)
+
+
+@benchmark('v1.load_state.2000_sessions')
+def bench_v1_load_state_2000_sessions():
+    model = _v1()
+    model.user_estimates = {'ebitda_margin_2027': 17, 'ebitda_multiple': 18}
+    directory = _session_dir(model, 2000, 'session_%d.json')
+    paths = [os.path.join(directory, name) for name in os.listdir(directory)]
+
+    def load_all():
+        for path in paths:
+            model.load_state(path)
+
+    return _quiet(load_all), len(paths), lambda: shutil.rmtree(directory)
+
+
+@benchmark('v2.load_state.2000_sessions')
+def bench_v2_load_state_2000_sessions():
+    interview = _v2()
+    directory = _session_dir(interview, 2000, 'session_%d.json')
+    paths = [os.path.join(directory, name) for name in os.listdir(directory)]
+
+    def load_all():
+        for path in paths:
+            interview.load_state(path)
+
+    return _quiet(load_all), len(paths), lambda: shutil.rmtree(directory)
+
+
+# === RUNNER ===
+
+def _percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+def measure(fn, ops, min_time=0.5, min_samples=5):
+    """
+    Time fn until min_time has passed. Fast functions are timed in groups
+    so each sample is long enough to measure. Latencies are per call of fn.
+    """
+    fn()  # warm up (imports, caches, first-touch of arrays)
+
+    group = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(group):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= 1e-3 or group >= 1 << 20:
+            break
+        group *= 10
+
+    samples = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < min_samples or time.perf_counter() < deadline:
+        started = time.perf_counter()
+        for _ in range(group):
+            fn()
+        samples.append((time.perf_counter() - started) / group)
+
+    # Throughput from the median sample, so a stray pause doesn't read as a regression
+    samples.sort()
+    return {
+        'ops_per_second': ops / _percentile(samples, 50),
+        'p50_us': _percentile(samples, 50) * 1e6,
+        'p99_us': _percentile(samples, 99) * 1e6,
+        'calls': len(samples) * group,
+    }
+
+
+def peak_memory(fn):
+    """Peak bytes allocated during one call of fn (Python and NumPy allocations)"""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        fn()
+        return max(tracemalloc.get_traced_memory()[1] - before, 0)
+    finally:
+        tracemalloc.stop()
+
+
+def run(names, min_time=0.5):
+    """{name: result} for the named benchmarks; skips cases whose dependencies are missing"""
+    results = {}
+    for name in names:
+        try:
+            fn, ops, cleanup = BENCHMARKS[name]()
+        except ImportError as e:
+            print(f"   {name:<32} skipped ({e.name} not installed)")
+            continue
+        try:
+            result = measure(fn, ops, min_time=min_time)
+            result['peak_memory_bytes'] = peak_memory(fn)
+        finally:
+            if cleanup is not None:
+                cleanup()
+        results[name] = result
+        print(f"   {name:<32} {_format_rate(result['ops_per_second']):>12}/s   "
+              f"p50 {result['p50_us']:>10.1f}µs   p99 {result['p99_us']:>10.1f}µs   "
+              f"peak {result['peak_memory_bytes'] / 1e6:>8.2f} MB")
+    return results
+
+
+def _format_rate(rate):
+    for limit, suffix in ((1e9, 'G'), (1e6, 'M'), (1e3, 'k')):
+        if rate >= limit:
+            return f"{rate / limit:.2f}{suffix}"
+    return f"{rate:.1f}"
+
+
+def environment():
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {
+        'python': platform.python_version(),
+        'numpy': numpy_version,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Names of cases whose throughput fell more than `threshold` below baseline"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        ratio = result['ops_per_second'] / base['ops_per_second']
+        flag = ''
+        if ratio < 1 - threshold:
+            regressions.append(name)
+            flag = '  ❌ REGRESSION'
+        print(f"   {name:<32} {ratio:>6.2f}× baseline{flag}")
+    return regressions
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog='valuation_bench.py')
+    parser.add_argument('-k', dest='pattern', help='only run benchmarks whose name contains this')
+    parser.add_argument('--quick', action='store_true', help='short runs (noisier)')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='baseline file')
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the baseline')
+    parser.add_argument('--compare', action='store_true', help='fail if slower than the baseline')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed slowdown (0.2 = 20%%)')
+    parser.add_argument('--json', help='also write results to this file')
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if not args.pattern or args.pattern in name]
+    if not names:
+        print(f"No benchmarks match {args.pattern!r}")
+        return 1
+
+    print("\n" + "="*70)
+    print(f"BENCHMARKS ({len(names)})")
+    print("="*70)
+    results = run(names, min_time=0.1 if args.quick else 0.5)
+    report = {'environment': environment(), 'results': results}
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    status = 0
+    if args.compare:
+        try:
+            with open(args.baseline, 'r') as f:
+                baseline = json.load(f)
+        except FileNotFoundError:
+            print(f"\n❌ No baseline at {args.baseline} (run with --save-baseline first)")
+            return 1
+        print("\n" + "-"*70)
+        print(f"vs baseline ({args.baseline}, allowed slowdown {args.threshold:.0%})")
+        print("-"*70)
+        if baseline['environment'] != report['environment']:
+            print(f"⚠️  Baseline was recorded on {baseline['environment']}")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+            status = 1
+        else:
+            print("\n✓ No regressions")
+
+    if args.save_baseline:
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r') as f:
+                saved = json.load(f)
+            saved['results'].update(results)
+            saved['environment'] = report['environment']
+        else:
+            saved = report
+        with open(args.baseline, 'w') as f:
+            json.dump(saved, f, indent=2)
+        print(f"\n✓ Baseline saved to {args.baseline}")
+
+    print()
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Valuation Oracle - Valuation Cache
+
+LRU cache (size and TTL limited) for fair-value results, keyed on the
+model, its facts and the inputs it actually values: every input resolved
+to its answer or default, sorted by name. So the order answers were
+given in doesn't matter, an answer equal to its default hits the same
+entry as no answer, and answers the model doesn't read are ignored.
+The models hand out copies of cached results, never the entry itself.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+def answers_key(inputs):
+    """Hashable, order-independent form of resolved inputs ({name: value}, defaults filled in)"""
+    return tuple(sorted(inputs.items()))
+
+
+class ValuationCache:
+    """Thread-safe LRU with a max size, per-entry TTL and hit/miss counters"""
+
+    def __init__(self, maxsize=4096, ttl=3600.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """Cached value, or None on a miss (absent or expired)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] < self.clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Counters for sizing the cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Shared by every model instance in the process
+FAIR_VALUE_CACHE = ValuationCache()
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Valuation Oracle - Sensitivity Charts
+
+Two-way heatmaps and a tornado chart, computed in one batch evaluation
+instead of one model call per point.
+
+    heatmaps   fair value over a grid of two inputs (e.g. EBITDA margin x
+               multiple), for every pair of the top-ranked inputs, each
+               axis spanning +/-span around the current value
+    tornado    exact fair value at -span and +span for each input alone,
+               widest swing first
+
+All grid points for all pairs go to the batch engine together (a
+200 x 200 grid for all 28 pairs of 8 inputs is ~1.1M scenarios). The
+arrays are saved to sensitivity.npz and sensitivity.json, and the
+charts are drawn without a plotting library: PNG heatmaps are written
+directly (zlib), and the SVGs add axes and labels around the same image.
+The heatmap marks where fair value crosses the market price with a
+white line and your current answers with a dot.
+"""
+
+import base64
+import json
+import os
+import struct
+import zlib
+from itertools import combinations
+
+from valuation_sweep import MODELS, batch_fair_values, load_model
+
+# Viridis-like colour stops, low to high fair value
+PALETTE = ((68, 1, 84), (59, 82, 139), (33, 145, 140), (94, 201, 98), (253, 231, 37))
+
+
+def chart_inputs(model_key, model, top=8):
+    """The `top` highest-impact inputs, plus any step inputs, for the tornado"""
+    from valuation_surfaces import STEP_INPUTS, input_names, ranked_inputs
+
+    ranked = ranked_inputs(model_key, model)[:top]
+    inputs = input_names(model_key, model)
+    return ranked, ranked + [name for name in sorted(STEP_INPUTS) if name in inputs]
+
+
+def _axis(value, points, span):
+    import numpy as np
+
+    half = abs(value) * span if value else 1.0
+    return np.linspace(value - half, value + half, points)
+
+
+def heatmaps(model_key, model, pairs, points=200, span=0.2):
+    """
+    Fair-value grid for each (x, y) pair, evaluated in one batch.
+    Returns a list of {'x', 'y', 'x_values', 'y_values', 'grid'} with
+    grid[i, j] at (x_values[j], y_values[i]).
+    """
+    import numpy as np
+    from valuation_implied import model_inputs
+
+    current = model_inputs(model_key, model)
+    names = sorted({name for pair in pairs for name in pair})
+    size = points * points
+    columns = {name: np.full(len(pairs) * size, float(current[name])) for name in names}
+    charts = []
+    for k, (x, y) in enumerate(pairs):
+        x_values = _axis(float(current[x]), points, span)
+        y_values = _axis(float(current[y]), points, span)
+        block = slice(k * size, (k + 1) * size)
+        columns[x][block] = np.tile(x_values, points)
+        columns[y][block] = np.repeat(y_values, points)
+        charts.append({'x': x, 'y': y, 'x_values': x_values, 'y_values': y_values})
+
+    fair_values = batch_fair_values(model_key, model, columns, len(pairs) * size)
+    for k, chart in enumerate(charts):
+        chart['grid'] = fair_values[k * size:(k + 1) * size].reshape(points, points)
+    return charts
+
+
+def tornado(model_key, model, names, span=0.2):
+    """Fair value with each input alone at -span and +span (one batch), widest first"""
+    import numpy as np
+    from valuation_implied import model_inputs
+
+    current = model_inputs(model_key, model)
+    n = 2 * len(names) + 1
+    columns = {name: np.full(n, float(current[name])) for name in names}
+    for i, name in enumerate(names):
+        low, high = _axis(float(current[name]), 2, span)
+        columns[name][2 * i + 1] = low
+        columns[name][2 * i + 2] = high
+    fair_values = batch_fair_values(model_key, model, columns, n)
+
+    rows = []
+    for i, name in enumerate(names):
+        low, high = _axis(float(current[name]), 2, span)
+        rows.append({
+            'input': name,
+            'current': float(current[name]),
+            'low_input': float(low),
+            'high_input': float(high),
+            'low_fv': float(fair_values[2 * i + 1]),
+            'high_fv': float(fair_values[2 * i + 2]),
+        })
+    rows.sort(key=lambda r: abs(r['high_fv'] - r['low_fv']), reverse=True)
+    return {'fair_value': float(fair_values[0]), 'span': span, 'rows': rows}
+
+
+# === RENDERING ===
+
+def png_bytes(rgb):
+    """Encode an (height, width, 3) uint8 array as a PNG"""
+    import numpy as np
+
+    height, width, _ = rgb.shape
+    raw = np.zeros((height, width * 3 + 1), dtype=np.uint8)   # filter byte 0 per row
+    raw[:, 1:] = rgb.reshape(height, width * 3)
+
+    def chunk(tag, data):
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff)
+
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(raw.tobytes(), 6))
+            + chunk(b'IEND', b''))
+
+
+def colorize(values, low, high):
+    """Map values onto PALETTE between low and high: (..., 3) uint8"""
+    import numpy as np
+
+    t = np.clip((values - low) / ((high - low) or 1.0), 0, 1) * (len(PALETTE) - 1)
+    stops = np.arange(len(PALETTE))
+    rgb = np.stack([np.interp(t, stops, [c[channel] for c in PALETTE]) for channel in range(3)], axis=-1)
+    return rgb.astype(np.uint8)
+
+
+def heatmap_image(chart, market_price=None, scale=2):
+    """Heatmap pixels (high y at the top), market-price contour in white"""
+    import numpy as np
+
+    grid = chart['grid'][::-1]
+    rgb = colorize(grid, np.nanmin(grid), np.nanmax(grid))
+    if market_price is not None:
+        above = grid > market_price
+        edge = np.zeros(grid.shape, dtype=bool)
+        edge[:, 1:] |= above[:, 1:] != above[:, :-1]
+        edge[1:, :] |= above[1:, :] != above[:-1, :]
+        rgb[edge] = 255
+    return np.repeat(np.repeat(rgb, scale, axis=0), scale, axis=1)
+
+
+def _fmt(value):
+    return f"{value:.3g}" if abs(value) < 1000 else f"{value:,.0f}"
+
+
+def heatmap_svg(chart, image, current=None):
+    """SVG heatmap: the PNG image plus title, axes, ticks and a colour bar"""
+    height, width, _ = image.shape
+    left, top = 90, 40
+    grid = chart['grid']
+    low, high = float(grid.min()), float(grid.max())
+    encoded = base64.b64encode(png_bytes(image)).decode('ascii')
+    x_values, y_values = chart['x_values'], chart['y_values']
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{left + width + 110}" height="{top + height + 60}" '
+        f'font-family="sans-serif" font-size="12">',
+        f'<text x="{left}" y="{top - 15}" font-size="14">Fair value per share: {chart["x"]} x {chart["y"]}</text>',
+        f'<image x="{left}" y="{top}" width="{width}" height="{height}" href="data:image/png;base64,{encoded}"/>',
+        f'<rect x="{left}" y="{top}" width="{width}" height="{height}" fill="none" stroke="#333"/>',
+    ]
+    for i in range(5):
+        frac = i / 4
+        x = left + frac * width
+        y = top + height - frac * height
+        x_label = x_values[0] + frac * (x_values[-1] - x_values[0])
+        y_label = y_values[0] + frac * (y_values[-1] - y_values[0])
+        parts.append(f'<text x="{x:.1f}" y="{top + height + 16}" text-anchor="middle">{_fmt(x_label)}</text>')
+        parts.append(f'<text x="{left - 6}" y="{y + 4:.1f}" text-anchor="end">{_fmt(y_label)}</text>')
+    parts.append(f'<text x="{left + width / 2}" y="{top + height + 40}" text-anchor="middle">{chart["x"]}</text>')
+    parts.append(f'<text transform="translate(20 {top + height / 2}) rotate(-90)" text-anchor="middle">{chart["y"]}</text>')
+
+    if current is not None:
+        cx = left + (current[0] - x_values[0]) / (x_values[-1] - x_values[0]) * width
+        cy = top + height - (current[1] - y_values[0]) / (y_values[-1] - y_values[0]) * height
+        parts.append(f'<circle cx="{cx:.1f}" cy="{cy:.1f}" r="4" fill="white" stroke="black"/>')
+
+    bar_x = left + width + 20
+    for i, color in enumerate(reversed(PALETTE)):
+        parts.append(f'<rect x="{bar_x}" y="{top + i * height / len(PALETTE):.1f}" width="16" '
+                     f'height="{height / len(PALETTE) + 0.5:.1f}" fill="rgb{color}"/>')
+    parts.append(f'<text x="{bar_x + 22}" y="{top + 10}">${high:.2f}</text>')
+    parts.append(f'<text x="{bar_x + 22}" y="{top + height}">${low:.2f}</text>')
+    parts.append('</svg>')
+    return '\n'.join(parts)
+
+
+def tornado_svg(result, market_price=None):
+    """SVG tornado chart: one bar per input from its low to high fair value"""
+    rows = result['rows']
+    label_width, bar_width, row_height, top = 230, 420, 26, 40
+    values = [r['low_fv'] for r in rows] + [r['high_fv'] for r in rows] + [result['fair_value']]
+    low, high = min(values), max(values)
+    scale = bar_width / ((high - low) or 1.0)
+
+    def x(value):
+        return label_width + (value - low) * scale
+
+    height = top + row_height * len(rows) + 40
+    base = x(result['fair_value'])
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{label_width + bar_width + 80}" height="{height}" '
+        f'font-family="sans-serif" font-size="12">',
+        f'<text x="10" y="22" font-size="14">Fair value with each input ±{result["span"] * 100:.0f}% '
+        f'(base ${result["fair_value"]:.2f})</text>',
+    ]
+    for i, row in enumerate(rows):
+        y = top + i * row_height
+        parts.append(f'<text x="{label_width - 8}" y="{y + 16}" text-anchor="end">{row["input"]}</text>')
+        for value, color in ((row['low_fv'], '#d7301f'), (row['high_fv'], '#1a9850')):
+            start, end = sorted((base, x(value)))
+            parts.append(f'<rect x="{start:.1f}" y="{y + 4}" width="{max(end - start, 1):.1f}" height="{row_height - 8}" '
+                         f'fill="{color}"/>')
+        left_value, right_value = sorted((row['low_fv'], row['high_fv']))
+        parts.append(f'<text x="{x(left_value) - 4:.1f}" y="{y + 16}" text-anchor="end" font-size="10">'
+                     f'${left_value:.2f}</text>')
+        parts.append(f'<text x="{x(right_value) + 4:.1f}" y="{y + 16}" font-size="10">${right_value:.2f}</text>')
+    bottom = top + row_height * len(rows)
+    parts.append(f'<line x1="{base:.1f}" y1="{top}" x2="{base:.1f}" y2="{bottom}" stroke="#333"/>')
+    if market_price is not None and low <= market_price <= high:
+        parts.append(f'<line x1="{x(market_price):.1f}" y1="{top}" x2="{x(market_price):.1f}" y2="{bottom}" '
+                     f'stroke="#333" stroke-dasharray="4 3"/>')
+        parts.append(f'<text x="{x(market_price):.1f}" y="{bottom + 16}" text-anchor="middle">market</text>')
+    parts.append(f'<text x="{label_width}" y="{bottom + 32}" font-size="10">red: input -{result["span"] * 100:.0f}%, '
+                 f'green: input +{result["span"] * 100:.0f}%</text>')
+    parts.append('</svg>')
+    return '\n'.join(parts)
+
+
+def export(charts, tornado_result, out_dir, formats=('svg', 'png'), market_price=None, current=None):
+    """Write sensitivity.npz/.json and the rendered charts; returns the files written"""
+    import numpy as np
+
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    arrays = {}
+    for chart in charts:
+        key = f"{chart['x']}__{chart['y']}"
+        arrays[key] = chart['grid']
+        arrays[f'{key}__x'] = chart['x_values']
+        arrays[f'{key}__y'] = chart['y_values']
+        image = heatmap_image(chart, market_price)
+        if 'png' in formats:
+            path = os.path.join(out_dir, f'heatmap_{key}.png')
+            with open(path, 'wb') as f:
+                f.write(png_bytes(image))
+            written.append(path)
+        if 'svg' in formats:
+            point = None if current is None else (current[chart['x']], current[chart['y']])
+            path = os.path.join(out_dir, f'heatmap_{key}.svg')
+            with open(path, 'w') as f:
+                f.write(heatmap_svg(chart, image, point))
+            written.append(path)
+
+    path = os.path.join(out_dir, 'sensitivity.npz')
+    np.savez(path, **arrays)
+    written.append(path)
+    path = os.path.join(out_dir, 'sensitivity.json')
+    with open(path, 'w') as f:
+        json.dump({'pairs': [[c['x'], c['y']] for c in charts], 'tornado': tornado_result,
+                   'market_price': market_price}, f, indent=2)
+    written.append(path)
+    if 'svg' in formats:
+        path = os.path.join(out_dir, 'tornado.svg')
+        with open(path, 'w') as f:
+            f.write(tornado_svg(tornado_result, market_price))
+        written.append(path)
+    return written
+
+
+def main(argv, model_key):
+    """CLI: charts [--out DIR] [--top N] [--points N] [--span F] [--pair X,Y ...] [--format svg,png]"""
+    import argparse
+    import time
+    from valuation_implied import model_inputs
+
+    parser = argparse.ArgumentParser(prog=f"{MODELS[model_key][0]}.py charts")
+    parser.add_argument('--out', default='sensitivity_charts', help='output directory')
+    parser.add_argument('--top', type=int, default=8, help='heatmaps for every pair of the top N inputs')
+    parser.add_argument('--points', type=int, default=200, help='grid points per axis')
+    parser.add_argument('--span', type=float, default=0.2, help='±fraction around current values')
+    parser.add_argument('--pair', action='append', help='X,Y input pair (repeatable; replaces --top pairs)')
+    parser.add_argument('--format', default='svg,png', help='chart formats: svg, png or both')
+    args = parser.parse_args(argv)
+
+    model = load_model(model_key)
+    model.load_state()
+    current = model_inputs(model_key, model)
+    ranked, tornado_names = chart_inputs(model_key, model, args.top)
+    if args.pair:
+        pairs = [tuple(part.strip() for part in pair.split(',')) for pair in args.pair]
+    else:
+        pairs = list(combinations(ranked, 2))
+    unknown = sorted({name for pair in pairs for name in pair if name not in current})
+    if unknown or any(len(pair) != 2 for pair in pairs):
+        print(f"\n❌ Pairs must be two model inputs ({', '.join(current)})")
+        return 1
+
+    market_price = getattr(model, 'market_price', 75)
+    started = time.perf_counter()
+    charts = heatmaps(model_key, model, pairs, args.points, args.span)
+    tornado_result = tornado(model_key, model, tornado_names, args.span)
+    computed = time.perf_counter() - started
+    formats = tuple(f.strip() for f in args.format.split(','))
+    written = export(charts, tornado_result, args.out, formats, market_price, current)
+    rendered = time.perf_counter() - started - computed
+
+    print("\n" + "="*70)
+    print(f"SENSITIVITY CHARTS: {len(pairs)} heatmaps of {args.points}x{args.points} "
+          f"({len(pairs) * args.points ** 2:,} scenarios) in {computed:.3f}s, drawn in {rendered:.2f}s")
+    print("="*70)
+    print(f"\nBase fair value: ${tornado_result['fair_value']:.2f}/share\n")
+    for row in tornado_result['rows']:
+        print(f"   {row['input']:<34} ${row['low_fv']:>8.2f} … ${row['high_fv']:<8.2f}")
+    print(f"\n✓ {len(written)} files in {args.out}/ (arrays in sensitivity.npz, tornado.svg, heatmap_*)\n")
+    return 0
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Valuation Oracle - Multi-Ticker Book
+
+Company specs live in companies/<ticker>.json (next to this file, unless
+a directory is given):
+
+    {
+      "ticker": "UBER",
+      "name": "Uber Technologies",
+      "model": "v1",
+      "facts": {"shares_outstanding": 2.1, "net_debt": 5.0, "current_revenue": 40.0,
+                "current_ad_revenue": 1.1, "market_price": 75},
+      "consensus": {"revenue_growth_2025_2027": 12, "ebitda_margin_2027": 15, ...},
+      "questions": [{"id": ..., "text": ..., "unit": ..., "impact_per_point": ...,
+                     "uncertainty": ...}, ...]
+    }
+
+The questions are the company's library, highest impact first: what
+UberValuation(company) asks, with impact_per_point ($/share per unit)
+and an optional uncertainty (std dev of the answer, the weight
+valuation_ordering gives it; default 20% of the value).
+
+CompanyBook stacks every company's facts and consensus into arrays and
+values the whole book with one call of the V1 model (the same
+project_fair_value the single-company tool uses).
+"""
+
+import glob
+import json
+import os
+import sys
+
+from uber_valuation_v1 import MODEL_INPUTS, project_fair_value
+
+# Column order of the per-company parameter arrays
+V1_PARAMS = (
+    'revenue_growth_2025_2027',
+    'delivery_take_rate_2027',
+    'mobility_take_rate_2027',
+    'ebitda_margin_2027',
+    'advertising_revenue_2027',
+    'regulatory_cost_annual',
+    'ebitda_multiple',
+    'stock_based_comp_pct',
+)
+
+COMPANIES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'companies')
+
+# The subset the fair-value model actually reads
+REQUIRED_CONSENSUS = MODEL_INPUTS
+
+REQUIRED_FACTS = ('shares_outstanding', 'net_debt', 'current_revenue', 'current_ad_revenue', 'market_price')
+
+REQUIRED_QUESTION = ('id', 'text', 'unit', 'impact_per_point')
+
+UBER = os.path.join(COMPANIES_DIR, 'uber.json')
+
+
+def load_company(path):
+    """Load and check one company spec"""
+    with open(path, 'r') as f:
+        spec = json.load(f)
+
+    if spec.get('model', 'v1') != 'v1':
+        raise ValueError(f"{path}: only the v1 model is supported, got {spec['model']!r}")
+    missing = [k for k in REQUIRED_FACTS if k not in spec.get('facts', {})]
+    missing += [k for k in REQUIRED_CONSENSUS if k not in spec.get('consensus', {})]
+    if 'ticker' not in spec:
+        missing.append('ticker')
+    if missing:
+        raise ValueError(f"{path}: missing {', '.join(missing)}")
+
+    for i, question in enumerate(spec.setdefault('questions', [])):
+        missing = [k for k in REQUIRED_QUESTION if k not in question]
+        if missing:
+            raise ValueError(f"{path}: questions[{i}] missing {', '.join(missing)}")
+        if question['id'] not in spec['consensus']:
+            raise ValueError(f"{path}: question {question['id']!r} has no consensus value")
+        question.setdefault('context', '')
+        question.setdefault('current_estimate', spec['consensus'][question['id']])
+    return spec
+
+
+def load_companies(directory=None):
+    """Every company spec in a directory (default COMPANIES_DIR), sorted by file name"""
+    directory = COMPANIES_DIR if directory is None else directory
+    if not os.path.isdir(directory):
+        raise ValueError(f"{directory}: no such companies directory")
+    return [load_company(path) for path in sorted(glob.glob(os.path.join(directory, '*.json')))]
+
+
+class CompanyBook:
+    """Many companies valued together from per-company parameter arrays"""
+
+    def __init__(self, specs):
+        import numpy as np
+
+        self.specs = list(specs)
+        self.tickers = [spec['ticker'] for spec in self.specs]
+        self.index = {ticker: i for i, ticker in enumerate(self.tickers)}
+        if len(self.index) != len(self.tickers):
+            raise ValueError("Duplicate tickers in book")
+
+        self.facts = {
+            name: np.array([float(spec['facts'][name]) for spec in self.specs])
+            for name in REQUIRED_FACTS
+        }
+        self.consensus = np.array([
+            [float(spec['consensus'].get(param, np.nan)) for param in V1_PARAMS]
+            for spec in self.specs
+        ]).reshape(len(self.specs), len(V1_PARAMS))
+
+        # User overrides; NaN means "use consensus"
+        self.estimates = np.full_like(self.consensus, np.nan)
+
+    def set_estimate(self, ticker, param, value):
+        self.estimates[self.index[ticker], V1_PARAMS.index(param)] = value
+
+    def clear_estimates(self, ticker=None):
+        import numpy as np
+
+        if ticker is None:
+            self.estimates[:] = np.nan
+        else:
+            self.estimates[self.index[ticker]] = np.nan
+
+    def set_market_prices(self, prices):
+        """Update prices from a {ticker: price} mapping"""
+        for ticker, price in prices.items():
+            self.facts['market_price'][self.index[ticker]] = price
+
+    def effective(self):
+        """(n_companies, n_params) array of overrides merged over consensus"""
+        import numpy as np
+
+        return np.where(np.isnan(self.estimates), self.consensus, self.estimates)
+
+    def value_all(self):
+        """Fair value and upside for every company in one vectorized pass"""
+        x = self.effective()
+        column = {param: x[:, i] for i, param in enumerate(V1_PARAMS)}
+        facts = self.facts
+
+        (fair_value, revenue_2027, ebitda_2027, true_ebitda,
+         enterprise_value, equity_value) = project_fair_value(
+            column['revenue_growth_2025_2027'],
+            column['advertising_revenue_2027'],
+            column['ebitda_margin_2027'],
+            column['regulatory_cost_annual'],
+            column['stock_based_comp_pct'],
+            column['ebitda_multiple'],
+            facts['current_revenue'],
+            facts['net_debt'],
+            facts['shares_outstanding'],
+            facts['current_ad_revenue'],
+        )
+
+        return {
+            'ticker': self.tickers,
+            'fair_value_per_share': fair_value,
+            'market_price': facts['market_price'],
+            'upside_pct': (fair_value - facts['market_price']) / facts['market_price'] * 100,
+            'revenue_2027': revenue_2027,
+            'ebitda_2027': ebitda_2027,
+            'true_ebitda_2027': true_ebitda,
+            'enterprise_value': enterprise_value,
+            'equity_value': equity_value,
+        }
+
+    def ranked(self, limit=None):
+        """Companies as dicts, most undervalued first"""
+        values = self.value_all()
+        order = values['upside_pct'].argsort()[::-1][:limit]
+        return [{
+            'ticker': self.tickers[i],
+            'fair_value_per_share': round(float(values['fair_value_per_share'][i]), 2),
+            'market_price': float(values['market_price'][i]),
+            'upside_pct': round(float(values['upside_pct'][i]), 1),
+        } for i in order]
+
+
+def main(argv):
+    """CLI: valuation_companies.py [companies_dir]"""
+    import time
+
+    started = time.perf_counter()
+    try:
+        book = CompanyBook(load_companies(argv[0] if argv else None))
+    except ValueError as e:
+        print(f"\n❌ {e}")
+        return 1
+    rows = book.ranked()
+    elapsed = time.perf_counter() - started
+
+    print("\n" + "="*60)
+    print(f"BOOK: {len(rows)} companies valued in {elapsed * 1000:.1f} ms")
+    print("="*60)
+    for row in rows:
+        marker = "📈" if row['upside_pct'] > 0 else "📉"
+        print(f"{marker} {row['ticker']:<8} fair ${row['fair_value_per_share']:>9.2f}"
+              f"   market ${row['market_price']:>8.2f}   {row['upside_pct']:+.1f}%")
+    print("="*60 + "\n")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
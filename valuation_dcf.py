@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Valuation Oracle - Discounted Cash Flow Mode
+
+Layer 2 of TWO_LAYER_APPROACH.md: project today's reality forward month
+by month (or quarter by quarter) and discount the cash it throws off,
+instead of compounding one year of growth and applying a multiple.
+
+Each segment starts from the interview's current-reality answers:
+    Mobility, Delivery   core revenue (run rate less Freight and Ads),
+                         split by mobility_share_of_core, growing at
+                         their MoM GMV growth
+    Freight              freight_quarterly_revenue
+    Advertising          advertising_revenue_run_rate at advertising_margin
+
+Growth fades toward long_run_growth with a half-life of
+growth_fade_half_life_months. The core EBITDA margin widens by
+margin_expansion_per_year up to margin_ceiling, SBC (a real cost) trends
+by sbc_trend_per_year, regulatory liabilities on the books are paid over
+regulatory_payout_months on top of an ongoing regulatory_annual, and
+capex holds its share of revenue. Free cash flow is discounted at wacc,
+with a Gordon terminal value on the last year's cash flow.
+
+Every input may be a number or a NumPy array with one value per
+scenario, so many scenarios are projected at once as (scenarios x
+periods) arrays: growth compounds with a cumulative product along the
+time axis, not a loop over periods.
+"""
+
+import json
+import sys
+import time
+
+# Projection assumptions the interview doesn't ask about (rates in % a year
+# unless the name says otherwise)
+DCF_DEFAULTS = {
+    'mobility_share_of_core': 60,        # % of Mobility + Delivery revenue
+    'freight_growth_mom': 0.5,
+    'advertising_growth_mom': 2.5,
+    'growth_fade_half_life_months': 12,
+    'long_run_growth': 3.0,
+    'margin_expansion_per_year': 1.5,    # points of core EBITDA margin
+    'margin_ceiling': 25,
+    'freight_margin': 2,
+    'sbc_trend_per_year': -0.5,          # points of revenue
+    'regulatory_payout_months': 12,
+    'regulatory_annual': 300,            # $M
+    'tax_rate': 21,
+    'wacc': 9.0,
+    'terminal_growth': 3.0,
+}
+
+# Interview answers the projection reads that calculate_fair_value doesn't
+# (unanswered, they take the question's baseline)
+EXTRA_INPUTS = ('freight_quarterly_revenue', 'capex_run_rate')
+
+SEGMENTS = ('mobility', 'delivery', 'freight', 'advertising')
+
+STEPS = {'month': 12, 'quarter': 4}
+
+
+def dcf_inputs(interview, assumptions=None):
+    """Every projection input by name: answers (or model defaults), facts and DCF_DEFAULTS"""
+    from uber_valuation_v2_ceo_mode import MODEL_DEFAULTS
+
+    answers = interview.answers if assumptions is None else assumptions
+    baselines = {q['id']: q.get('baseline') for q in interview.questions}
+    inputs = dict(DCF_DEFAULTS)
+    inputs.update(interview.facts())
+    inputs['revenue_last_week'] = interview.model_input('revenue_last_week', answers)
+    for qid in MODEL_DEFAULTS:
+        inputs[qid] = interview.model_input(qid, answers)
+    for qid in EXTRA_INPUTS:
+        inputs[qid] = answers.get(qid, baselines[qid])
+    return inputs
+
+
+def project(inputs, horizon_months=36, step='month', paths=False, growth=None, margin_shift=None):
+    """
+    Project and discount every scenario in `inputs` (numbers or arrays of
+    one value per scenario). Returns per-scenario arrays of fair value per
+    share and its parts ($B); paths=True adds per-period segment revenue,
+    EBITDA and free cash flow as (scenarios x periods) arrays.
+
+    `growth` maps segments to (scenarios x periods) revenue growth rates
+    used instead of the faded MoM growth (see valuation_paths), and
+    `margin_shift` adds points to the core EBITDA margin period by period.
+    """
+    import numpy as np
+    from uber_valuation_v2_ceo_mode import quarterly_revenue_from_week
+
+    if step not in STEPS:
+        raise ValueError(f"Unknown step {step!r} (use {' or '.join(STEPS)})")
+    per_year = STEPS[step]
+    months_per_period = 12 // per_year
+    if horizon_months < 12 or horizon_months % months_per_period:
+        raise ValueError(f"Horizon must be at least 12 months and whole {step}s")
+    periods = horizon_months // months_per_period
+
+    def column(name):
+        # (scenarios, 1), so it broadcasts against (periods,) time vectors
+        return np.asarray(inputs[name], dtype=np.float64).reshape(-1, 1)
+
+    t = np.arange(1, periods + 1, dtype=np.float64)
+    years = t / per_year
+
+    # === 1. SEGMENT REVENUE ($B per period) ===
+    quarterly_revenue = quarterly_revenue_from_week(column('revenue_last_week'))
+    to_period = 4 / per_year
+    freight_start = column('freight_quarterly_revenue') / 1000
+    ads_start = column('advertising_revenue_run_rate') / 1000
+    core_start = quarterly_revenue - freight_start - ads_start
+    mobility_share = column('mobility_share_of_core') / 100
+    starts = {
+        'mobility': core_start * mobility_share,
+        'delivery': core_start * (1 - mobility_share),
+        'freight': freight_start,
+        'advertising': ads_start,
+    }
+    growth_mom = {
+        'mobility': column('mobility_gmv_growth_mom'),
+        'delivery': column('delivery_gmv_growth_mom'),
+        'freight': column('freight_growth_mom'),
+        'advertising': column('advertising_growth_mom'),
+    }
+
+    long_run = (1 + column('long_run_growth') / 100) ** (1 / per_year) - 1
+    fade = 0.5 ** (months_per_period * (t - 1) / column('growth_fade_half_life_months'))
+    growth = growth or {}
+    revenue = {}
+    for segment in SEGMENTS:
+        if segment in growth:
+            rate = growth[segment] + 1
+        else:
+            first = (1 + growth_mom[segment] / 100) ** months_per_period - 1
+            rate = long_run + (first - long_run) * fade
+            rate += 1
+        revenue[segment] = starts[segment] * to_period * np.cumprod(rate, axis=1)
+    total_revenue = revenue['mobility'] + revenue['delivery'] + revenue['freight'] + revenue['advertising']
+
+    # === 2. EBITDA BY SEGMENT ===
+    core_margin = column('ebitda_margin_current_quarter') + column('margin_expansion_per_year') * years
+    if margin_shift is not None:
+        core_margin = core_margin + margin_shift
+    core_margin = np.minimum(core_margin, column('margin_ceiling')) / 100
+    ebitda = ((revenue['mobility'] + revenue['delivery']) * core_margin
+              + revenue['freight'] * (column('freight_margin') / 100)
+              + revenue['advertising'] * (column('advertising_margin') / 100))
+
+    # === 3. FREE CASH FLOW ===
+    sbc_pct = column('stock_based_comp_run_rate') / 1000 / quarterly_revenue
+    sbc = total_revenue * np.maximum(sbc_pct + column('sbc_trend_per_year') / 100 * years, 0)
+    payout_periods = np.maximum(column('regulatory_payout_months') / months_per_period, 1)
+    regulatory = np.where(t <= payout_periods, column('regulatory_liabilities_on_books') / 1000 / payout_periods, 0)
+    regulatory += column('regulatory_annual') / 1000 / per_year
+    operating = ebitda - sbc - regulatory
+    taxes = np.maximum(operating, 0) * (column('tax_rate') / 100)
+    capex = total_revenue * (column('capex_run_rate') / 1000 / quarterly_revenue)
+    cash_flow = operating - taxes - capex
+
+    # === 4. DISCOUNT ===
+    wacc = column('wacc') / 100
+    terminal_growth = column('terminal_growth') / 100
+    period_rate = (1 + wacc) ** (1 / per_year) - 1
+    discount = (1 + period_rate) ** -t
+    pv_cash_flows = (cash_flow * discount).sum(axis=1)
+    last_year = cash_flow[:, -per_year:].sum(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        terminal = np.where(wacc > terminal_growth, last_year * (1 + terminal_growth) / (wacc - terminal_growth), np.nan)
+    pv_terminal = (terminal * discount[:, -1:])[:, 0]
+
+    enterprise_value = pv_cash_flows + pv_terminal
+    equity_value = enterprise_value - column('net_debt')[:, 0]
+    result = {
+        'fair_value_per_share': equity_value / column('shares_outstanding')[:, 0],
+        'enterprise_value': enterprise_value,
+        'equity_value': equity_value,
+        'pv_cash_flows': pv_cash_flows,
+        'pv_terminal': pv_terminal,
+    }
+    if paths:
+        result['revenue'] = revenue
+        result['ebitda'] = ebitda
+        result['cash_flow'] = cash_flow
+    return result
+
+
+def value_scenarios(inputs, distributions, scenarios, horizon_months=36, step='month',
+                    seed=None, block_size=50_000):
+    """
+    Fair value per share for `scenarios` draws of the inputs named in
+    `distributions` (see valuation_montecarlo.draw); the rest are fixed
+    at `inputs`. Scenarios are projected in blocks of `block_size`.
+    """
+    import numpy as np
+    from valuation_montecarlo import draw
+
+    rng = np.random.default_rng(seed)
+    fair_values = np.empty(scenarios, dtype=np.float64)
+    for start in range(0, scenarios, block_size):
+        n = min(block_size, scenarios - start)
+        sampled = dict(inputs)
+        sampled.update({name: draw(spec, n, rng) for name, spec in distributions.items()})
+        block = project(sampled, horizon_months, step)['fair_value_per_share']
+        fair_values[start:start + n] = np.broadcast_to(block, (n,))
+    return fair_values
+
+
+def default_distributions(interview, inputs):
+    """Normal spreads on each projected interview answer (as the ordering mode assumes)"""
+    from uber_valuation_v2_ceo_mode import MODEL_DEFAULTS
+    from valuation_ordering import answer_std
+
+    questions = {q['id']: q for q in interview.questions}
+    distributions = {}
+    for qid in ('revenue_last_week',) + tuple(MODEL_DEFAULTS) + EXTRA_INPUTS:
+        if qid == 'share_buyback_last_quarter' or qid == 'monthly_active_riders_growth':
+            continue  # not read by the projection
+        distributions[qid] = {'dist': 'normal', 'mean': inputs[qid],
+                              'std': answer_std(questions[qid], inputs[qid])}
+    return distributions
+
+
+def main(argv):
+    """
+    CLI: dcf [--months N] [--quarterly] [--scenarios N] [--distributions FILE] [--seed N]
+
+    Projects your saved interview answers. With --scenarios, answers named
+    in the distributions file (or, without one, every projected answer at
+    +/-20%) are drawn per scenario.
+    """
+    import argparse
+    import numpy as np
+    from uber_valuation_v2_ceo_mode import UberCEOInterview
+    from valuation_montecarlo import summarize
+
+    parser = argparse.ArgumentParser(prog='uber_valuation_v2_ceo_mode.py dcf')
+    parser.add_argument('--months', type=int, default=36)
+    parser.add_argument('--quarterly', action='store_true', help='quarterly instead of monthly steps')
+    parser.add_argument('--scenarios', type=int, default=0)
+    parser.add_argument('--distributions', help='JSON of distribution specs, as for montecarlo')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+    step = 'quarter' if args.quarterly else 'month'
+
+    interview = UberCEOInterview()
+    interview.load_state()
+    inputs = dcf_inputs(interview)
+
+    try:
+        base = project(inputs, args.months, step, paths=True)
+    except ValueError as e:
+        print(f"\n❌ {e}")
+        return 1
+
+    per_year = STEPS[step]
+    print("\n" + "="*70)
+    print(f"DISCOUNTED CASH FLOW: {args.months} months, {step}ly steps, WACC {inputs['wacc']}%")
+    print("="*70)
+    print(f"\n{'Year':<6}" + ''.join(f"{s.title():>12}" for s in SEGMENTS) + f"{'EBITDA':>10}{'FCF':>10}   ($B)")
+    for year in range(args.months // 12):
+        span = slice(year * per_year, (year + 1) * per_year)
+        row = ''.join(f"{base['revenue'][s][0, span].sum():>12.2f}" for s in SEGMENTS)
+        print(f"{year + 1:<6}{row}{base['ebitda'][0, span].sum():>10.2f}{base['cash_flow'][0, span].sum():>10.2f}")
+
+    fair_value = float(base['fair_value_per_share'][0])
+    pv_terminal = float(base['pv_terminal'][0])
+    enterprise_value = float(base['enterprise_value'][0])
+    print(f"\nPV of cash flows:    ${float(base['pv_cash_flows'][0]):.1f}B")
+    print(f"PV of terminal:      ${pv_terminal:.1f}B ({pv_terminal / enterprise_value * 100:.0f}% of EV)")
+    print(f"Enterprise value:    ${enterprise_value:.1f}B")
+    print(f"\n💰 DCF fair value: ${fair_value:.2f}/share (market ${interview.market_price})")
+
+    if args.scenarios:
+        if args.distributions:
+            with open(args.distributions, 'r') as f:
+                distributions = json.load(f)
+            unknown = [name for name in distributions if name not in inputs]
+            if unknown:
+                print(f"\n❌ Unknown inputs: {', '.join(unknown)}")
+                return 1
+        else:
+            distributions = default_distributions(interview, inputs)
+        start = time.perf_counter()
+        fair_values = value_scenarios(inputs, distributions, args.scenarios, args.months, step, args.seed)
+        elapsed = time.perf_counter() - start
+        summary = summarize(fair_values[np.isfinite(fair_values)], (5, 25, 50, 75, 95), interview.market_price)
+        print(f"\n{args.scenarios:,} scenarios x {args.months // (12 // per_year)} {step}s in {elapsed:.2f}s")
+        print(f"Mean fair value: ${summary['mean']}/share (std ${summary['std']})")
+        for p, value in summary['percentiles'].items():
+            print(f"   P{p:<3} ${value:.2f}")
+        print(f"\n📈 Chance Uber is undervalued: {summary['prob_undervalued'] * 100:.1f}%")
+    print("\n" + "="*70)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Valuation Oracle - Incremental Recomputation
+
+The CEO-interview fair value as a graph of named intermediate nodes.
+Changing one input marks only its downstream nodes dirty, and reading a
+node recomputes just the dirty nodes it depends on. Each node is one of
+the pipeline stage functions in uber_valuation_v2_ceo_mode, so results
+match calculate_fair_value() exactly.
+
+    graph = ValuationGraph.from_interview(interview)
+    graph.set_input('advertising_margin', 80)
+    # -> {'ad_ebitda', 'true_ebitda', 'enterprise_value', 'equity_value', 'fair_value_per_share'}
+    graph.value('fair_value_per_share')
+"""
+
+from uber_valuation_v2_ceo_mode import (
+    MODEL_DEFAULTS,
+    quarterly_revenue_from_week,
+    growth_multiple,
+    annualize_revenue,
+    apply_margin,
+    annual_sbc,
+    regulatory_drag,
+    advertising_ebitda,
+    combine_true_ebitda,
+    apply_multiple,
+    net_of_debt,
+    buyback_adjusted_shares,
+    per_share_value,
+)
+
+
+def _quarterly_revenue(revenue_last_week, last_quarter_revenue):
+    if revenue_last_week is None:
+        return last_quarter_revenue
+    return quarterly_revenue_from_week(revenue_last_week)
+
+
+# Node name -> (function, inputs). Inputs are other nodes or graph inputs
+# (model answers and company facts). Listed in dependency order.
+NODES = {
+    'quarterly_revenue': (_quarterly_revenue, ('revenue_last_week', 'last_quarter_revenue')),
+    'annual_revenue': (annualize_revenue, ('quarterly_revenue', 'mobility_gmv_growth_mom', 'delivery_gmv_growth_mom')),
+    'ebitda': (apply_margin, ('annual_revenue', 'ebitda_margin_current_quarter')),
+    'sbc': (annual_sbc, ('stock_based_comp_run_rate',)),
+    'regulatory_drag': (regulatory_drag, ('regulatory_liabilities_on_books',)),
+    'ad_ebitda': (advertising_ebitda, ('advertising_revenue_run_rate', 'advertising_margin')),
+    'true_ebitda': (combine_true_ebitda, ('ebitda', 'sbc', 'regulatory_drag', 'ad_ebitda')),
+    'multiple': (growth_multiple, ('monthly_active_riders_growth',)),
+    'enterprise_value': (apply_multiple, ('true_ebitda', 'multiple')),
+    'equity_value': (net_of_debt, ('enterprise_value', 'net_debt')),
+    'adjusted_share_count': (buyback_adjusted_shares, ('share_buyback_last_quarter', 'shares_outstanding', 'market_price')),
+    'fair_value_per_share': (per_share_value, ('equity_value', 'adjusted_share_count')),
+}
+
+FACTS = ('last_quarter_revenue', 'shares_outstanding', 'net_debt', 'market_price')
+
+# calculate_fair_value() result key -> node
+OUTPUTS = {
+    'fair_value_per_share': 'fair_value_per_share',
+    'annual_revenue': 'annual_revenue',
+    'true_ebitda': 'true_ebitda',
+    'enterprise_value': 'enterprise_value',
+    'equity_value': 'equity_value',
+    'multiple_used': 'multiple',
+    'shares_outstanding': 'adjusted_share_count',
+}
+
+
+class ValuationGraph:
+    """Fair-value pipeline with dirty tracking and lazy recomputation"""
+
+    def __init__(self, inputs, nodes=NODES, outputs=OUTPUTS):
+        self.nodes = nodes
+        self.outputs = outputs
+        self.inputs = dict(inputs)
+        self.values = {}
+        self.dirty = set(nodes)
+        self.recomputed = []  # nodes evaluated by the most recent read
+
+        # input or node -> nodes that read it directly
+        self.dependents = {}
+        for name, (_, deps) in nodes.items():
+            for dep in deps:
+                self.dependents.setdefault(dep, []).append(name)
+        self._downstream = {}  # memo for downstream(); the structure never changes
+
+    @staticmethod
+    def interview_inputs(interview):
+        """Graph inputs for an interview's current answers (defaults where unanswered) and facts"""
+        spec = getattr(interview, 'spec', None)
+        if spec is not None:
+            inputs = {qid: interview.answers.get(qid, spec.defaults.get(qid)) for qid in spec.inputs}
+            inputs.update(spec.facts)
+            inputs.update(interview.facts())
+            return inputs
+
+        inputs = {qid: interview.model_input(qid) for qid in MODEL_DEFAULTS}
+        inputs['revenue_last_week'] = interview.answers.get('revenue_last_week')
+        for fact in FACTS:
+            inputs[fact] = getattr(interview, fact)
+        return inputs
+
+    @classmethod
+    def from_interview(cls, interview):
+        """Graph over an interview's current answers and facts"""
+        spec = getattr(interview, 'spec', None)
+        if spec is not None:
+            return cls(cls.interview_inputs(interview), spec.graph_nodes(), spec.spec['outputs'])
+        return cls(cls.interview_inputs(interview))
+
+    def sync(self, interview):
+        """
+        Catch up with answers and facts changed on the interview since the
+        graph was built (a new market price, a loaded session). Returns the
+        nodes dirtied.
+        """
+        dirtied = set()
+        for name, value in self.interview_inputs(interview).items():
+            dirtied |= self.set_input(name, value)
+        return dirtied
+
+    def downstream(self, name):
+        """Every node that (transitively) depends on an input or node"""
+        seen = self._downstream.get(name)
+        if seen is None:
+            seen = set()
+            stack = list(self.dependents.get(name, ()))
+            while stack:
+                node = stack.pop()
+                if node not in seen:
+                    seen.add(node)
+                    stack.extend(self.dependents.get(node, ()))
+            self._downstream[name] = seen = frozenset(seen)
+        return seen
+
+    def set_input(self, name, value):
+        """
+        Change one input. Returns the set of nodes it dirtied (empty if the
+        value didn't change or nothing in the model reads it).
+        """
+        if name in self.inputs and self.inputs[name] == value:
+            return set()
+        self.inputs[name] = value
+        dirtied = self.downstream(name)
+        self.dirty |= dirtied
+        return dirtied
+
+    def value(self, node):
+        """Current value of a node, recomputing only what's dirty"""
+        self.recomputed = []
+        return self._evaluate(node)
+
+    def _evaluate(self, node):
+        if node in self.inputs and node not in self.nodes:
+            return self.inputs[node]
+        if node in self.dirty:
+            fn, deps = self.nodes[node]
+            self.values[node] = fn(*(self._evaluate(dep) for dep in deps))
+            self.dirty.discard(node)
+            self.recomputed.append(node)
+        return self.values[node]
+
+    def result(self):
+        """Same dict as UberCEOInterview.calculate_fair_value()"""
+        node = self.outputs
+        fair_value = self.value(node['fair_value_per_share'])
+        return {
+            'fair_value_per_share': round(fair_value, 2),
+            'annual_revenue': round(self._evaluate(node['annual_revenue']), 2),
+            'true_ebitda': round(self._evaluate(node['true_ebitda']), 2),
+            'enterprise_value': round(self._evaluate(node['enterprise_value']), 2),
+            'equity_value': round(self._evaluate(node['equity_value']), 2),
+            'multiple_used': self._evaluate(node['multiple_used']),
+            'shares_outstanding': round(self._evaluate(node['shares_outstanding']), 3),
+        }
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Valuation Oracle - Valuation History
+
+Append-only, columnar record of every answer change and the fair value
+it produced. A store is a directory with one fixed-width binary file per
+column plus a small string table for question ids:
+
+    uber_ceo_interview.history/
+        params.json        ["ebitda_margin_current_quarter", ...]
+        timestamp.f64      seconds since epoch, non-decreasing
+        param.i32          index into params.json (-1 = snapshot, no answer changed)
+        value.f64          the new answer
+        fair_value.f64     fair value per share after the change
+
+Appends are a few bytes per column, never a rewrite. Reads memory-map
+the columns (needs NumPy), and time-range queries are a binary search on
+the timestamp column. compact() thins out old history.
+"""
+
+import json
+import os
+import struct
+import time
+
+COLUMNS = (
+    ('timestamp', 'd'),
+    ('param', 'i'),
+    ('value', 'd'),
+    ('fair_value', 'd'),
+)
+
+_EXTENSIONS = {'d': 'f64', 'i': 'i32'}
+_NUMPY_TYPES = {'d': '<f8', 'i': '<i4'}
+
+SNAPSHOT = -1
+DAY = 86400
+
+
+def _column_file(path, name, code):
+    return os.path.join(path, f"{name}.{_EXTENSIONS[code]}")
+
+
+class HistoryStore:
+    """One user's answer/fair-value history for one model"""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+        params_file = os.path.join(path, 'params.json')
+        if os.path.exists(params_file):
+            with open(params_file, 'r') as f:
+                self.params = json.load(f)
+        else:
+            self.params = []
+        self._codes = {name: i for i, name in enumerate(self.params)}
+        self._files = None
+        self.rows = self._repair()
+        self._last_timestamp = self._read_last_timestamp()
+
+    def _repair(self):
+        """Trim columns to a common length (a crash mid-append leaves them uneven)"""
+        counts = []
+        for name, code in COLUMNS:
+            file = _column_file(self.path, name, code)
+            size = os.path.getsize(file) if os.path.exists(file) else 0
+            counts.append(size // struct.calcsize('<' + code))
+        rows = min(counts)
+        for name, code in COLUMNS:
+            file = _column_file(self.path, name, code)
+            if os.path.exists(file) and os.path.getsize(file) != rows * struct.calcsize('<' + code):
+                with open(file, 'r+b') as f:
+                    f.truncate(rows * struct.calcsize('<' + code))
+        return rows
+
+    def _read_last_timestamp(self):
+        if self.rows == 0:
+            return float('-inf')
+        with open(_column_file(self.path, 'timestamp', 'd'), 'rb') as f:
+            f.seek((self.rows - 1) * 8)
+            return struct.unpack('<d', f.read(8))[0]
+
+    def _code(self, param):
+        if param is None:
+            return SNAPSHOT
+        if param not in self._codes:
+            self._codes[param] = len(self.params)
+            self.params.append(param)
+            tmp = os.path.join(self.path, 'params.json.tmp')
+            with open(tmp, 'w') as f:
+                json.dump(self.params, f)
+            os.replace(tmp, os.path.join(self.path, 'params.json'))
+        return self._codes[param]
+
+    def __len__(self):
+        return self.rows
+
+    # === WRITING ===
+
+    def record(self, param, value, fair_value, timestamp=None):
+        """Append one answer change (param=None records a plain snapshot)"""
+        self.record_many([(param, value, fair_value, timestamp)])
+
+    def record_many(self, changes):
+        """Append (param, value, fair_value[, timestamp]) rows in one write per column"""
+        buffers = {name: bytearray() for name, _ in COLUMNS}
+        count = 0
+        for change in changes:
+            param, value, fair_value = change[:3]
+            timestamp = change[3] if len(change) > 3 and change[3] is not None else time.time()
+            # Keep the timestamp column sorted so range queries can bisect
+            timestamp = max(timestamp, self._last_timestamp)
+            self._last_timestamp = timestamp
+            buffers['timestamp'] += struct.pack('<d', timestamp)
+            buffers['param'] += struct.pack('<i', self._code(param))
+            buffers['value'] += struct.pack('<d', float('nan') if value is None else value)
+            buffers['fair_value'] += struct.pack('<d', fair_value)
+            count += 1
+
+        if self._files is None:
+            self._files = {name: open(_column_file(self.path, name, code), 'ab')
+                           for name, code in COLUMNS}
+        for name, _ in COLUMNS:
+            self._files[name].write(buffers[name])
+        for name, _ in COLUMNS:
+            self._files[name].flush()
+        self.rows += count
+
+    def close(self):
+        if self._files is not None:
+            for f in self._files.values():
+                f.close()
+            self._files = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # === READING (NumPy, memory-mapped) ===
+
+    def columns(self):
+        """All columns as read-only memory-mapped arrays"""
+        import numpy as np
+
+        result = {}
+        for name, code in COLUMNS:
+            if self.rows == 0:
+                result[name] = np.empty(0, dtype=_NUMPY_TYPES[code])
+            else:
+                result[name] = np.memmap(_column_file(self.path, name, code), mode='r',
+                                         dtype=_NUMPY_TYPES[code], shape=(self.rows,))
+        return result
+
+    def query(self, start=None, end=None, param=None):
+        """
+        Rows with start <= timestamp < end (either bound optional), optionally
+        only changes to one question. Returns a dict of column arrays.
+        """
+        import numpy as np
+
+        cols = self.columns()
+        lo = 0 if start is None else int(np.searchsorted(cols['timestamp'], start, side='left'))
+        hi = self.rows if end is None else int(np.searchsorted(cols['timestamp'], end, side='left'))
+        rows = {name: np.asarray(col[lo:hi]) for name, col in cols.items()}
+        if param is not None:
+            mask = rows['param'] == self._codes.get(param, -2)
+            rows = {name: col[mask] for name, col in rows.items()}
+        return rows
+
+    def fair_value_series(self, days=None, now=None):
+        """(timestamps, fair values) over the last `days` days, or all time"""
+        start = None if days is None else (now or time.time()) - days * DAY
+        rows = self.query(start=start)
+        return rows['timestamp'], rows['fair_value']
+
+    def answers_at(self, timestamp=None):
+        """Replay the log into the answers as they stood at `timestamp` (default: now)"""
+        rows = self.query(end=None if timestamp is None else timestamp + 1e-9)
+        answers = {}
+        for code, value in zip(rows['param'].tolist(), rows['value'].tolist()):
+            if code != SNAPSHOT:
+                answers[self.params[code]] = value
+        return answers
+
+    # === MAINTENANCE ===
+
+    def compact(self, keep_days=90, bucket_seconds=DAY, now=None):
+        """
+        Keep full detail for the last `keep_days`; before that keep only the
+        last change per question (and last snapshot) per bucket. Replays of
+        answers_at() at bucket boundaries are unchanged. Returns rows removed.
+        """
+        import numpy as np
+
+        self.close()
+        cols = {name: np.array(col) for name, col in self.columns().items()}
+        cutoff = (now or time.time()) - keep_days * DAY
+        old = int(np.searchsorted(cols['timestamp'], cutoff, side='left'))
+        if old == 0:
+            return 0
+
+        buckets = (cols['timestamp'][:old] // bucket_seconds).astype(np.int64)
+        keys = buckets * (len(self.params) + 1) + (cols['param'][:old] + 1)
+        _, first_in_reversed = np.unique(keys[::-1], return_index=True)
+        keep = np.zeros(self.rows, dtype=bool)
+        keep[old - 1 - first_in_reversed] = True
+        keep[old:] = True
+
+        # Write every column before swapping any in, to keep the window
+        # where columns disagree as small as possible
+        for name, code in COLUMNS:
+            cols[name][keep].astype(_NUMPY_TYPES[code]).tofile(_column_file(self.path, name, code) + '.tmp')
+        for name, code in COLUMNS:
+            os.replace(_column_file(self.path, name, code) + '.tmp', _column_file(self.path, name, code))
+
+        removed = self.rows - int(keep.sum())
+        self.rows -= removed
+        return removed
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Valuation Oracle - Implied Assumptions
+
+What is the market pricing in? Works the models backwards: given a price
+(or thousands of them, e.g. a price history), find
+
+    implied_input       the value of one input that makes the fair value
+                        equal each price, all else as answered
+    implied_deviations  the smallest set of changes to several inputs
+                        that does, each measured in its uncertainty
+                        (valuation_ordering.answer_std), so no single
+                        answer has to carry the whole gap
+
+Both solve every price at once on the batch engine (one vectorized
+evaluation per iteration). implied_input brackets each root and
+bisects, so it also copes with V2's stepped growth multiple: a price
+that falls inside a step has no exact answer, and is reported as a
+jump at the input value where the step happens.
+
+Each result carries a status per price:
+    converged    fair value within `tolerance` of the price
+    jump         the price falls in a discontinuity (value is its location)
+    no_bracket   no input value in range reaches the price
+    flat         the inputs don't move the fair value (min-norm only)
+    max_iter     still short of `tolerance` after max_iter iterations
+"""
+
+from valuation_sweep import MODELS, batch_fair_values, load_model
+
+
+def model_inputs(model_key, model):
+    """Names the batch engine reads, mapped to their current values"""
+    if model_key == 'v1':
+        return dict(zip(model.consensus, model.assumption_vector()))
+    from uber_valuation_v2_ceo_mode import MODEL_INPUTS
+
+    names = MODEL_INPUTS if model.spec is None else model.spec.inputs
+    return {name: model.model_input(name) for name in names}
+
+
+def _check_names(model_key, model, names):
+    current = model_inputs(model_key, model)
+    unknown = [name for name in names if name not in current]
+    if unknown:
+        raise ValueError(f"Not {model_key} model inputs: {', '.join(unknown)}")
+    return current
+
+
+def implied_input(model_key, model, name, prices, low=None, high=None, tolerance=0.005,
+                  max_iter=200, max_expand=40):
+    """
+    Value of input `name` at which the fair value equals each price.
+
+    The search starts from [low, high] (default: the current value +/-50%)
+    and widens until the fair value crosses the price. Returns arrays:
+    value, fair_value, status, iterations.
+    """
+    import numpy as np
+
+    current = float(_check_names(model_key, model, [name])[name])
+    prices = np.atleast_1d(np.asarray(prices, dtype=np.float64))
+    n = prices.size
+
+    def gap(x):
+        return batch_fair_values(model_key, model, {name: x}, x.size) - prices
+
+    width = max(abs(current) * 0.5, 1.0)
+    lo = np.full(n, current - width if low is None else float(low))
+    hi = np.full(n, current + width if high is None else float(high))
+    g_lo, g_hi = gap(lo), gap(hi)
+
+    # Widen until each bracket straddles its price
+    for _ in range(max_expand):
+        open_ = np.sign(g_lo) == np.sign(g_hi)
+        if not open_.any():
+            break
+        span = (hi - lo)[open_]
+        if low is None:
+            lo[open_] -= span
+        if high is None:
+            hi[open_] += span
+        if low is not None and high is not None:
+            break
+        g_lo, g_hi = gap(lo), gap(hi)
+    bracketed = np.sign(g_lo) != np.sign(g_hi)
+
+    iterations = np.zeros(n, dtype=np.int64)
+    x_tolerance = 1e-12 * np.maximum(np.abs(lo) + np.abs(hi), 1.0)
+    active = bracketed & (np.abs(g_lo) > tolerance) & (np.abs(g_hi) > tolerance)
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        mid = 0.5 * (lo + hi)
+        g_mid = gap(mid)
+        left = np.sign(g_mid) == np.sign(g_lo)
+        lo = np.where(active & left, mid, lo)
+        g_lo = np.where(active & left, g_mid, g_lo)
+        hi = np.where(active & ~left, mid, hi)
+        g_hi = np.where(active & ~left, g_mid, g_hi)
+        iterations += active
+        active &= (np.abs(g_mid) > tolerance) & (hi - lo > x_tolerance)
+
+    # Report whichever end of the bracket is closer to the price
+    use_lo = np.abs(g_lo) <= np.abs(g_hi)
+    value = np.where(use_lo, lo, hi)
+    residual = np.where(use_lo, g_lo, g_hi)
+    status = np.full(n, 'converged', dtype=object)
+    status[np.abs(residual) > tolerance] = 'max_iter'
+    status[(np.abs(residual) > tolerance) & (hi - lo <= x_tolerance)] = 'jump'
+    status[~bracketed] = 'no_bracket'
+    value[~bracketed] = np.nan
+    return {
+        'value': value,
+        'fair_value': residual + prices,
+        'status': status,
+        'iterations': iterations,
+    }
+
+
+def implied_deviations(model_key, model, names, prices, scales=None, tolerance=0.005, max_iter=50):
+    """
+    Smallest changes to `names` (measured in units of `scales`, default
+    each answer's uncertainty) that make the fair value equal each price.
+
+    Gauss-Newton on the single pricing equation: each iteration moves to
+    the minimum-norm point of its linearization, with finite-difference
+    gradients for all prices in one batch call. Returns arrays: values
+    ({name: array}), deviations ({name: array}, in input units),
+    fair_value, status, iterations.
+    """
+    import numpy as np
+    from valuation_ordering import answer_std
+
+    current = _check_names(model_key, model, names)
+    questions = {q['id']: q for q in model.questions}
+    x0 = np.array([float(current[name]) for name in names])
+    if scales is None:
+        scales = [answer_std(questions.get(name, {}), value) for name, value in zip(names, x0)]
+    scales = np.asarray(scales, dtype=np.float64)
+    prices = np.atleast_1d(np.asarray(prices, dtype=np.float64))
+    n, k = prices.size, len(names)
+    step = 1e-6
+
+    # z: deviations in scale units, one row per price
+    z = np.zeros((n, k))
+    status = np.full(n, 'max_iter', dtype=object)
+    iterations = np.zeros(n, dtype=np.int64)
+    active = np.ones(n, dtype=bool)
+    residual = np.zeros(n)
+    for _ in range(max_iter + 1):
+        # Rows: the point itself, then +/- step along each input
+        offsets = np.concatenate([np.zeros((1, k)), np.eye(k) * step, -np.eye(k) * step])
+        points = z[None, :, :] + offsets[:, None, :]                # (2k+1, n, k)
+        x = x0 + points * scales
+        columns = {name: x[:, :, i].ravel() for i, name in enumerate(names)}
+        values = batch_fair_values(model_key, model, columns, x.shape[0] * n).reshape(2 * k + 1, n)
+
+        residual = np.where(active, values[0] - prices, residual)
+        done = active & (np.abs(residual) <= tolerance)
+        status[done] = 'converged'
+        active &= ~done
+        if not active.any() or _ == max_iter:
+            break
+
+        gradient = ((values[1:k + 1] - values[k + 1:]) / (2 * step)).T    # (n, k)
+        norm = (gradient * gradient).sum(axis=1)
+        flat = active & (norm == 0)
+        status[flat] = 'flat'
+        active &= ~flat
+        # Minimum-norm z with gradient . (z_new - z) = -residual
+        with np.errstate(divide='ignore', invalid='ignore'):
+            target = ((gradient * z).sum(axis=1) - residual) / norm
+        z = np.where(active[:, None], gradient * target[:, None], z)
+        iterations += active
+
+    deviations = z * scales
+    return {
+        'values': {name: x0[i] + deviations[:, i] for i, name in enumerate(names)},
+        'deviations': {name: deviations[:, i] for i, name in enumerate(names)},
+        'fair_value': residual + prices,
+        'status': status,
+        'iterations': iterations,
+    }
+
+
+def _read_prices(path):
+    """Prices from a file: one per line, or CSV rows with the price last"""
+    prices = []
+    with open(path, 'r') as f:
+        for line in f:
+            field = line.strip().split(',')[-1]
+            try:
+                prices.append(float(field))
+            except ValueError:
+                continue  # header or blank line
+    return prices
+
+
+def main(argv, model_key):
+    """
+    CLI: implied INPUT [INPUT ...] [--price P ...] [--prices FILE] [--min-norm] [--low X] [--high X]
+
+    One input (or several without --min-norm): the value of each that
+    justifies the price on its own. --min-norm: the smallest joint change.
+    """
+    import argparse
+    import time
+    import numpy as np
+    from collections import Counter
+
+    parser = argparse.ArgumentParser(prog=f"{MODELS[model_key][0]}.py implied")
+    parser.add_argument('inputs', nargs='+', help='model inputs to solve for')
+    parser.add_argument('--price', type=float, action='append', help='price to explain (repeatable)')
+    parser.add_argument('--prices', help='file of prices (one per line, or CSV with price last)')
+    parser.add_argument('--min-norm', action='store_true', help='smallest joint change to all inputs')
+    parser.add_argument('--low', type=float, help='lower search bound (single-input)')
+    parser.add_argument('--high', type=float, help='upper search bound (single-input)')
+    args = parser.parse_args(argv)
+
+    model = load_model(model_key)
+    model.load_state()
+    prices = list(args.price or [])
+    if args.prices:
+        prices += _read_prices(args.prices)
+    if not prices:
+        prices = [getattr(model, 'market_price', 75)]
+
+    current = model_inputs(model_key, model)
+    unknown = [name for name in args.inputs if name not in current]
+    if unknown:
+        print(f"\n❌ Not model inputs: {', '.join(unknown)}")
+        print(f"   Choose from: {', '.join(current)}")
+        return 1
+
+    start = time.perf_counter()
+    if args.min_norm:
+        results = [('smallest joint change', implied_deviations(model_key, model, args.inputs, prices))]
+    else:
+        results = [(name, implied_input(model_key, model, name, prices, args.low, args.high))
+                   for name in args.inputs]
+    elapsed = time.perf_counter() - start
+
+    print("\n" + "="*70)
+    print(f"WHAT THE MARKET IS PRICING IN: {len(prices):,} price(s), solved in {elapsed:.3f}s")
+    print("="*70)
+    show = min(len(prices), 10)
+    for title, result in results:
+        print(f"\n{title}:")
+        for i in range(show):
+            status = result['status'][i]
+            mark = '✓' if status == 'converged' else '⚠️ '
+            if args.min_norm:
+                changes = ', '.join(f"{name} {current[name]:g} → {result['values'][name][i]:.3f}"
+                                    for name in args.inputs)
+                print(f"   ${prices[i]:>8.2f}  {mark} {changes}  ({status}, {result['iterations'][i]} iter)")
+            else:
+                value = result['value'][i]
+                shown = '—' if np.isnan(value) else f"{value:.4f}"
+                print(f"   ${prices[i]:>8.2f}  {mark} {title} = {shown} (now {current[title]:g}; "
+                      f"{status}, {result['iterations'][i]} iter)")
+        if len(prices) > show:
+            print(f"   ... {len(prices) - show:,} more")
+        counts = Counter(result['status'])
+        print("   " + ', '.join(f"{count:,} {status}" for status, count in counts.most_common()))
+    print("\n" + "="*70)
+    return 0
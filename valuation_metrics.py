@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Valuation Oracle - Instrumentation
+
+Where does the time go? instrument() swaps every stage of the CEO
+interview pipeline (and the interview's public methods) for a timing
+wrapper that feeds a Metrics registry:
+
+    valuation_stage_seconds{stage="growth_compounding"}     histogram
+    valuation_stage_items_total{stage="growth_compounding"} values computed (array sizes)
+    valuation_method_seconds{method="calculate_fair_value"} histogram
+    valuation_menu_choices_total{choice="1"}                interactive menu use ("other" if unknown)
+
+uninstrument() puts the original functions back. Nothing is wrapped
+until instrument() is called, so with instrumentation off the pipeline
+runs the plain functions: zero overhead, not just a skipped branch.
+
+Export with to_prometheus() (text exposition format) or to_json().
+From the command line:
+
+    VALUATION_METRICS=metrics.prom python3 uber_valuation_v2_ceo_mode.py   # interview, written at exit
+    python3 uber_valuation_v2_ceo_mode.py profile --sizes 1,1000,1000000
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+
+# Histogram bucket upper bounds (seconds)
+BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+           1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Stage label -> pipeline function in uber_valuation_v2_ceo_mode
+STAGES = {
+    'revenue_run_rate': ('quarterly_revenue_from_week',),
+    'growth_compounding': ('annualize_revenue',),
+    'ebitda': ('apply_margin',),
+    'sbc': ('annual_sbc',),
+    'regulatory': ('regulatory_drag',),
+    'advertising': ('advertising_ebitda',),
+    'true_ebitda': ('combine_true_ebitda',),
+    'multiple_selection': ('growth_multiple', 'growth_multiple_batch'),
+    'enterprise_value': ('apply_multiple',),
+    'equity_value': ('net_of_debt',),
+    'buyback_adjustment': ('buyback_adjusted_shares',),
+    'per_share': ('per_share_value',),
+}
+
+# UberCEOInterview methods timed as a whole
+METHODS = (
+    'calculate_fair_value', 'calculate_fair_value_batch', 'fair_value_gradient',
+    'monte_carlo', 'answer_question', 'update_answer', 'get_next_question',
+    'show_valuation', 'sensitivity_analysis', 'save_state', 'load_state',
+)
+
+_HELP = {
+    'valuation_stage_seconds': 'Time spent in one pipeline stage',
+    'valuation_stage_items_total': 'Values computed by a pipeline stage (array elements)',
+    'valuation_method_seconds': 'Time spent in one UberCEOInterview method',
+    'valuation_menu_choices_total': 'Interactive menu choices',
+}
+
+
+class Metrics:
+    """Counters and histograms keyed by (name, labels)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}    # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> [bucket counts..., +Inf count], sum
+        self.extra_labels = ()  # appended to every observation (e.g. batch size)
+
+    def inc(self, name, labels=(), amount=1):
+        key = (name, labels + self.extra_labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, labels, seconds):
+        key = (name, labels + self.extra_labels)
+        with self._lock:
+            entry = self.histograms.get(key)
+            if entry is None:
+                entry = self.histograms[key] = [[0] * (len(BUCKETS) + 1), 0.0]
+            counts = entry[0]
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            entry[1] += seconds
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    # === EXPORT ===
+
+    def to_json(self):
+        return {
+            'counters': [{'name': name, 'labels': dict(labels), 'value': value}
+                         for (name, labels), value in sorted(self.counters.items())],
+            'histograms': [{'name': name, 'labels': dict(labels), 'buckets': list(BUCKETS),
+                            'counts': counts, 'sum': total, 'count': sum(counts)}
+                           for (name, labels), (counts, total) in sorted(self.histograms.items())],
+        }
+
+    def to_prometheus(self):
+        lines = []
+        seen = set()
+
+        def header(name, kind):
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in sorted(self.counters.items()):
+            header(name, 'counter')
+            lines.append(f"{name}{_labels(labels)} {value}")
+
+        for (name, labels), (counts, total) in sorted(self.histograms.items()):
+            header(name, 'histogram')
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ('+Inf',), counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(labels + (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {total}")
+            lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """Write to path: JSON if it ends in .json, else Prometheus text"""
+        with open(path, 'w') as f:
+            if path.endswith('.json'):
+                json.dump(self.to_json(), f, indent=2)
+            else:
+                f.write(self.to_prometheus())
+
+
+def _label_value(value):
+    """Escape a label value for the Prometheus text format"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_label_value(v)}"' for k, v in labels) + '}'
+
+
+METRICS = Metrics()
+
+# (owner, attribute) -> original, for everything instrument() replaced
+_originals = {}
+
+
+def _timed(fn, metrics, name, labels, count_items):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        finally:
+            metrics.observe(name, labels, time.perf_counter() - started)
+        if count_items:
+            metrics.inc('valuation_stage_items_total', labels, getattr(result, 'size', 1))
+        return result
+    return wrapper
+
+
+def _replace(owner, attr, new):
+    """Set owner.attr (or owner[attr] for a dict), remembering the original"""
+    if isinstance(owner, dict):
+        _originals.setdefault((id(owner), attr), (owner, attr, owner[attr]))
+        owner[attr] = new
+    else:
+        _originals.setdefault((id(owner), attr), (owner, attr, getattr(owner, attr)))
+        setattr(owner, attr, new)
+
+
+def instrument(metrics=METRICS, module=None):
+    """
+    Start timing the pipeline stages and interview methods into `metrics`.
+    `module` is the loaded V2 model (pass it when running it as a script,
+    where it is __main__ rather than uber_valuation_v2_ceo_mode).
+    """
+    if module is None:
+        import uber_valuation_v2_ceo_mode as module
+
+    # The incremental graph holds its own references to the stage functions:
+    # import it before anything is wrapped, so graphs built later are timed too
+    import valuation_graph as graph
+
+    uninstrument()
+    stage_of = {fn_name: stage for stage, functions in STAGES.items() for fn_name in functions}
+    for fn_name, stage in stage_of.items():
+        _replace(module, fn_name, _timed(getattr(module, fn_name), metrics,
+                                         'valuation_stage_seconds', (('stage', stage),), True))
+
+    for method in METHODS:
+        original = getattr(module.UberCEOInterview, method)
+        _replace(module.UberCEOInterview, method,
+                 _timed(original, metrics, 'valuation_method_seconds', (('method', method),), False))
+
+    for fn_name, stage in stage_of.items():
+        if hasattr(graph, fn_name):
+            _replace(graph, fn_name, _timed(getattr(graph, fn_name), metrics,
+                                            'valuation_stage_seconds', (('stage', stage),), True))
+    for node, (fn, deps) in list(graph.NODES.items()):
+        if fn.__name__ in stage_of:
+            _replace(graph.NODES, node, (_timed(fn, metrics, 'valuation_stage_seconds',
+                                                (('stage', stage_of[fn.__name__]),), True), deps))
+    return metrics
+
+
+def uninstrument():
+    """Restore the original, untimed functions"""
+    for owner, attr, original in _originals.values():
+        if isinstance(owner, dict):
+            owner[attr] = original
+        else:
+            setattr(owner, attr, original)
+    _originals.clear()
+
+
+def instrumented():
+    return bool(_originals)
+
+
+def from_env(module=None):
+    """
+    If VALUATION_METRICS is set, instrument and write the metrics to that
+    path at exit. Returns the registry, or None when instrumentation is off.
+    """
+    import atexit
+
+    path = os.environ.get('VALUATION_METRICS')
+    if not path:
+        return None
+    instrument(METRICS, module)
+    atexit.register(METRICS.write, path)
+    return METRICS
+
+
+def profile(sizes=(1, 1_000, 100_000, 1_000_000), min_time=0.2, metrics=None):
+    """
+    Time every stage at each batch size (1 = the scalar calculate_fair_value,
+    cache off). Returns {size: {stage: (calls, seconds)}}.
+    """
+    import numpy as np
+    from uber_valuation_v2_ceo_mode import UberCEOInterview
+
+    metrics = metrics or Metrics()
+    instrument(metrics)
+    try:
+        interview = UberCEOInterview()
+        interview.cache = None
+        rng = np.random.default_rng(0)
+        report = {}
+        for size in sizes:
+            metrics.extra_labels = (('batch_size', str(size)),)
+            if size == 1:
+                run = interview.calculate_fair_value
+            else:
+                inputs = {'revenue_last_week': rng.uniform(500, 900, size),
+                          'ebitda_margin_current_quarter': rng.uniform(5, 20, size),
+                          'monthly_active_riders_growth': rng.uniform(0, 3, size)}
+                run = functools.partial(interview.calculate_fair_value_batch, inputs)
+            deadline = time.perf_counter() + min_time
+            while time.perf_counter() < deadline:
+                run()
+            report[size] = _totals(metrics, 'valuation_stage_seconds', 'stage', size)
+            report[size]['total'] = _totals(
+                metrics, 'valuation_method_seconds', 'method', size
+            ).get('calculate_fair_value' if size == 1 else 'calculate_fair_value_batch', (0, 0.0))
+        return report
+    finally:
+        metrics.extra_labels = ()
+        uninstrument()
+
+
+def _totals(metrics, name, label, size):
+    """{label value: (calls, seconds)} for one histogram at one batch size"""
+    result = {}
+    for (metric, labels), (counts, total) in metrics.histograms.items():
+        labels = dict(labels)
+        if metric == name and labels.get('batch_size') == str(size):
+            result[labels[label]] = (sum(counts), total)
+    return result
+
+
+def main(argv):
+    """CLI: profile [--sizes 1,1000,...] [--export PATH]"""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='uber_valuation_v2_ceo_mode.py profile')
+    parser.add_argument('--sizes', default='1,1000,100000,1000000', help='comma-separated batch sizes')
+    parser.add_argument('--seconds', type=float, default=0.2, help='time spent per size')
+    parser.add_argument('--export', help='write metrics here (.json or Prometheus text)')
+    args = parser.parse_args(argv)
+
+    metrics = Metrics()
+    sizes = [int(s) for s in args.sizes.split(',')]
+    report = profile(sizes, args.seconds, metrics)
+
+    print("\n" + "="*70)
+    print("WHERE THE TIME GOES (share of valuation time per stage)")
+    print("="*70)
+    print(f"\n{'stage':<22}" + ''.join(f"{size:>12,}" for size in sizes))
+    for stage in STAGES:
+        row = f"{stage:<22}"
+        for size in sizes:
+            calls, seconds = report[size].get(stage, (0, 0.0))
+            total = report[size]['total'][1]
+            row += f"{seconds / total * 100:>11.1f}%" if total else f"{'-':>12}"
+        print(row)
+    row = f"\n{'per valuation (µs)':<22}"
+    for size in sizes:
+        calls, seconds = report[size]['total']
+        row += f"{seconds / calls / size * 1e6:>12.3f}" if calls else f"{'-':>12}"
+    print(row)
+    print("\n(The rest is input gathering, rounding and the result dict. Timings include")
+    print(" the instrumentation itself, about a microsecond per stage call.)\n")
+
+    if args.export:
+        metrics.write(args.export)
+        print(f"✓ Metrics written to {args.export}\n")
+    return 0
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Valuation Oracle - Monte Carlo Mode
+
+Give answers as distributions instead of single numbers and see the
+range of fair values your beliefs imply.
+
+Distribution specs (plain dicts, JSON-friendly):
+    4.2                                                   fixed value
+    {'dist': 'normal', 'mean': 2.0, 'std': 0.5}
+    {'dist': 'triangular', 'low': 1.0, 'mode': 2.0, 'high': 3.5}
+    {'dist': 'lognormal', 'median': 750, 'sigma': 0.2}
+    {'dist': 'empirical', 'samples': [680, 721, 745, 760]}
+"""
+
+import json
+import sys
+
+
+def draw(spec, n, rng):
+    """Draw n samples for one answer from its distribution spec"""
+    import numpy as np
+
+    if isinstance(spec, (int, float)):
+        return np.full(n, float(spec))
+
+    kind = spec.get('dist')
+    if kind == 'normal':
+        return rng.normal(spec['mean'], spec['std'], n)
+    if kind == 'triangular':
+        return rng.triangular(spec['low'], spec['mode'], spec['high'], n)
+    if kind == 'lognormal':
+        return rng.lognormal(np.log(spec['median']), spec['sigma'], n)
+    if kind == 'empirical':
+        return rng.choice(np.asarray(spec['samples'], dtype=np.float64), n)
+    raise ValueError(f"Unknown distribution: {kind!r}")
+
+
+def summarize(fair_values, percentiles, market_price):
+    """Percentiles and headline stats for an array of simulated fair values"""
+    import numpy as np
+
+    points = np.percentile(fair_values, percentiles)
+    return {
+        'draws': int(fair_values.size),
+        'mean': round(float(fair_values.mean()), 2),
+        'std': round(float(fair_values.std()), 2),
+        'percentiles': {p: round(float(v), 2) for p, v in zip(percentiles, points)},
+        'prob_undervalued': round(float((fair_values > market_price).mean()), 4),
+    }
+
+
+def main(argv):
+    """
+    CLI: montecarlo <distributions.json> [draws] [seed]
+
+    Uses your saved interview answers for anything not in the file.
+    """
+    from uber_valuation_v2_ceo_mode import UberCEOInterview
+
+    if not argv:
+        print("Usage: python3 uber_valuation_v2_ceo_mode.py montecarlo <distributions.json> [draws] [seed]")
+        return 1
+
+    with open(argv[0], 'r') as f:
+        distributions = json.load(f)
+    draws = int(argv[1]) if len(argv) > 1 else 1_000_000
+    seed = int(argv[2]) if len(argv) > 2 else None
+
+    interview = UberCEOInterview()
+    interview.load_state()
+
+    unknown = [qid for qid in distributions if qid not in {q['id'] for q in interview.questions}]
+    if unknown:
+        print(f"\n❌ Unknown question ids: {', '.join(unknown)}")
+        return 1
+
+    result = interview.monte_carlo(distributions, draws=draws, seed=seed)
+
+    print("\n" + "="*70)
+    print(f"MONTE CARLO: {result['draws']:,} draws over {len(distributions)} uncertain answers")
+    print("="*70)
+    print(f"\nMean fair value: ${result['mean']}/share (std ${result['std']})")
+    print(f"Current market price: ${interview.market_price}/share\n")
+    for p, value in result['percentiles'].items():
+        print(f"   P{p:<3} ${value:.2f}")
+    print(f"\n📈 Chance Uber is undervalued: {result['prob_undervalued'] * 100:.1f}%")
+    print("\n" + "="*70)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Valuation Oracle - Adaptive Question Order
+
+Ask the question whose answer would settle the most fair-value
+uncertainty next, instead of walking the list in a fixed order.
+
+Every unanswered question is treated as uncertain: its answer is
+assumed to fall around the value the model currently uses with a
+standard deviation of question['uncertainty'] (same units as the
+answer) or, by default, 20% of that value (the same ±20% the
+sensitivity reports use). To first order its share of fair-value
+variance is
+
+    (d fair value / d answer × std dev)²
+
+and answering it removes that share. All derivatives come from one
+forward pass (fair_value_gradient), so ranking a 30-question interview
+costs about as much as one valuation. Step inputs (V2 rider growth)
+use the fair value on each side of the step instead. Questions the
+model doesn't read yet carry no information and keep their place at
+the end, in list order.
+"""
+
+import math
+
+DEFAULT_UNCERTAINTY = 0.2
+
+
+def _normal_cdf(x, mean, std):
+    return 0.5 * (1 + math.erf((x - mean) / (std * math.sqrt(2))))
+
+
+def answer_std(question, value):
+    """Standard deviation assumed for an unanswered question's answer"""
+    if 'uncertainty' in question:
+        return question['uncertainty']
+    return DEFAULT_UNCERTAINTY * abs(value) if value else DEFAULT_UNCERTAINTY
+
+
+def _step_variance(report, question, value):
+    """
+    (std, fair-value variance) from a normally distributed rider-growth
+    answer, or None if the report has no fair value for each side of the
+    steps (a spec that doesn't read rider growth, or steps elsewhere)
+    """
+    from uber_valuation_v2_ceo_mode import growth_multiple
+
+    # growth_multiple steps at 1.0 and 2.0 (% MoM)
+    steps = report.get('steps', {})
+    multiples = [growth_multiple(1.0), growth_multiple(2.0), growth_multiple(2.0 + 1e-9)]
+    if not all(m in steps for m in multiples):
+        return None
+
+    std = answer_std(question, value)
+    low = _normal_cdf(1.0, value, std)
+    high = 1 - _normal_cdf(2.0, value, std)
+    outcomes = [(low, steps[multiples[0]]), (1 - low - high, steps[multiples[1]]), (high, steps[multiples[2]])]
+    mean = sum(p * fv for p, fv in outcomes)
+    return std, sum(p * (fv - mean) ** 2 for p, fv in outcomes)
+
+
+def rank_questions(model, assumptions=None):
+    """
+    Unanswered questions, most informative first, as dicts with the
+    question, the std dev assumed for it, and the fair-value variance
+    ($/share squared) answering it would remove.
+    """
+    answers = model.snapshot() if assumptions is None else assumptions
+    report = model.fair_value_gradient(answers)
+
+    ranked = []
+    for position, q in enumerate(model.questions):
+        if q['id'] in answers:
+            continue
+        entry = report['gradient'].get(q['id'])
+        step = None
+        if q['id'] == 'monthly_active_riders_growth' and report.get('steps'):
+            step = _step_variance(report, q, model.model_input(q['id'], answers))
+        if step is not None:
+            std, variance = step
+        elif entry is not None:
+            std = answer_std(q, entry['value'])
+            variance = (entry['derivative'] * std) ** 2
+        else:
+            std, variance = None, 0.0
+        ranked.append({'question': q, 'std': std, 'variance': variance, 'position': position})
+
+    ranked.sort(key=lambda r: (-r['variance'], r['position']))
+    return ranked
+
+
+class QuestionRanker:
+    """rank_questions, recomputed only when the answers change"""
+
+    def __init__(self, model):
+        self.model = model
+        self._answers = None
+        self._ranking = None
+
+    def ranking(self, assumptions=None):
+        answers = self.model.snapshot() if assumptions is None else assumptions
+        if answers != self._answers:
+            self._ranking = rank_questions(self.model, answers)
+            self._answers = answers
+        return self._ranking
+
+    def next_question(self, assumptions=None):
+        """The most informative unanswered question (None when all are answered)"""
+        ranking = self.ranking(assumptions)
+        return ranking[0]['question'] if ranking else None
+
+    def remaining_std(self, assumptions=None):
+        """Fair-value std dev ($/share) still explained by unanswered questions"""
+        return math.sqrt(sum(r['variance'] for r in self.ranking(assumptions)))
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Valuation Oracle - Stochastic Path Mode
+
+The interview compounds one constant growth rate twelve times. Path mode
+starts each rate at your answer and lets it wander month by month:
+
+    mobility_growth, delivery_growth   GMV growth (% MoM), mean-reverting
+                                       toward DCF long_run_growth
+    mobility_take_rate,                take rates (%), mean-reverting
+    delivery_take_rate                 toward today's answer
+    driver_churn                       monthly driver churn (%); churn above
+                                       today's costs CHURN_MARGIN_COST
+                                       points of core EBITDA margin per point
+
+Each variable is a mean-reverting (AR(1)) process with its own half-life
+and monthly volatility, and the monthly shocks are correlated across
+variables (CORRELATIONS). Every path is valued by the DCF engine
+(valuation_dcf.project): segment revenue grows at the path's GMV growth
+times the change in its take rate.
+
+Paths are generated and valued in blocks, so memory stays bounded however
+many are asked for, and the fair values (and optionally the paths
+themselves) can be written to memory-mapped .npy files.
+"""
+
+import json
+import sys
+import time
+
+# Variable -> the answer it starts from, where it reverts to ('long_run' =
+# DCF long_run_growth as a monthly rate, 'start' = its starting value),
+# half-life of a deviation (months) and volatility (points per month)
+PROCESSES = {
+    'mobility_growth': {'answer': 'mobility_gmv_growth_mom', 'mean': 'long_run',
+                        'half_life_months': 12, 'volatility': 0.4},
+    'delivery_growth': {'answer': 'delivery_gmv_growth_mom', 'mean': 'long_run',
+                        'half_life_months': 12, 'volatility': 0.4},
+    'mobility_take_rate': {'answer': 'mobility_take_rate_current', 'mean': 'start',
+                           'half_life_months': 24, 'volatility': 0.3},
+    'delivery_take_rate': {'answer': 'delivery_take_rate_current', 'mean': 'start',
+                           'half_life_months': 24, 'volatility': 0.3},
+    'driver_churn': {'answer': 'driver_churn_rate_monthly', 'mean': 'start',
+                     'half_life_months': 6, 'volatility': 0.5},
+}
+
+# Correlation of monthly shocks (pairs not listed are uncorrelated)
+CORRELATIONS = {
+    ('mobility_growth', 'delivery_growth'): 0.6,
+    ('mobility_take_rate', 'delivery_take_rate'): 0.5,
+    ('mobility_growth', 'mobility_take_rate'): -0.2,
+    ('delivery_growth', 'delivery_take_rate'): -0.2,
+    ('mobility_growth', 'driver_churn'): -0.3,
+}
+
+# Points of core EBITDA margin lost per point of churn above today's
+CHURN_MARGIN_COST = 0.5
+
+
+def correlation_matrix(names, correlations):
+    """Full correlation matrix for `names` from a {(a, b): rho} mapping"""
+    import numpy as np
+
+    index = {name: i for i, name in enumerate(names)}
+    matrix = np.eye(len(names))
+    for (a, b), rho in correlations.items():
+        if a not in index or b not in index:
+            raise ValueError(f"Unknown variable in correlation ({a}, {b})")
+        matrix[index[a], index[b]] = matrix[index[b], index[a]] = rho
+    return matrix
+
+
+def _kernel(half_life_months, months):
+    """(months x months) weights of each month's shock on later months"""
+    import numpy as np
+
+    t = np.arange(months)
+    lag = t[None, :] - t[:, None]
+    return np.where(lag >= 0, 0.5 ** (np.maximum(lag, 0) / half_life_months), 0.0)
+
+
+def simulate_block(starts, means, processes, cholesky, months, n, rng):
+    """
+    n paths of every variable: {name: (n x months) array}. Month 1 is the
+    starting value plus a shock; a deviation from the mean then decays by
+    half every half_life_months.
+    """
+    import numpy as np
+
+    names = list(processes)
+    # (variables, n * months) independent shocks, correlated in one product
+    shocks = rng.standard_normal((len(names), n * months))
+    correlated = (cholesky @ shocks).reshape(len(names), n, months)
+    t = np.arange(months)
+    paths = {}
+    for j, name in enumerate(names):
+        process = processes[name]
+        drift = means[name] + (starts[name] - means[name]) * 0.5 ** (t / process['half_life_months'])
+        path = correlated[j] @ _kernel(process['half_life_months'], months)
+        path *= process['volatility']
+        path += drift
+        paths[name] = path
+    return paths
+
+
+def value_paths(inputs, paths, churn_margin_cost=CHURN_MARGIN_COST):
+    """DCF fair value per share of each simulated path (monthly steps)"""
+    import numpy as np
+    from valuation_dcf import project
+
+    months = paths['mobility_growth'].shape[1]
+    growth = {}
+    for segment in ('mobility', 'delivery'):
+        take = np.maximum(paths[f'{segment}_take_rate'], 0.1)
+        previous = np.concatenate([np.full((take.shape[0], 1), float(inputs[f'{segment}_take_rate_current'])),
+                                   take[:, :-1]], axis=1)
+        growth[segment] = (1 + paths[f'{segment}_growth'] / 100) * (take / previous) - 1
+    churn = np.maximum(paths['driver_churn'], 0)
+    margin_shift = -churn_margin_cost * (churn - float(inputs['driver_churn_rate_monthly']))
+    return project(inputs, months, 'month', growth=growth, margin_shift=margin_shift)['fair_value_per_share']
+
+
+def simulate(inputs, n_paths, months=36, seed=None, block_size=50_000, processes=None,
+             correlations=None, churn_margin_cost=CHURN_MARGIN_COST, out=None, paths_out=None):
+    """
+    Fair value of each of `n_paths` simulated paths from `inputs` (see
+    path_inputs). out / paths_out name .npy files to write the fair values
+    (n_paths,) and the float32 paths (n_paths x months x variables) to
+    through memory maps; the returned array is then the map itself.
+    """
+    import numpy as np
+
+    processes = PROCESSES if processes is None else processes
+    correlations = CORRELATIONS if correlations is None else correlations
+    names = list(processes)
+    try:
+        cholesky = np.linalg.cholesky(correlation_matrix(names, correlations))
+    except np.linalg.LinAlgError:
+        raise ValueError("Correlations don't form a valid correlation matrix") from None
+
+    starts = {name: float(inputs[processes[name]['answer']]) for name in names}
+    long_run = ((1 + float(inputs['long_run_growth']) / 100) ** (1 / 12) - 1) * 100
+    means = {name: long_run if processes[name]['mean'] == 'long_run' else starts[name] for name in names}
+
+    if out is None:
+        fair_values = np.empty(n_paths, dtype=np.float64)
+    else:
+        fair_values = np.lib.format.open_memmap(out, mode='w+', dtype=np.float64, shape=(n_paths,))
+    saved = None
+    if paths_out is not None:
+        saved = np.lib.format.open_memmap(paths_out, mode='w+', dtype=np.float32,
+                                          shape=(n_paths, months, len(names)))
+
+    rng = np.random.default_rng(seed)
+    for start in range(0, n_paths, block_size):
+        n = min(block_size, n_paths - start)
+        paths = simulate_block(starts, means, processes, cholesky, months, n, rng)
+        fair_values[start:start + n] = value_paths(inputs, paths, churn_margin_cost)
+        if saved is not None:
+            for j, name in enumerate(names):
+                saved[start:start + n, :, j] = paths[name]
+
+    if saved is not None:
+        saved.flush()
+        del saved
+    if out is not None:
+        fair_values.flush()
+    return fair_values
+
+
+def path_inputs(interview, assumptions=None):
+    """DCF inputs plus the answers the processes start from"""
+    from valuation_dcf import dcf_inputs
+
+    answers = interview.answers if assumptions is None else assumptions
+    baselines = {q['id']: q.get('baseline') for q in interview.questions}
+    inputs = dcf_inputs(interview, assumptions)
+    for process in PROCESSES.values():
+        qid = process['answer']
+        if qid not in inputs:
+            inputs[qid] = answers.get(qid, baselines[qid])
+    return inputs
+
+
+def main(argv):
+    """
+    CLI: paths [--paths N] [--months N] [--seed N] [--block N] [--config FILE]
+               [--out FILE.npy] [--save-paths FILE.npy]
+
+    --config is JSON with optional "processes" (per-variable overrides),
+    "correlations" ({"a,b": rho}) and "churn_margin_cost".
+    """
+    import argparse
+    import numpy as np
+    from uber_valuation_v2_ceo_mode import UberCEOInterview
+    from valuation_montecarlo import summarize
+
+    parser = argparse.ArgumentParser(prog='uber_valuation_v2_ceo_mode.py paths')
+    parser.add_argument('--paths', type=int, default=100_000)
+    parser.add_argument('--months', type=int, default=36)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--block', type=int, default=50_000, help='paths per block (bounds memory)')
+    parser.add_argument('--config', help='JSON overrides for processes and correlations')
+    parser.add_argument('--out', help='write fair values to this .npy (memory-mapped)')
+    parser.add_argument('--save-paths', help='write simulated paths to this .npy (float32, memory-mapped)')
+    args = parser.parse_args(argv)
+
+    processes = {name: dict(p) for name, p in PROCESSES.items()}
+    correlations = dict(CORRELATIONS)
+    churn_margin_cost = CHURN_MARGIN_COST
+    if args.config:
+        with open(args.config, 'r') as f:
+            config = json.load(f)
+        for name, overrides in config.get('processes', {}).items():
+            if name not in processes:
+                print(f"\n❌ Unknown variable: {name}")
+                return 1
+            processes[name].update(overrides)
+        for pair, rho in config.get('correlations', {}).items():
+            a, b = (part.strip() for part in pair.split(','))
+            correlations.pop((b, a), None)
+            correlations[(a, b)] = rho
+        churn_margin_cost = config.get('churn_margin_cost', churn_margin_cost)
+
+    interview = UberCEOInterview()
+    interview.load_state()
+    inputs = path_inputs(interview)
+
+    start = time.perf_counter()
+    try:
+        fair_values = simulate(inputs, args.paths, args.months, args.seed, args.block, processes,
+                               correlations, churn_margin_cost, args.out, args.save_paths)
+    except ValueError as e:
+        print(f"\n❌ {e}")
+        return 1
+    elapsed = time.perf_counter() - start
+
+    summary = summarize(np.asarray(fair_values[np.isfinite(fair_values)]), (5, 25, 50, 75, 95),
+                        interview.market_price)
+    print("\n" + "="*70)
+    print(f"STOCHASTIC PATHS: {args.paths:,} paths x {args.months} months in {elapsed:.2f}s")
+    print("="*70)
+    print(f"\nMean fair value: ${summary['mean']}/share (std ${summary['std']})")
+    print(f"Current market price: ${interview.market_price}/share\n")
+    for p, value in summary['percentiles'].items():
+        print(f"   P{p:<3} ${value:.2f}")
+    print(f"\n📈 Chance Uber is undervalued: {summary['prob_undervalued'] * 100:.1f}%")
+    if args.out:
+        print(f"\n✓ Fair values saved to {args.out}")
+    if args.save_paths:
+        print(f"✓ Paths ({', '.join(processes)}) saved to {args.save_paths}")
+    print("\n" + "="*70)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
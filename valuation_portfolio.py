@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+"""
+Valuation Oracle - Portfolio
+
+Every saved session is a position: one user's view of one ticker. The
+portfolio values all of them together and adds them up across the book:
+
+    portfolio = Portfolio()
+    portfolio.load(store)                              # latest state of each session
+    portfolio.summary()                                # totals + scenario spread
+    portfolio.by('ticker'), portfolio.by('user')       # grouped
+    portfolio.sizing()                                 # suggested weights
+    portfolio.update('alice', 'UBER', 'v2', answers)   # revalues just that one
+    portfolio.refresh(store)                           # sessions saved since last read
+    portfolio.value_answers('v2', 'UBER', states)      # value answer states, not as positions
+
+V1 positions take their facts and consensus from companies/<ticker>.json
+(see valuation_companies; the directory next to the code by default); V2 positions are UBER, with the CEO
+interview's facts. Positions of one model are rows of one array, valued
+with that model's project_fair_value in a single call.
+
+Scenarios: every input of every position is shocked by
+uncertainty x a standard normal draw, shared by all positions in the
+same ticker (so two users long UBER move together), giving a
+distribution of fair value per position and of mispricing for the whole
+book. A ticker's draws depend only on the seed and the ticker, so
+revaluing one position leaves every other position's scenarios as they
+were. Positions default to $1M at the market price.
+"""
+
+import sys
+import time
+import zlib
+
+from valuation_ordering import DEFAULT_UNCERTAINTY
+
+DEFAULT_POSITION = 1_000_000  # $ per session without an explicit size
+
+# Scenario evaluations per chunk (positions x scenarios x inputs)
+CHUNK_ELEMENTS = 4_000_000
+
+
+class _ModelRows:
+    """Positions of one model: inputs, facts and values as parallel arrays"""
+
+    def __init__(self, model_key, inputs, facts):
+        import numpy as np
+
+        self.model_key = model_key
+        self.inputs = inputs
+        self.fact_names = facts
+        self.x = np.empty((0, len(inputs)))
+        self.facts = np.empty((0, len(facts)))
+        self.fair_value = np.empty(0)
+        self.scenarios = None
+
+    def fair_values(self, x, facts):
+        """Fair value per share for inputs x (..., n, k) and facts (n, f)"""
+        import numpy as np
+
+        column = {name: x[..., i] for i, name in enumerate(self.inputs)}
+        fact = {name: facts[:, i] for i, name in enumerate(self.fact_names)}
+        if self.model_key == 'v1':
+            from uber_valuation_v1 import project_fair_value
+
+            return project_fair_value(
+                column['revenue_growth_2025_2027'], column['advertising_revenue_2027'],
+                column['ebitda_margin_2027'], column['regulatory_cost_annual'],
+                column['stock_based_comp_pct'], column['ebitda_multiple'],
+                fact['current_revenue'], fact['net_debt'], fact['shares_outstanding'],
+                fact['current_ad_revenue'],
+            )[0]
+
+        from uber_valuation_v2_ceo_mode import growth_multiple_batch, project_fair_value, quarterly_revenue_from_week
+
+        # An unanswered revenue_last_week (NaN) means last quarter's revenue
+        weekly = column['revenue_last_week']
+        quarterly = np.where(np.isnan(weekly), fact['last_quarter_revenue'], quarterly_revenue_from_week(weekly))
+        return project_fair_value(
+            quarterly, column['mobility_gmv_growth_mom'], column['delivery_gmv_growth_mom'],
+            column['ebitda_margin_current_quarter'], column['stock_based_comp_run_rate'],
+            column['regulatory_liabilities_on_books'], column['advertising_revenue_run_rate'],
+            column['advertising_margin'], growth_multiple_batch(column['monthly_active_riders_growth']),
+            column['share_buyback_last_quarter'], fact['shares_outstanding'], fact['net_debt'],
+            fact['market_price'],
+        )[0]
+
+
+class Portfolio:
+    """Positions from many saved sessions, valued and aggregated as arrays"""
+
+    def __init__(self, companies_dir=None, scenarios=1000, seed=0, uncertainty=DEFAULT_UNCERTAINTY):
+        import numpy as np
+        from uber_valuation_v1 import MODEL_INPUTS as V1_INPUTS
+        from uber_valuation_v2_ceo_mode import MODEL_INPUTS as V2_INPUTS
+        from valuation_companies import load_companies
+
+        self.n_scenarios = scenarios
+        self.seed = seed
+        self.uncertainty = uncertainty
+        self.companies = {spec['ticker']: spec for spec in load_companies(companies_dir)}
+        self.rows = {
+            'v1': _ModelRows('v1', V1_INPUTS, ('current_revenue', 'net_debt', 'shares_outstanding',
+                                               'current_ad_revenue')),
+            'v2': _ModelRows('v2', V2_INPUTS, ('last_quarter_revenue', 'net_debt', 'shares_outstanding',
+                                               'market_price')),
+        }
+        for rows in self.rows.values():
+            rows.scenarios = np.empty((scenarios, 0))
+
+        # Per position, in order added: (user, ticker, model), and its
+        # model and row in that model's arrays
+        self.keys = []
+        self.index = {}
+        self.users = np.empty(0, dtype=object)
+        self.tickers = np.empty(0, dtype=object)
+        self.models = np.empty(0, dtype=object)
+        self.model_row = np.empty(0, dtype=np.int64)
+        self.shares = np.empty(0)
+        self.market_price = np.empty(0)
+        self.skipped = []
+        self._facts = {}
+        self._prices = {}   # ticker -> price set by set_market_prices
+        self._shocks = {}
+        self._refreshed_at = None
+        self._filter = {}
+
+    # === INPUTS ===
+
+    def _ticker_facts(self, ticker, model_key):
+        """(defaults by input, facts by name, market price) for one ticker and model"""
+        key = (ticker, model_key)
+        if key not in self._facts:
+            if model_key == 'v1':
+                spec = self.companies.get(ticker)
+                if spec is None:
+                    raise ValueError(f"{ticker}: no company spec for the v1 model")
+                self._facts[key] = (spec['consensus'], spec['facts'], float(spec['facts']['market_price']))
+            elif model_key == 'v2' and ticker == 'UBER':
+                from uber_valuation_v2_ceo_mode import MODEL_DEFAULTS, UberCEOInterview
+
+                interview = UberCEOInterview()
+                self._facts[key] = (MODEL_DEFAULTS, interview.facts(), float(interview.market_price))
+            else:
+                raise ValueError(f"{ticker}: the {model_key} model can't value it")
+            if ticker in self._prices:
+                defaults, facts, _ = self._facts[key]
+                price = self._prices[ticker]
+                self._facts[key] = (defaults, dict(facts, market_price=price), price)
+        return self._facts[key]
+
+    def _input_row(self, model_key, ticker, answers):
+        import numpy as np
+
+        defaults, facts, price = self._ticker_facts(ticker, model_key)
+        rows = self.rows[model_key]
+        x = [float(answers.get(name, defaults.get(name, np.nan))) for name in rows.inputs]
+        return x, [float(facts[name]) for name in rows.fact_names], price
+
+    def _scenario_inputs(self, rows, x, tickers):
+        """x (n, k) shocked per scenario: (scenarios, n, k)"""
+        import numpy as np
+
+        names, codes = np.unique(np.asarray(tickers, dtype=object).astype(str), return_inverse=True)
+        for ticker in names:
+            key = (rows.model_key, ticker)
+            if key not in self._shocks:
+                stream = zlib.crc32(f'{rows.model_key}:{ticker}'.encode())
+                rng = np.random.default_rng([self.seed, stream])
+                self._shocks[key] = rng.standard_normal((self.n_scenarios, len(rows.inputs)))
+        table = np.stack([self._shocks[(rows.model_key, ticker)] for ticker in names], axis=1)
+        return x * (1 + self.uncertainty * table[:, codes, :])
+
+    def _value(self, rows, x, facts, tickers):
+        """Base and scenario fair values for new or changed positions"""
+        import numpy as np
+
+        base = rows.fair_values(x, facts)
+        scenarios = np.empty((self.n_scenarios, len(x)))
+        chunk = max(1, CHUNK_ELEMENTS // (self.n_scenarios * len(rows.inputs)))
+        for start in range(0, len(x), chunk):
+            part = slice(start, start + chunk)
+            shocked = self._scenario_inputs(rows, x[part], tickers[part])
+            scenarios[:, part] = rows.fair_values(shocked, facts[part])
+        return base, scenarios
+
+    # === ADDING AND UPDATING ===
+
+    def add_sessions(self, sessions, sizes=None):
+        """
+        Add (or replace) positions from SessionStore rows. `sizes` maps
+        (user, ticker) to {'shares': n} or {'dollars': d}. Sessions whose
+        ticker/model can't be valued go to self.skipped.
+        """
+        import numpy as np
+
+        sizes = sizes or {}
+        new = {'v1': [], 'v2': []}
+        for session in sessions:
+            key = (session['user'], session['ticker'], session['model'])
+            if key in self.index:
+                self.update(*key, session['answers'], self._shares(sizes, key, None))
+                continue
+            try:
+                x, facts, price = self._input_row(session['model'], session['ticker'], session['answers'])
+            except ValueError as e:
+                if (key, str(e)) not in self.skipped:
+                    self.skipped.append((key, str(e)))
+                continue
+            new[session['model']].append((key, x, facts, price))
+
+        for model_key, added in new.items():
+            if not added:
+                continue
+            rows = self.rows[model_key]
+            x = np.array([a[1] for a in added])
+            facts = np.array([a[2] for a in added])
+            prices = np.array([a[3] for a in added])
+            base, scenarios = self._value(rows, x, facts, [a[0][1] for a in added])
+
+            first = len(rows.fair_value)
+            rows.x = np.concatenate([rows.x, x])
+            rows.facts = np.concatenate([rows.facts, facts])
+            rows.fair_value = np.concatenate([rows.fair_value, base])
+            rows.scenarios = np.concatenate([rows.scenarios, scenarios], axis=1)
+
+            shares = np.array([self._shares(sizes, a[0], a[3]) for a in added])
+            keys = [a[0] for a in added]
+            self.index.update((key, len(self.keys) + i) for i, key in enumerate(keys))
+            self.keys.extend(keys)
+            self.users = np.concatenate([self.users, np.array([k[0] for k in keys], dtype=object)])
+            self.tickers = np.concatenate([self.tickers, np.array([k[1] for k in keys], dtype=object)])
+            self.models = np.concatenate([self.models, np.full(len(keys), model_key, dtype=object)])
+            self.model_row = np.concatenate([self.model_row, np.arange(first, first + len(keys))])
+            self.shares = np.concatenate([self.shares, shares])
+            self.market_price = np.concatenate([self.market_price, prices])
+        return self
+
+    def _shares(self, sizes, key, price):
+        size = sizes.get(key[:2])
+        if size is None:
+            return None if price is None else DEFAULT_POSITION / price
+        if 'shares' in size:
+            return float(size['shares'])
+        if price is None:
+            price = self.market_price[self.index[key]]
+        return float(size['dollars']) / price
+
+    def load(self, store, user=None, ticker=None, sizes=None):
+        """Add the latest state of every matching session in a SessionStore"""
+        self._refreshed_at = time.time()
+        self._filter = {'user': user, 'ticker': ticker}
+        return self.add_sessions(store.sessions(**self._filter), sizes)
+
+    def update(self, user, ticker, model_key, answers, shares=None):
+        """One session changed: revalue only its position (adding it if new)"""
+        key = (user, ticker, model_key)
+        if key not in self.index:
+            sizes = {} if shares is None else {(user, ticker): {'shares': shares}}
+            return self.add_sessions([{'user': user, 'ticker': ticker, 'model': model_key,
+                                       'answers': answers}], sizes)
+
+        position = self.index[key]
+        rows = self.rows[model_key]
+        r = self.model_row[position]
+        x, _, _ = self._input_row(model_key, ticker, answers)
+        rows.x[r] = x
+        base, scenarios = self._value(rows, rows.x[r:r + 1], rows.facts[r:r + 1], [ticker])
+        rows.fair_value[r] = base[0]
+        rows.scenarios[:, r] = scenarios[:, 0]
+        if shares is not None:
+            self.shares[position] = shares
+        return self
+
+    def refresh(self, store):
+        """Pick up sessions saved since the last refresh; returns how many changed"""
+        since = self._refreshed_at
+        self._refreshed_at = time.time()
+        changed = store.sessions(since=since, **self._filter)
+        self.add_sessions(changed)
+        return len(changed)
+
+    def value_answers(self, model_key, ticker, states):
+        """
+        Base (n,) and scenario (scenarios, n) fair values of several
+        answer states for one ticker, without adding them as positions
+        """
+        import numpy as np
+
+        rows = [self._input_row(model_key, ticker, answers) for answers in states]
+        x = np.array([row[0] for row in rows]).reshape(len(rows), -1)
+        facts = np.array([row[1] for row in rows]).reshape(len(rows), -1)
+        return self._value(self.rows[model_key], x, facts, [ticker] * len(rows))
+
+    def set_market_prices(self, prices):
+        """
+        Update prices from a {ticker: price} mapping. V2 fair values depend
+        on the price (buybacks retire shares at it), so V2 positions in
+        those tickers are revalued; positions added later use it too.
+        """
+        import numpy as np
+
+        prices = {ticker: float(price) for ticker, price in prices.items()}
+        self._prices.update(prices)
+        for key in [key for key in self._facts if key[0] in prices]:
+            del self._facts[key]
+        for ticker, price in prices.items():
+            self.market_price[self.tickers == ticker] = price
+
+        rows = self.rows['v2']
+        mask = (self.models == 'v2') & np.isin(self.tickers, list(prices))
+        if mask.any():
+            r = self.model_row[mask]
+            rows.facts[r, rows.fact_names.index('market_price')] = [prices[t] for t in self.tickers[mask]]
+            base, scenarios = self._value(rows, rows.x[r], rows.facts[r], self.tickers[mask])
+            rows.fair_value[r] = base
+            rows.scenarios[:, r] = scenarios
+
+    # === AGGREGATION ===
+
+    def positions(self):
+        """Per-position arrays, in the order positions were added"""
+        import numpy as np
+
+        fair_value = np.empty(len(self.keys))
+        for model_key, rows in self.rows.items():
+            mask = self.models == model_key
+            fair_value[mask] = rows.fair_value[self.model_row[mask]]
+        return {
+            'user': self.users,
+            'ticker': self.tickers,
+            'model': self.models,
+            'shares': self.shares,
+            'market_price': self.market_price,
+            'fair_value_per_share': fair_value,
+            'market_value': self.shares * self.market_price,
+            'fair_value': self.shares * fair_value,
+            'mispricing': self.shares * (fair_value - self.market_price),
+        }
+
+    def scenario_fair_values(self):
+        """(scenarios, positions) fair value per share"""
+        import numpy as np
+
+        values = np.empty((self.n_scenarios, len(self.keys)))
+        for model_key, rows in self.rows.items():
+            mask = self.models == model_key
+            values[:, mask] = rows.scenarios[:, self.model_row[mask]]
+        return values
+
+    def summary(self, percentiles=(5, 25, 50, 75, 95)):
+        """Book totals and the distribution of total mispricing across scenarios"""
+        import numpy as np
+
+        p = self.positions()
+        book = (self.scenario_fair_values() - self.market_price) @ self.shares
+        market_value = float(p['market_value'].sum())
+        points = np.percentile(book, percentiles) if len(self.keys) else [0.0] * len(percentiles)
+        return {
+            'positions': len(self.keys),
+            'market_value': market_value,
+            'fair_value': float(p['fair_value'].sum()),
+            'mispricing': float(p['mispricing'].sum()),
+            'mispricing_pct': float(p['mispricing'].sum() / market_value * 100) if market_value else 0.0,
+            'scenarios': self.n_scenarios,
+            'mispricing_percentiles': {q: float(v) for q, v in zip(percentiles, points)},
+            'prob_undervalued': float((book > 0).mean()) if len(self.keys) else 0.0,
+        }
+
+    def by(self, field='ticker'):
+        """Totals grouped by 'ticker', 'user' or 'model', largest mispricing first"""
+        import numpy as np
+
+        p = self.positions()
+        labels, codes = np.unique(p[field].astype(str), return_inverse=True)
+        count = np.bincount(codes, minlength=len(labels))
+        market_value = np.bincount(codes, p['market_value'], len(labels))
+        fair_value = np.bincount(codes, p['fair_value'], len(labels))
+        order = np.argsort(fair_value - market_value)[::-1]
+        return [{
+            field: str(labels[i]),
+            'positions': int(count[i]),
+            'market_value': float(market_value[i]),
+            'fair_value': float(fair_value[i]),
+            'mispricing': float(fair_value[i] - market_value[i]),
+            'mispricing_pct': float((fair_value[i] - market_value[i]) / market_value[i] * 100),
+        } for i in order]
+
+    def sizing(self):
+        """
+        Suggested weight per ticker: expected upside over its scenario
+        variance (mean-variance), across all users' views of the ticker,
+        normalized to 100% over tickers with positive upside
+        """
+        import numpy as np
+
+        labels, codes = np.unique(self.tickers.astype(str), return_inverse=True)
+        # Scenario return of each ticker: position-weighted average of views
+        upside = (self.scenario_fair_values() - self.market_price) / self.market_price
+        weights = self.shares * self.market_price
+        membership = np.zeros((len(codes), len(labels)))
+        membership[np.arange(len(codes)), codes] = weights
+        returns = (upside @ membership) / membership.sum(axis=0)
+        mean, std = returns.mean(axis=0), returns.std(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            score = np.where(mean > 0, mean / (std * std), 0.0)
+        score = np.nan_to_num(score, posinf=0.0)
+        weight = score / score.sum() if score.sum() > 0 else score
+        order = np.argsort(weight)[::-1]
+        return [{'ticker': str(labels[i]), 'expected_upside_pct': float(mean[i] * 100),
+                 'upside_std_pct': float(std[i] * 100), 'weight_pct': float(weight[i] * 100)}
+                for i in order]
+
+
+def load_sizes(path):
+    """Position sizes: JSON list of {"user", "ticker", "shares" or "dollars"}"""
+    import json
+
+    with open(path, 'r') as f:
+        entries = json.load(f)
+    sizes = {}
+    for entry in entries:
+        if 'shares' not in entry and 'dollars' not in entry:
+            raise ValueError(f"{path}: {entry.get('user')}/{entry.get('ticker')} needs shares or dollars")
+        sizes[(entry['user'], entry['ticker'])] = {k: entry[k] for k in ('shares', 'dollars') if k in entry}
+    return sizes
+
+
+def main(argv):
+    """CLI: valuation_portfolio.py [--db PATH] [--user U] [--ticker T] [--positions FILE] [--scenarios N] [--watch SECONDS]"""
+    import argparse
+    from valuation_sessions import DEFAULT_DB, SessionStore
+
+    parser = argparse.ArgumentParser(prog='valuation_portfolio.py')
+    parser.add_argument('--db', default=DEFAULT_DB)
+    parser.add_argument('--user')
+    parser.add_argument('--ticker')
+    parser.add_argument('--positions', help='JSON list of {"user", "ticker", "shares" or "dollars"}')
+    parser.add_argument('--scenarios', type=int, default=1000)
+    parser.add_argument('--companies', help='company specs directory (default: companies/ next to the code)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--watch', type=float, help='re-read changed sessions every N seconds')
+    args = parser.parse_args(argv)
+
+    sizes = load_sizes(args.positions) if args.positions else None
+    try:
+        portfolio = Portfolio(args.companies, scenarios=args.scenarios, seed=args.seed)
+    except ValueError as e:
+        print(f"\n❌ {e}")
+        return 1
+    with SessionStore(args.db) as store:
+        started = time.perf_counter()
+        portfolio.load(store, args.user, args.ticker, sizes)
+        elapsed = time.perf_counter() - started
+        _report(portfolio, elapsed)
+
+        while args.watch:
+            time.sleep(args.watch)
+            started = time.perf_counter()
+            changed = portfolio.refresh(store)
+            if changed:
+                print(f"\n🔄 {changed} session(s) changed, revalued in {(time.perf_counter() - started) * 1000:.1f} ms")
+                _report(portfolio, None)
+    return 0
+
+
+def _report(portfolio, elapsed):
+    summary = portfolio.summary()
+    print("\n" + "="*70)
+    timing = '' if elapsed is None else f" valued in {elapsed * 1000:.0f} ms"
+    print(f"PORTFOLIO: {summary['positions']:,} positions x {summary['scenarios']:,} scenarios{timing}")
+    print("="*70)
+    for key, reason in portfolio.skipped:
+        print(f"   ⚠️  skipped {'/'.join(key)}: {reason}")
+    print(f"\nMarket value:  ${summary['market_value'] / 1e6:,.2f}M")
+    print(f"Fair value:    ${summary['fair_value'] / 1e6:,.2f}M")
+    marker = "📈" if summary['mispricing'] > 0 else "📉"
+    print(f"{marker} Mispricing:  ${summary['mispricing'] / 1e6:+,.2f}M ({summary['mispricing_pct']:+.1f}%)")
+    print("\nBook mispricing across scenarios:")
+    for p, value in summary['mispricing_percentiles'].items():
+        print(f"   P{p:<3} ${value / 1e6:+,.2f}M")
+    print(f"📈 Chance the book is undervalued: {summary['prob_undervalued'] * 100:.1f}%")
+
+    sizing = {row['ticker']: row for row in portfolio.sizing()}
+    print(f"\n{'Ticker':<8}{'Positions':>10}{'Market $M':>12}{'Mispricing':>14}{'Suggested':>12}")
+    for row in portfolio.by('ticker')[:20]:
+        print(f"{row['ticker']:<8}{row['positions']:>10}{row['market_value'] / 1e6:>12,.2f}"
+              f"{row['mispricing_pct']:>13.1f}%{sizing[row['ticker']]['weight_pct']:>11.1f}%")
+    print(f"\n{'User':<16}{'Positions':>10}{'Market $M':>12}{'Mispricing':>14}")
+    for row in portfolio.by('user')[:20]:
+        print(f"{row['user']:<16}{row['positions']:>10}{row['market_value'] / 1e6:>12,.2f}{row['mispricing_pct']:>13.1f}%")
+    print("\n" + "="*70)
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Valuation Oracle - Question Library
+
+The questions the CEO interview (V2) asks. Edit them here;
+valuation_questions compiles this file into a resource the scripts load
+at startup. V1's questions are part of each company spec
+(companies/<ticker>.json, see valuation_companies).
+"""
+
+# V2: questions a Goldman analyst would ask Uber CEO in private meeting.
+# These are things only insiders know RIGHT NOW.
+CEO_QUESTIONS = [
+    # === REVENUE & GROWTH (Current Reality) ===
+    {
+        'id': 'revenue_last_week',
+        'category': 'Revenue & Growth',
+        'text': 'What was Uber\'s total revenue last week?',
+        'context': 'Last quarter: $9.3B over 90 days = ~$103M/day. Current run rate tells if Q4 will beat/miss.',
+        'unit': '$M',
+        'baseline': 103 * 7,  # ~$721M per week
+        'impact_weight': 8,
+    },
+    {
+        'id': 'mobility_gmv_growth_mom',
+        'category': 'Revenue & Growth',
+        'text': 'What is Mobility GMV growth rate month-over-month right now?',
+        'context': 'Are rides accelerating or decelerating vs last month?',
+        'unit': '%',
+        'baseline': 2.0,  # 2% MoM = ~27% YoY
+        'impact_weight': 7,
+    },
+    {
+        'id': 'delivery_gmv_growth_mom',
+        'category': 'Revenue & Growth',
+        'text': 'What is Delivery GMV growth rate month-over-month right now?',
+        'context': 'Is Uber Eats growing faster or slower than last month?',
+        'unit': '%',
+        'baseline': 1.5,  # 1.5% MoM = ~20% YoY
+        'impact_weight': 7,
+    },
+
+    # === UNIT ECONOMICS (Real Take Rates & Margins) ===
+    {
+        'id': 'mobility_take_rate_current',
+        'category': 'Unit Economics',
+        'text': 'What is the ACTUAL Mobility take rate this week (after driver incentives)?',
+        'context': 'Public filings show ~24%, but what\'s the TRUE rate after all promotions?',
+        'unit': '%',
+        'baseline': 24.0,
+        'impact_weight': 9,
+    },
+    {
+        'id': 'delivery_take_rate_current',
+        'category': 'Unit Economics',
+        'text': 'What is the ACTUAL Delivery take rate this week (after restaurant incentives)?',
+        'context': 'Public filings show ~23%, but what\'s the TRUE rate after all promotions?',
+        'unit': '%',
+        'baseline': 23.0,
+        'impact_weight': 9,
+    },
+    {
+        'id': 'contribution_margin_mobility',
+        'category': 'Unit Economics',
+        'text': 'What is contribution margin on Mobility rides right now (after insurance, support)?',
+        'context': 'Revenue minus direct variable costs per ride.',
+        'unit': '%',
+        'baseline': 65,
+        'impact_weight': 8,
+    },
+    {
+        'id': 'contribution_margin_delivery',
+        'category': 'Unit Economics',
+        'text': 'What is contribution margin on Delivery orders right now (after support, fraud)?',
+        'context': 'Revenue minus direct variable costs per order.',
+        'unit': '%',
+        'baseline': 55,
+        'impact_weight': 8,
+    },
+
+    # === MARKET POSITION (Current Competitive Reality) ===
+    {
+        'id': 'us_rideshare_market_share',
+        'category': 'Market Position',
+        'text': 'What is Uber\'s ACTUAL rideshare market share in the US right now?',
+        'context': 'Versus Lyft. What % of all ride-hailing trips are Uber?',
+        'unit': '%',
+        'baseline': 74,
+        'impact_weight': 6,
+    },
+    {
+        'id': 'us_delivery_market_share',
+        'category': 'Market Position',
+        'text': 'What is Uber Eats ACTUAL market share in US food delivery right now?',
+        'context': 'Versus DoorDash, Grubhub. What % of all food delivery orders?',
+        'unit': '%',
+        'baseline': 25,
+        'impact_weight': 6,
+    },
+    {
+        'id': 'doordash_pricing_vs_uber',
+        'category': 'Market Position',
+        'text': 'How much cheaper/expensive is DoorDash than Uber Eats on average right now?',
+        'context': 'For same restaurant, same order. Positive = DoorDash more expensive.',
+        'unit': '%',
+        'baseline': -5,  # DoorDash 5% cheaper
+        'impact_weight': 5,
+    },
+
+    # === PROFITABILITY (True Economics) ===
+    {
+        'id': 'stock_based_comp_run_rate',
+        'category': 'Profitability',
+        'text': 'What is quarterly stock-based compensation run rate RIGHT NOW?',
+        'context': 'This is a REAL cost (dilutes shareholders). What\'s the current quarterly burn?',
+        'unit': '$M',
+        'baseline': 750,  # ~$3B/year
+        'impact_weight': 10,
+    },
+    {
+        'id': 'ebitda_margin_current_quarter',
+        'category': 'Profitability',
+        'text': 'What will adjusted EBITDA margin be THIS quarter?',
+        'context': 'Before stock-based comp. Last quarter was ~11%. Is it improving?',
+        'unit': '%',
+        'baseline': 11.5,
+        'impact_weight': 10,
+    },
+    {
+        'id': 'true_profit_margin_current',
+        'category': 'Profitability',
+        'text': 'What is TRUE profit margin this quarter (EBITDA minus stock-based comp)?',
+        'context': 'This is what actually flows to shareholders after dilution.',
+        'unit': '%',
+        'baseline': 3.0,  # 11.5% EBITDA - 8% SBC
+        'impact_weight': 10,
+    },
+
+    # === CHURN & RETENTION (User/Driver Health) ===
+    {
+        'id': 'monthly_active_riders_growth',
+        'category': 'Churn & Retention',
+        'text': 'What is monthly active platform consumer growth rate (MoM)?',
+        'context': 'Are you gaining or losing users vs last month?',
+        'unit': '%',
+        'baseline': 1.0,  # 1% MoM = 12.7% YoY
+        'impact_weight': 7,
+    },
+    {
+        'id': 'driver_churn_rate_monthly',
+        'category': 'Churn & Retention',
+        'text': 'What % of active drivers churn each month?',
+        'context': 'How many drivers who drove last month won\'t drive this month?',
+        'unit': '%',
+        'baseline': 8,
+        'impact_weight': 5,
+    },
+    {
+        'id': 'trips_per_active_user_mom',
+        'category': 'Churn & Retention',
+        'text': 'Are trips per active user increasing or decreasing vs last month?',
+        'context': 'Positive = users taking more trips. Negative = frequency declining.',
+        'unit': '%',
+        'baseline': 0.5,  # Slight increase
+        'impact_weight': 6,
+    },
+
+    # === REGULATORY & RISK (Current Exposure) ===
+    {
+        'id': 'regulatory_liabilities_on_books',
+        'category': 'Regulatory & Risk',
+        'text': 'What are total outstanding regulatory liabilities on the balance sheet RIGHT NOW?',
+        'context': 'CA AB5, UK employment cases, EU regulations. What\'s accrued/reserved today?',
+        'unit': '$M',
+        'baseline': 800,
+        'impact_weight': 6,
+    },
+    {
+        'id': 'insurance_cost_trend',
+        'category': 'Regulatory & Risk',
+        'text': 'Is insurance cost per trip increasing or decreasing vs last quarter?',
+        'context': 'Claims, accidents, fraud. Are costs going up or down?',
+        'unit': '%',
+        'baseline': 2,  # 2% increase
+        'impact_weight': 5,
+    },
+
+    # === CAPITAL ALLOCATION (Current Spending) ===
+    {
+        'id': 'share_buyback_last_quarter',
+        'category': 'Capital Allocation',
+        'text': 'How much did Uber spend on share buybacks last quarter?',
+        'context': 'Announced $7B authorization. What was the ACTUAL buyback amount last quarter?',
+        'unit': '$M',
+        'baseline': 500,  # $500M per quarter
+        'impact_weight': 7,
+    },
+    {
+        'id': 'capex_run_rate',
+        'category': 'Capital Allocation',
+        'text': 'What is quarterly capex run rate right now?',
+        'context': 'Data centers, office space, infrastructure. What are you spending?',
+        'unit': '$M',
+        'baseline': 100,
+        'impact_weight': 3,
+    },
+
+    # === AUTONOMOUS VEHICLES (Current Reality) ===
+    {
+        'id': 'waymo_market_share_phoenix',
+        'category': 'Autonomous Vehicles',
+        'text': 'What % of rideshare trips in Phoenix are now Waymo (not Uber/Lyft)?',
+        'context': 'Phoenix is Waymo\'s biggest market. How much share have they taken?',
+        'unit': '%',
+        'baseline': 5,
+        'impact_weight': 4,
+    },
+    {
+        'id': 'autonomous_rides_on_uber_current',
+        'category': 'Autonomous Vehicles',
+        'text': 'What % of Uber rides THIS WEEK are autonomous (Waymo partnership)?',
+        'context': 'Uber partners with Waymo in some cities. What % of total Uber rides are AV right now?',
+        'unit': '%',
+        'baseline': 0.1,  # Very small currently
+        'impact_weight': 3,
+    },
+
+    # === ADVERTISING & NEW REVENUE ===
+    {
+        'id': 'advertising_revenue_run_rate',
+        'category': 'Advertising & New Revenue',
+        'text': 'What is quarterly advertising revenue run rate RIGHT NOW?',
+        'context': 'Restaurant ads, promoted listings. Last quarter was ~$300M. Growing?',
+        'unit': '$M',
+        'baseline': 350,
+        'impact_weight': 7,
+    },
+    {
+        'id': 'advertising_margin',
+        'category': 'Advertising & New Revenue',
+        'text': 'What is gross margin on advertising revenue?',
+        'context': 'Almost pure profit, or do you have real costs to serve ads?',
+        'unit': '%',
+        'baseline': 85,
+        'impact_weight': 6,
+    },
+
+    # === COMPETITIVE DYNAMICS ===
+    {
+        'id': 'driver_switching_to_doordash',
+        'category': 'Competitive Dynamics',
+        'text': 'What % of Uber Eats drivers also drive for DoorDash?',
+        'context': 'Multi-homing weakens your pricing power with drivers.',
+        'unit': '%',
+        'baseline': 60,
+        'impact_weight': 4,
+    },
+    {
+        'id': 'consumer_switching_apps',
+        'category': 'Competitive Dynamics',
+        'text': 'What % of Uber Eats users also use DoorDash regularly?',
+        'context': 'Multi-homing weakens pricing power with consumers.',
+        'unit': '%',
+        'baseline': 40,
+        'impact_weight': 4,
+    },
+
+    # === INTERNATIONAL EXPOSURE ===
+    {
+        'id': 'international_revenue_pct',
+        'category': 'International',
+        'text': 'What % of total revenue is from outside US+Canada right now?',
+        'context': 'International growth vs US maturity. Where is the future?',
+        'unit': '%',
+        'baseline': 35,
+        'impact_weight': 5,
+    },
+    {
+        'id': 'international_margin_vs_us',
+        'category': 'International',
+        'text': 'How much lower are international margins vs US margins?',
+        'context': 'Negative = international is less profitable. E.g., -500 bps = 5% lower.',
+        'unit': 'bps',
+        'baseline': -300,  # 3% lower
+        'impact_weight': 5,
+    },
+
+    # === FREIGHT & OTHER BETS ===
+    {
+        'id': 'freight_quarterly_revenue',
+        'category': 'Other Bets',
+        'text': 'What is Uber Freight revenue THIS quarter?',
+        'context': 'Trucking logistics. Is it growing or dying?',
+        'unit': '$M',
+        'baseline': 300,
+        'impact_weight': 2,
+    },
+]
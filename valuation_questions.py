@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Valuation Oracle - Question Loader
+
+The question libraries, loaded from a compiled resource instead of
+Python source.
+
+A script run directly is compiled from source on every launch, and so
+is every module when bytecode caching is off (PYTHONDONTWRITEBYTECODE,
+read-only installs), and for the question library that parse is a
+noticeable share of a --demo run. So the first load saves the parsed
+libraries with marshal to valuation_questions.dat, and later launches
+read that back: a single file read and no parsing. The resource records
+the library file's size and modification time and is rebuilt whenever
+they change. If it can't be written, the questions come from source.
+"""
+
+import marshal
+import os
+
+_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE = os.path.join(_DIR, 'valuation_question_library.py')
+RESOURCE = os.path.join(_DIR, 'valuation_questions.dat')
+
+# Model key -> list in valuation_question_library
+LIBRARIES = {'v2': 'CEO_QUESTIONS'}
+
+_libraries = None
+
+
+def _source_stamp():
+    st = os.stat(SOURCE)
+    return (marshal.version, st.st_size, st.st_mtime_ns)
+
+
+def build():
+    """Compile the library into RESOURCE (when writable); returns the libraries"""
+    import valuation_question_library as library
+
+    stamp = _source_stamp()
+    libraries = {key: getattr(library, name) for key, name in LIBRARIES.items()}
+    tmp = f"{RESOURCE}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, 'wb') as f:
+            marshal.dump((stamp, libraries), f)
+        os.replace(tmp, RESOURCE)
+    except OSError:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return libraries
+
+
+def _load_all():
+    global _libraries
+    if _libraries is None:
+        try:
+            with open(RESOURCE, 'rb') as f:
+                stamp, libraries = marshal.load(f)
+            if stamp != _source_stamp():
+                libraries = build()
+        except (OSError, EOFError, ValueError, TypeError):
+            libraries = build()
+        _libraries = libraries
+    return _libraries
+
+
+def load_questions(model_key):
+    """A fresh copy of one model's questions ('v2'; V1's come from company specs)"""
+    return [dict(q) for q in _load_all()[model_key]]
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+Valuation Oracle - Local HTTP/JSON Service
+
+One warm process serving both models to many clients at once. Each
+request carries its own answers, so clients never share state:
+
+    POST /v1/value           {"answers": {"ebitda_margin_2027": 17}}
+    POST /v1/batch           {"answers": {...}, "scenarios": [{...}, {...}]}
+    POST /v1/sensitivity     {"answers": {...}, "top": 5}
+    POST /v1/next_question   {"answers": {...}, "adaptive": true}
+    GET  /health             GET /stats             GET /metrics (with --metrics)
+
+(/v2/... for the CEO interview.) Responses are JSON; errors are
+{"error": "..."} with a 4xx status. Connections are kept alive.
+
+One warm model per version is shared by every request: answers are
+passed to it as immutable Assumptions snapshots, never written into it.
+Repeat valuations come from the shared fair-value cache. Batches skip
+the cache: they are valued with the vectorized model in a worker thread,
+so a large one doesn't stall the event loop.
+
+    python3 valuation_service.py serve --port 8765
+    python3 valuation_service.py loadtest --clients 200 --requests 50
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import deque
+
+from valuation_assumptions import Assumptions
+from valuation_sweep import MODELS, batch_fair_values, load_model
+
+MAX_BODY = 10 * 1024 * 1024
+MAX_SCENARIOS = 1_000_000
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+def _percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+class RequestError(Exception):
+    """Client error, reported as {"error": message} with the given status"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class ValuationService:
+    """Routes JSON requests to warm model instances"""
+
+    ACTIONS = ('value', 'batch', 'sensitivity', 'next_question')
+
+    def __init__(self, metrics=None):
+        self.metrics = metrics
+        self.models = {key: load_model(key) for key in MODELS}
+        for model in self.models.values():
+            model.history = None
+        self.question_ids = {key: {q['id'] for q in model.questions}
+                             for key, model in self.models.items()}
+        self.requests = 0
+        self.errors = 0
+        self.timings = deque(maxlen=10_000)  # seconds spent handling recent requests
+        self.started = time.time()
+
+    def _check(self, model_key, answers, label='answers'):
+        if not isinstance(answers, dict):
+            raise RequestError(f"{label} must be an object of question id -> number")
+        unknown = [qid for qid in answers if qid not in self.question_ids[model_key]]
+        if unknown:
+            raise RequestError(f"Unknown question ids: {', '.join(sorted(unknown))}")
+        for qid, value in answers.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise RequestError(f"Answer for {qid!r} must be a number")
+        return answers
+
+    def _answers(self, model_key, answers, label='answers'):
+        return Assumptions(self._check(model_key, answers, label))
+
+    async def handle(self, method, path, payload):
+        """(status, response dict) for one request"""
+        self.requests += 1
+        started = time.perf_counter()
+        try:
+            result = self._route(method, path, payload)
+            if callable(result):
+                result = await asyncio.get_running_loop().run_in_executor(None, result)
+            return 200, result
+        except RequestError as e:
+            self.errors += 1
+            return e.status, {'error': str(e)}
+        finally:
+            self.timings.append(time.perf_counter() - started)
+
+    def _route(self, method, path, payload):
+        """The response, or a function computing it off the event loop"""
+        parts = path.split('?', 1)[0].strip('/').split('/')
+        if parts == ['health']:
+            return {'status': 'ok'}
+        if parts == ['metrics'] and self.metrics is not None:
+            return self.metrics.to_prometheus()
+        if parts == ['stats']:
+            from valuation_cache import FAIR_VALUE_CACHE
+            timings = sorted(self.timings)
+            return {
+                'requests': self.requests,
+                'errors': self.errors,
+                'uptime_seconds': round(time.time() - self.started, 1),
+                'handle_p50_us': round(_percentile(timings, 50) * 1e6, 1),
+                'handle_p99_us': round(_percentile(timings, 99) * 1e6, 1),
+                'cache': FAIR_VALUE_CACHE.stats(),
+            }
+        if len(parts) != 2 or parts[0] not in MODELS or parts[1] not in self.ACTIONS:
+            raise RequestError(f"No such endpoint: {path}", 404)
+        if method != 'POST' and not (method == 'GET' and parts[1] == 'next_question'):
+            raise RequestError(f"{method} not allowed on {path}", 405)
+
+        model_key, action = parts
+        answers = self._answers(model_key, payload.get('answers', {}))
+        return getattr(self, '_' + action)(model_key, answers, payload)
+
+    # === ACTIONS ===
+
+    def _value(self, model_key, answers, payload):
+        return self.models[model_key].calculate_fair_value(answers)
+
+    def _batch(self, model_key, answers, payload):
+        scenarios = payload.get('scenarios')
+        if not isinstance(scenarios, list) or not scenarios:
+            raise RequestError("'scenarios' must be a non-empty list of answer objects")
+        if len(scenarios) > MAX_SCENARIOS:
+            raise RequestError(f"At most {MAX_SCENARIOS:,} scenarios per request", 413)
+        for i, scenario in enumerate(scenarios):
+            self._check(model_key, scenario, f"scenarios[{i}]")
+        return functools.partial(self._batch_values, model_key, answers, scenarios)
+
+    def _batch_values(self, model_key, answers, scenarios):
+        """
+        Scenario fair values, one vectorized call per set of answered ids
+        (an input left unanswered falls back the same way it does in
+        calculate_fair_value, so it can't share a column with answers)
+        """
+        import numpy as np
+
+        groups = {}
+        for i, scenario in enumerate(scenarios):
+            groups.setdefault(frozenset(scenario), []).append(i)
+
+        fair_values = np.empty(len(scenarios))
+        for ids, rows in groups.items():
+            columns = {qid: np.full(len(rows), float(value)) for qid, value in answers.items()}
+            for qid in ids:
+                columns[qid] = np.array([scenarios[i][qid] for i in rows], dtype=np.float64)
+            fair_values[rows] = batch_fair_values(model_key, self.models[model_key], columns, len(rows))
+        return {'fair_value_per_share': [round(value, 2) for value in fair_values.tolist()]}
+
+    def _sensitivity(self, model_key, answers, payload):
+        from valuation_sensitivity import top_drivers
+
+        top = payload.get('top', 5)
+        if isinstance(top, bool) or not isinstance(top, int) or top < 1:
+            raise RequestError("'top' must be a positive integer")
+        report = self.models[model_key].fair_value_gradient(answers)
+        report['top_drivers'] = [name for name, _ in top_drivers(report, top)]
+        if 'steps' in report:
+            report['steps'] = {str(k): v for k, v in report['steps'].items()}
+        return report
+
+    def _next_question(self, model_key, answers, payload):
+        adaptive = payload.get('adaptive', False)
+        if not isinstance(adaptive, bool):
+            raise RequestError("'adaptive' must be true or false")
+        question = self.models[model_key].get_next_question(answers, adaptive=adaptive)
+        return {'question': question, 'answered': len(answers),
+                'total': len(self.models[model_key].questions)}
+
+
+# === HTTP ===
+
+async def _read_request(reader):
+    """(method, path, headers, body) or None at end of connection"""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, path, _ = line.decode('latin-1').split(' ', 2)
+    except ValueError:
+        raise RequestError("Malformed request line")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get('content-length', 0) or 0)
+    except ValueError:
+        raise RequestError("Bad Content-Length")
+    if length > MAX_BODY:
+        raise RequestError(f"Body larger than {MAX_BODY} bytes", 413)
+    body = await reader.readexactly(length) if length else b''
+    return method, path, headers, body
+
+
+def _response(status, payload, keep_alive):
+    if isinstance(payload, str):
+        body, content_type = payload.encode(), 'text/plain; version=0.0.4'
+    else:
+        body, content_type = json.dumps(payload).encode(), 'application/json'
+    head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode() + body
+
+
+async def serve(service, host='127.0.0.1', port=8765, ready=None):
+    """Run the HTTP server until cancelled"""
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                    if request is None:
+                        break
+                    method, path, headers, body = request
+                    keep_alive = headers.get('connection', '').lower() != 'close'
+                    try:
+                        payload = json.loads(body) if body else {}
+                    except ValueError:
+                        raise RequestError("Body is not valid JSON")
+                    if not isinstance(payload, dict):
+                        raise RequestError("Body must be a JSON object")
+                    status, result = await service.handle(method, path, payload)
+                except RequestError as e:
+                    service.requests += 1
+                    service.errors += 1
+                    status, result, keep_alive = e.status, {'error': str(e)}, False
+                except Exception as e:
+                    service.requests += 1
+                    service.errors += 1
+                    status, result, keep_alive = 500, {'error': f"{type(e).__name__}: {e}"}, False
+
+                writer.write(_response(status, result, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port, backlog=1024)
+    if ready is not None:
+        ready(server.sockets[0].getsockname()[1])
+    async with server:
+        await server.serve_forever()
+
+
+# === LOAD TEST ===
+
+def _payload(model_key, i):
+    """A varied but repeating request body, so the cache gets exercised"""
+    if model_key == 'v1':
+        return {'answers': {'ebitda_margin_2027': 12 + i % 9, 'ebitda_multiple': 12 + i % 7}}
+    return {'answers': {'ebitda_margin_current_quarter': 9 + i % 9,
+                        'monthly_active_riders_growth': i % 4}}
+
+
+async def _client(host, port, model_key, action, count, offset, latencies, failures):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for i in range(count):
+            payload = _payload(model_key, offset + i)
+            if action == 'batch':
+                payload['scenarios'] = [_payload(model_key, offset + i + j)['answers'] for j in range(100)]
+            body = json.dumps(payload).encode()
+            request = (f"POST /{model_key}/{action} HTTP/1.1\r\nHost: {host}\r\n"
+                       f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n").encode() + body
+
+            sent = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status_line = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                if line.lower().startswith(b'content-length:'):
+                    length = int(line.split(b':')[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - sent)
+            if b' 200 ' not in status_line:
+                failures.append(status_line.decode().strip())
+    finally:
+        writer.close()
+
+
+async def load_test(host, port, clients=100, requests=100, model_key='v2', action='value'):
+    """Many concurrent keep-alive clients; returns throughput and latency stats"""
+    latencies, failures = [], []
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, model_key, action, requests, c * requests, latencies, failures)
+        for c in range(clients)
+    ))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'failures': len(failures),
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(len(latencies) / elapsed),
+        'latency_p50_ms': round(_percentile(latencies, 50) * 1000, 3),
+        'latency_p99_ms': round(_percentile(latencies, 99) * 1000, 3),
+        'latency_max_ms': round(latencies[-1] * 1000, 3),
+        'server': await _get_json(host, port, '/stats'),
+    }
+
+
+async def _get_json(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+        response = await reader.read()
+        return json.loads(response.split(b'\r\n\r\n', 1)[1])
+    finally:
+        writer.close()
+
+
+def _start_local_server():
+    """Start `serve` in a child process on a free port; returns (process, port)"""
+    import socket
+
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    process = subprocess.Popen([sys.executable, os.path.abspath(__file__), 'serve', '--port', str(port)],
+                               stdout=subprocess.DEVNULL)
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return process, port
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("Service did not start")
+
+
+def main(argv):
+    """CLI: serve [--host H] [--port P] | loadtest [--connect HOST:PORT] [--clients N] [--requests N]"""
+    parser = argparse.ArgumentParser(prog='valuation_service.py')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = commands.add_parser('serve', help='run the service')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8765)
+    serve_parser.add_argument('--metrics', action='store_true', help='time pipeline stages; expose GET /metrics')
+
+    test_parser = commands.add_parser('loadtest', help='hammer a service with concurrent clients')
+    test_parser.add_argument('--connect', help='HOST:PORT of a running service (default: start one)')
+    test_parser.add_argument('--clients', type=int, default=100)
+    test_parser.add_argument('--requests', type=int, default=100, help='requests per client')
+    test_parser.add_argument('--model', choices=sorted(MODELS), default='v2')
+    test_parser.add_argument('--action', choices=ValuationService.ACTIONS, default='value')
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        metrics = None
+        if args.metrics:
+            from valuation_metrics import METRICS, instrument
+            metrics = instrument(METRICS)
+        service = ValuationService(metrics)
+        print(f"🚀 Valuation service on http://{args.host}:{args.port} (Ctrl-C to stop)")
+        try:
+            asyncio.run(serve(service, args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    process = None
+    if args.connect:
+        host, port = args.connect.rsplit(':', 1)
+        port = int(port)
+    else:
+        process, port = _start_local_server()
+        host = '127.0.0.1'
+    try:
+        stats = asyncio.run(load_test(host, port, args.clients, args.requests, args.model, args.action))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    print("\n" + "="*70)
+    print(f"LOAD TEST: {args.clients} clients × {args.requests} /{args.model}/{args.action} requests")
+    print("="*70)
+    print(f"{stats['requests']:,} requests in {stats['seconds']}s ({stats['requests_per_second']:,}/s), "
+          f"{stats['failures']} failed")
+    print(f"Round trip p50 {stats['latency_p50_ms']}ms, p99 {stats['latency_p99_ms']}ms, "
+          f"max {stats['latency_max_ms']}ms")
+    server = stats['server']
+    print(f"Server handling p50 {server['handle_p50_us']}µs, p99 {server['handle_p99_us']}µs "
+          f"(cache hit rate {server['cache']['hit_rate']:.0%})")
+    print("="*70 + "\n")
+    return 1 if stats['failures'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Valuation Oracle - Session Store
+
+Saved sessions for many users, tickers and models in one SQLite
+database instead of one JSON file per mode in the working directory.
+Every save is a new row, so a session's past states stay queryable by
+date, and two users (or two processes for one user) never overwrite
+each other's files.
+
+    store = SessionStore('valuation_sessions.db')
+    store.save('alice', 'UBER', 'v2', {'ebitda_margin_current_quarter': 13}, fair_value=21.4)
+    store.load('alice', 'UBER', 'v2')                 # latest
+    store.load('alice', 'UBER', 'v2', as_of=ts)       # as it stood at ts
+    store.sessions(ticker='UBER', since=ts)           # latest per user, saved since ts
+
+The database runs in WAL mode, so readers never block the writer, and
+connections come from a small pool shared by threads. Concurrent
+writers in other processes wait on SQLite's busy timeout instead of
+failing. save(..., defer=True) buffers rows and writes them in one
+transaction per batch.
+
+From the command line:
+
+    python3 valuation_sessions.py list [--user U] [--ticker T] [--since YYYY-MM-DD]
+    python3 valuation_sessions.py import uber_ceo_interview.json --user alice --model v2
+"""
+
+import json
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_DB = 'valuation_sessions.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    user TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    model TEXT NOT NULL,
+    saved_at REAL NOT NULL,
+    fair_value REAL,
+    answers TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_by_user ON sessions (user, ticker, model, saved_at);
+CREATE INDEX IF NOT EXISTS sessions_by_ticker ON sessions (ticker, saved_at);
+CREATE INDEX IF NOT EXISTS sessions_by_date ON sessions (saved_at);
+"""
+
+
+def _row(row):
+    return {
+        'user': row[0],
+        'ticker': row[1],
+        'model': row[2],
+        'saved_at': row[3],
+        'fair_value': row[4],
+        'answers': json.loads(row[5]),
+    }
+
+
+class SessionStore:
+    """Pooled SQLite (WAL) store of saved sessions keyed by user, ticker and model"""
+
+    def __init__(self, path=DEFAULT_DB, pool_size=4, batch_size=500, timeout=30.0):
+        self.path = path
+        self.batch_size = batch_size
+        self._pool = queue.Queue()
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        for _ in range(pool_size):
+            self._pool.put(self._connect(timeout))
+        with self._connection() as db:
+            db.executescript(SCHEMA)
+
+    def _connect(self, timeout):
+        db = sqlite3.connect(self.path, timeout=timeout, check_same_thread=False, isolation_level=None)
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute('PRAGMA synchronous=NORMAL')
+        return db
+
+    @contextmanager
+    def _connection(self):
+        db = self._pool.get()
+        try:
+            yield db
+        finally:
+            self._pool.put(db)
+
+    @contextmanager
+    def _transaction(self):
+        with self._connection() as db:
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                yield db
+            except BaseException:
+                db.execute('ROLLBACK')
+                raise
+            db.execute('COMMIT')
+
+    # === WRITING ===
+
+    def save(self, user, ticker, model, answers, fair_value=None, saved_at=None, defer=False):
+        """
+        Record one session state. defer=True buffers it until batch_size
+        rows are waiting (or flush()/close() is called).
+        """
+        row = (user, ticker, model, time.time() if saved_at is None else saved_at,
+               fair_value, json.dumps(dict(answers)))
+        if not defer:
+            self.save_many([row])
+            return
+        with self._pending_lock:
+            self._pending.append(row)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def save_many(self, rows):
+        """Record (user, ticker, model, saved_at, fair_value, answers_json) rows in one transaction"""
+        with self._transaction() as db:
+            db.executemany('INSERT INTO sessions (user, ticker, model, saved_at, fair_value, answers) '
+                           'VALUES (?, ?, ?, ?, ?, ?)', rows)
+
+    def flush(self):
+        """Write any deferred rows"""
+        with self._pending_lock:
+            rows, self._pending = self._pending, []
+        if rows:
+            self.save_many(rows)
+
+    def delete(self, user, ticker=None, model=None):
+        """Remove a user's sessions (optionally only one ticker/model); returns rows removed"""
+        query, params = 'DELETE FROM sessions WHERE user = ?', [user]
+        if ticker is not None:
+            query += ' AND ticker = ?'
+            params.append(ticker)
+        if model is not None:
+            query += ' AND model = ?'
+            params.append(model)
+        with self._transaction() as db:
+            return db.execute(query, params).rowcount
+
+    # === READING ===
+
+    def load(self, user, ticker, model, as_of=None):
+        """Latest saved state (at or before as_of, if given), or None"""
+        query = ('SELECT user, ticker, model, saved_at, fair_value, answers FROM sessions '
+                 'WHERE user = ? AND ticker = ? AND model = ?')
+        params = [user, ticker, model]
+        if as_of is not None:
+            query += ' AND saved_at <= ?'
+            params.append(as_of)
+        query += ' ORDER BY saved_at DESC, id DESC LIMIT 1'
+        with self._connection() as db:
+            row = db.execute(query, params).fetchone()
+        return None if row is None else _row(row)
+
+    def history(self, user, ticker, model, since=None, until=None):
+        """Every saved state for one session, oldest first"""
+        query = ('SELECT user, ticker, model, saved_at, fair_value, answers FROM sessions '
+                 'WHERE user = ? AND ticker = ? AND model = ?')
+        params = [user, ticker, model]
+        query, params = _date_range(query, params, since, until)
+        with self._connection() as db:
+            return [_row(r) for r in db.execute(query + ' ORDER BY saved_at, id', params)]
+
+    def sessions(self, user=None, ticker=None, model=None, since=None, until=None):
+        """
+        Latest state of every matching session (one per user/ticker/model),
+        counting only saves between since and until
+        """
+        query = 'SELECT user, ticker, model, MAX(saved_at), fair_value, answers FROM sessions WHERE 1=1'
+        params = []
+        for column, value in (('user', user), ('ticker', ticker), ('model', model)):
+            if value is not None:
+                query += f' AND {column} = ?'
+                params.append(value)
+        query, params = _date_range(query, params, since, until)
+        # SQLite returns the other columns from the row holding MAX(saved_at)
+        query += ' GROUP BY user, ticker, model ORDER BY user, ticker, model'
+        with self._connection() as db:
+            return [_row(r) for r in db.execute(query, params)]
+
+    def count(self):
+        with self._connection() as db:
+            return db.execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
+
+    def close(self):
+        self.flush()
+        while not self._pool.empty():
+            self._pool.get().close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _date_range(query, params, since, until):
+    if since is not None:
+        query += ' AND saved_at >= ?'
+        params.append(since)
+    if until is not None:
+        query += ' AND saved_at < ?'
+        params.append(until)
+    return query, params
+
+
+def main(argv):
+    """CLI: list [--user U] [--ticker T] [--since DATE] | import FILE --user U --model v1|v2"""
+    import argparse
+    import os
+    from datetime import datetime
+
+    parser = argparse.ArgumentParser(prog='valuation_sessions.py')
+    parser.add_argument('--db', default=DEFAULT_DB)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    list_parser = commands.add_parser('list', help='latest session per user/ticker/model')
+    list_parser.add_argument('--user')
+    list_parser.add_argument('--ticker')
+    list_parser.add_argument('--since', help='only sessions saved since this date (YYYY-MM-DD)')
+
+    import_parser = commands.add_parser('import', help='copy a saved JSON file into the store')
+    import_parser.add_argument('file')
+    import_parser.add_argument('--user', required=True)
+    import_parser.add_argument('--ticker', default='UBER')
+    import_parser.add_argument('--model', choices=('v1', 'v2'), required=True)
+    args = parser.parse_args(argv)
+
+    with SessionStore(args.db) as store:
+        if args.command == 'import':
+            with open(args.file, 'r') as f:
+                data = json.load(f)
+            answers = data.get('answers', data.get('user_estimates', {}))
+            if 'timestamp' in data:
+                saved_at = datetime.fromisoformat(data['timestamp']).timestamp()
+            else:
+                saved_at = os.path.getmtime(args.file)
+            store.save(args.user, args.ticker, args.model, answers, data.get('fair_value'), saved_at)
+            print(f"\n✓ Imported {len(answers)} answers for {args.user} ({args.ticker}, {args.model})\n")
+            return 0
+
+        since = None if args.since is None else datetime.fromisoformat(args.since).timestamp()
+        rows = store.sessions(user=args.user, ticker=args.ticker, since=since)
+        print("\n" + "="*70)
+        print(f"SESSIONS ({len(rows)})")
+        print("="*70)
+        for row in rows:
+            saved = time.strftime('%Y-%m-%d %H:%M', time.localtime(row['saved_at']))
+            fair_value = '-' if row['fair_value'] is None else f"${row['fair_value']:.2f}"
+            print(f"{row['user']:<16} {row['ticker']:<6} {row['model']}  {saved}  "
+                  f"{len(row['answers']):>3} answers  fair value {fair_value}")
+        print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,499 @@
+#!/usr/bin/env python3
+"""
+Valuation Oracle - Declarative Model Specs
+
+A model written as data instead of Python: inputs with their defaults,
+company facts, and named formulas. models/uber_v2.json is the CEO
+interview model:
+
+    {
+      "inputs": {"revenue_last_week": null, "ebitda_margin_current_quarter": 11.5, ...},
+      "facts": {"last_quarter_revenue": 9.3, "shares_outstanding": 2.1, ...},
+      "nodes": {
+        "ebitda": "annual_revenue * (ebitda_margin_current_quarter / 100)",
+        "multiple": "18 if monthly_active_riders_growth > 2.0 else 15 if monthly_active_riders_growth > 1.0 else 12",
+        ...
+      },
+      "outputs": {"fair_value_per_share": "fair_value_per_share", "multiple_used": "multiple", ...}
+    }
+
+Formulas use Python expression syntax: numbers, + - * / **, unary
+minus, one comparison at a time, and `a if condition else b` for
+piecewise rules. A node may use inputs, facts and earlier nodes. An
+input with a null default is optional and may only be used inside
+`... if answered(name) else ...`.
+
+compile_spec() lowers every formula into one expression graph, where
+identical subexpressions (within and across nodes) become a single
+value, constant subexpressions are folded, and integer powers become
+multiplication chains. It then generates two functions from the graph:
+
+  - scalar: straight-line Python, one assignment per named or shared value
+  - batch:  the same expressions over NumPy arrays, np.where for piecewise rules
+
+Chains round exactly like hand-written repeated multiplication
+((x⁴·x⁴)·x⁴ for x ** 12). Only + - * / are emitted, so scalar and batch
+results are bit-identical, and the scalar function also runs on
+valuation_sensitivity.Dual.
+
+    spec = compile_spec(load_spec('models/uber_v2.json'))
+    spec.evaluate({'ebitda_margin_current_quarter': 13})['fair_value_per_share']
+    interview.load_spec('models/uber_v2.json')   # UberCEOInterview values through it
+
+From the command line:
+
+    python3 valuation_spec.py models/uber_v2.json [--source] [--check 10000]
+"""
+
+import ast
+import hashlib
+import json
+import keyword
+import operator
+import os
+import sys
+
+# Integer powers up to this are emitted as multiplication chains
+MAX_CHAIN_POWER = 64
+
+_BINOPS = {ast.Add: 'add', ast.Sub: 'sub', ast.Mult: 'mul', ast.Div: 'div', ast.Pow: 'pow'}
+_COMPARISONS = {ast.Gt: 'gt', ast.GtE: 'ge', ast.Lt: 'lt', ast.LtE: 'le'}
+_SYMBOLS = {'add': '+', 'sub': '-', 'mul': '*', 'div': '/', 'pow': '**',
+            'gt': '>', 'ge': '>=', 'lt': '<', 'le': '<='}
+_FOLD = {'add': operator.add, 'sub': operator.sub, 'mul': operator.mul, 'div': operator.truediv,
+         'pow': operator.pow, 'gt': operator.gt, 'ge': operator.ge, 'lt': operator.lt,
+         'le': operator.le, 'neg': operator.neg}
+# IEEE addition and multiplication are commutative (not associative), so
+# a * b and b * a can share one value without changing a single bit
+_COMMUTATIVE = {'add', 'mul'}
+_RESERVED = {'np', 'answered', 'answers', 'facts'}
+
+
+def load_spec(path):
+    """Load a spec file and check its sections"""
+    with open(path, 'r') as f:
+        spec = json.load(f)
+
+    missing = [k for k in ('inputs', 'nodes', 'outputs') if k not in spec]
+    if missing:
+        raise ValueError(f"{path}: missing {', '.join(missing)}")
+    spec.setdefault('facts', {})
+    spec.setdefault('name', os.path.splitext(os.path.basename(path))[0])
+    return spec
+
+
+def spec_version(spec):
+    """Fingerprint of a spec's model (changes whenever a formula or default does)"""
+    model = {k: spec[k] for k in ('inputs', 'facts', 'nodes', 'outputs')}
+    return hashlib.sha256(json.dumps(model, sort_keys=True).encode()).hexdigest()[:16]
+
+
+class _ExpressionGraph:
+    """
+    Operations in creation (= dependency) order. Asking for an operation
+    that already exists returns the existing one, which is all common
+    subexpression elimination takes.
+    """
+
+    def __init__(self):
+        self.ops = []     # (kind, *operands); operands are op indices, names or constants
+        self.index = {}   # op key -> position in ops
+        self.requested = 0  # arithmetic ops asked for, before sharing and folding
+
+    def const(self, value):
+        # Keyed on repr so 1 and 1.0 (and 0.0 and -0.0) stay distinct
+        return self._intern(('const', repr(value)), ('const', value))
+
+    def arg(self, name):
+        return self._intern(('arg', name), ('arg', name))
+
+    def add(self, kind, *operands):
+        self.requested += 1
+        if kind in _COMMUTATIVE:
+            operands = tuple(sorted(operands))
+        consts = [self.ops[i][1] for i in operands if self.ops[i][0] == 'const']
+        if kind != 'where' and len(consts) == len(operands):
+            try:
+                return self.const(_FOLD[kind](*consts))
+            except (ZeroDivisionError, OverflowError):
+                pass  # left for run time, where NumPy gives inf/nan
+        if kind == 'where' and self.ops[operands[0]][0] == 'const':
+            return operands[1] if self.ops[operands[0]][1] else operands[2]
+        return self._intern((kind,) + operands, (kind,) + operands)
+
+    def guard(self, name, then, otherwise):
+        """`then if name was answered else otherwise`"""
+        self.requested += 1
+        return self._intern(('guard', name, then, otherwise), ('guard', name, then, otherwise))
+
+    def power(self, base, n):
+        """base ** n (n >= 1) by repeated squaring"""
+        result = None
+        while n:
+            if n & 1:
+                result = base if result is None else self.add('mul', result, base)
+            n >>= 1
+            if n:
+                base = self.add('mul', base, base)
+        return result
+
+    def _intern(self, key, op):
+        position = self.index.get(key)
+        if position is None:
+            position = self.index[key] = len(self.ops)
+            self.ops.append(op)
+        return position
+
+    def operands(self, op):
+        """Op indices an op reads"""
+        if op[0] in ('const', 'arg'):
+            return ()
+        if op[0] == 'guard':
+            return op[2:]
+        return op[1:]
+
+
+class _Lowering:
+    """Turns formula ASTs into _ExpressionGraph ops"""
+
+    def __init__(self, graph, scope, optional, where):
+        self.graph = graph
+        self.scope = scope        # name -> op index
+        self.optional = optional  # inputs that need an answered() guard
+        self.where = where        # for error messages
+
+    def lower(self, node, answered=frozenset()):
+        graph = self.graph
+        if isinstance(node, ast.Expression):
+            return self.lower(node.body, answered)
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            return graph.const(node.value)
+        if isinstance(node, ast.Name):
+            if node.id not in self.scope:
+                raise ValueError(f"{self.where}: unknown name {node.id!r}")
+            if node.id in self.optional and node.id not in answered:
+                raise ValueError(f"{self.where}: optional input {node.id!r} used outside "
+                                 f"'... if answered({node.id}) else ...'")
+            return self.scope[node.id]
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            operand = self.lower(node.operand, answered)
+            return graph.add('neg', operand) if isinstance(node.op, ast.USub) else operand
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINOPS:
+            left = self.lower(node.left, answered)
+            exponent = node.right
+            if (isinstance(node.op, ast.Pow) and isinstance(exponent, ast.Constant)
+                    and type(exponent.value) is int and 1 <= exponent.value <= MAX_CHAIN_POWER):
+                return graph.power(left, exponent.value)
+            return graph.add(_BINOPS[type(node.op)], left, self.lower(node.right, answered))
+        if isinstance(node, ast.Compare) and len(node.ops) == 1 and type(node.ops[0]) in _COMPARISONS:
+            return graph.add(_COMPARISONS[type(node.ops[0])],
+                             self.lower(node.left, answered), self.lower(node.comparators[0], answered))
+        if isinstance(node, ast.IfExp):
+            name = _answered_test(node.test)
+            if name is not None:
+                if name not in self.optional:
+                    raise ValueError(f"{self.where}: answered() takes an optional input, got {name!r}")
+                return graph.guard(name, self.lower(node.body, answered | {name}),
+                                   self.lower(node.orelse, answered))
+            return graph.add('where', self.lower(node.test, answered),
+                             self.lower(node.body, answered), self.lower(node.orelse, answered))
+        raise ValueError(f"{self.where}: unsupported expression {ast.unparse(node)!r}")
+
+
+def _answered_test(test):
+    """Input name if test is answered(name), else None"""
+    if (isinstance(test, ast.Call) and isinstance(test.func, ast.Name) and test.func.id == 'answered'
+            and len(test.args) == 1 and not test.keywords and isinstance(test.args[0], ast.Name)):
+        return test.args[0].id
+    return None
+
+
+def _parse(formula, where):
+    try:
+        return ast.parse(str(formula), mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"{where}: {e.msg}") from None
+
+
+def _generate(graph, function_name, arguments, roots, names, batch, defaults=None, single=False):
+    """
+    Source of one function returning the ops in `roots`. Ops named in
+    `names` or read more than once get a local; the rest are inlined
+    into the expression that reads them. With `defaults` (a dict per
+    argument group), the function takes (answers, facts) mappings and
+    looks its arguments up itself, falling back to those defaults.
+    single=True returns the one root's value rather than a tuple.
+    """
+    ops = graph.ops
+
+    # Only what the outputs need (dead nodes cost nothing)
+    live = set()
+    stack = list(roots)
+    while stack:
+        i = stack.pop()
+        if i not in live:
+            live.add(i)
+            stack.extend(graph.operands(ops[i]))
+
+    uses = dict.fromkeys(live, 0)
+    for i in live:
+        for operand in graph.operands(ops[i]):
+            uses[operand] += 1
+    for i in roots:
+        uses[i] += 1
+
+    # Anything that reads an optional input must stay inside its guard's
+    # conditional expression, where Python only evaluates it when answered
+    guarded = set()
+    for i in sorted(live):
+        op = ops[i]
+        if (op[0] == 'arg' and op[1] in arguments.optional) or (
+                op[0] != 'guard' and any(o in guarded for o in graph.operands(op))):
+            guarded.add(i)
+
+    local = {}
+    for i in sorted(live):
+        if ops[i][0] == 'arg':
+            local[i] = ops[i][1]
+        elif ops[i][0] != 'const' and i not in guarded and (i in names or uses[i] > 1):
+            local[i] = names.get(i, f"_v{i}")
+
+    def render(i, top=False):
+        if i in local and not top:
+            return local[i]
+        op = ops[i]
+        kind = op[0]
+        if kind == 'const':
+            value = op[1]
+            return repr(float(value)) if batch and type(value) is int else repr(value)
+        if kind == 'neg':
+            return f"(-{render(op[1])})"
+        if kind == 'guard':
+            return f"({render(op[2])} if {op[1]} is not None else {render(op[3])})"
+        if kind == 'where':
+            if batch:
+                return f"np.where({render(op[1])}, {render(op[2])}, {render(op[3])})"
+            return f"({render(op[2])} if {render(op[1])} else {render(op[3])})"
+        return f"({render(op[1])} {_SYMBOLS[kind]} {render(op[2])})"
+
+    if defaults is None:
+        lines = [f"def {function_name}({', '.join(arguments.names)}):"]
+    else:
+        lines = [f"def {function_name}(answers, facts):"]
+        for mapping, values in zip(('answers', 'facts'), defaults):
+            for name, value in values.items():
+                lookup = f"{mapping}.get({name!r})" if value is None else f"{mapping}.get({name!r}, {value!r})"
+                lines.append(f"    {name} = {lookup}")
+    for i in sorted(local):
+        if ops[i][0] != 'arg':
+            lines.append(f"    {local[i]} = {render(i, top=True)}")
+    if single:
+        lines.append(f"    return {render(roots[0])}")
+    else:
+        lines.append(f"    return ({', '.join(render(i) for i in roots)},)")
+    computed = sum(1 for i in live if ops[i][0] not in ('const', 'arg'))
+    return '\n'.join(lines) + '\n', computed, sum(1 for i in local if ops[i][0] != 'arg')
+
+
+class _Arguments:
+    def __init__(self, names, optional):
+        self.names = tuple(names)
+        self.optional = set(optional)
+
+
+class CompiledSpec:
+    """A model spec compiled to a straight-line scalar function and a NumPy batch function"""
+
+    def __init__(self, spec, outputs=None):
+        self.name = spec.get('name', 'model')
+        self.spec = spec
+        self.version = spec_version(spec)
+        self.inputs = tuple(spec['inputs'])
+        self.defaults = {k: v for k, v in spec['inputs'].items() if v is not None}
+        self.optional = tuple(k for k, v in spec['inputs'].items() if v is None)
+        self.facts = dict(spec['facts'])
+        self.nodes = tuple(spec['nodes'])
+        self.outputs = tuple(spec['outputs']) if outputs is None else tuple(outputs)
+
+        for name in self.inputs + tuple(self.facts) + self.nodes:
+            if not name.isidentifier() or keyword.iskeyword(name) or name.startswith('_') or name in _RESERVED:
+                raise ValueError(f"{self.name}: {name!r} can't be used as a name")
+        seen = set()
+        for name in self.inputs + tuple(self.facts) + self.nodes:
+            if name in seen:
+                raise ValueError(f"{self.name}: {name!r} is defined twice")
+            seen.add(name)
+
+        # Whole model as one graph: node references are inlined, so
+        # shared subexpressions are found across formulas
+        graph = _ExpressionGraph()
+        scope = {name: graph.arg(name) for name in self.inputs + tuple(self.facts)}
+        node_names = {}
+        for node, formula in spec['nodes'].items():
+            where = f"{self.name}: node {node!r}"
+            scope[node] = _Lowering(graph, scope, set(self.optional), where).lower(_parse(formula, where))
+            node_names.setdefault(scope[node], node)
+        roots = []
+        for key in self.outputs:
+            node = spec['outputs'].get(key)
+            if node is None:
+                raise ValueError(f"{self.name}: no output {key!r}")
+            if node not in scope:
+                raise ValueError(f"{self.name}: output {key!r} names unknown node {node!r}")
+            roots.append(scope[node])
+
+        arguments = _Arguments(self.inputs + tuple(self.facts), self.optional)
+        self.scalar_source, computed, stored = _generate(graph, 'scalar', arguments, roots, node_names, False)
+        self.batch_source, _, _ = _generate(graph, 'batch', arguments, roots, node_names, True)
+        self.stats = {
+            'operations_written': graph.requested,
+            'operations_compiled': computed,
+            'stored_values': stored,
+        }
+        self.scalar = _compile(self.scalar_source, 'scalar', self.name, {})
+        # The same body, reading its arguments straight from two mappings
+        source, _, _ = _generate(graph, 'from_mappings', arguments, roots, node_names, False,
+                                 (spec['inputs'], self.facts))
+        self.from_mappings = _compile(source, 'from_mappings', self.name, {})
+        self._batch = None
+        self._graph_nodes = None
+
+    @property
+    def batch(self):
+        """The NumPy batch function (compiled on first use)"""
+        if self._batch is None:
+            import numpy as np
+            self._batch = _compile(self.batch_source, 'batch', self.name, {'np': np})
+        return self._batch
+
+    def arguments(self, answers, facts=None):
+        """Positional arguments for scalar/batch: answers over defaults, then facts"""
+        facts = facts or {}
+        args = [answers.get(name, self.defaults.get(name)) for name in self.inputs]
+        args += [facts.get(name, value) for name, value in self.facts.items()]
+        return args
+
+    def evaluate(self, answers=None, facts=None):
+        """Every output for one set of answers (unanswered inputs take their defaults)"""
+        return dict(zip(self.outputs, self.from_mappings(answers or {}, facts or {})))
+
+    def evaluate_batch(self, columns, facts=None):
+        """
+        Every output as arrays. `columns` maps inputs to arrays or scalars
+        that broadcast together; missing inputs take their defaults.
+        """
+        import numpy as np
+
+        args = [None if value is None else np.asarray(value, dtype=np.float64)
+                for value in self.arguments(columns, facts)]
+        return dict(zip(self.outputs, np.broadcast_arrays(*self.batch(*args))))
+
+    def graph_nodes(self):
+        """
+        {node: (function, inputs)} for valuation_graph.ValuationGraph, one
+        small compiled function per node so changes recompute incrementally
+        """
+        if self._graph_nodes is None:
+            nodes = {}
+            known = self.inputs + tuple(self.facts)
+            for node, formula in self.spec['nodes'].items():
+                where = f"{self.name}: node {node!r}"
+                tree = _parse(formula, where)
+                deps = tuple(dict.fromkeys(n.id for n in ast.walk(tree)
+                                           if isinstance(n, ast.Name) and n.id in known + tuple(nodes)))
+                graph = _ExpressionGraph()
+                scope = {name: graph.arg(name) for name in deps}
+                root = _Lowering(graph, scope, set(self.optional), where).lower(tree)
+                source, _, _ = _generate(graph, node, _Arguments(deps, self.optional), [root], {}, False,
+                                         single=True)
+                nodes[node] = (_compile(source, node, self.name, {}), deps)
+            self._graph_nodes = nodes
+        return self._graph_nodes
+
+
+def _compile(source, function_name, spec_name, namespace):
+    exec(compile(source, f"<spec {spec_name}: {function_name}>", 'exec'), namespace)
+    return namespace[function_name]
+
+
+def compile_spec(spec, outputs=None):
+    """
+    Compile a loaded spec (see load_spec), returning `outputs` (default:
+    all, in spec order) in that order. Raises ValueError on a bad formula.
+    """
+    return CompiledSpec(spec, outputs)
+
+
+def main(argv):
+    """CLI: valuation_spec.py SPEC [--source] [--check N]"""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(prog='valuation_spec.py')
+    parser.add_argument('spec', help='model spec (JSON)')
+    parser.add_argument('--source', action='store_true', help='print the generated functions')
+    parser.add_argument('--check', type=int, metavar='N',
+                        help='compare with the built-in CEO-interview model on N random scenarios')
+    args = parser.parse_args(argv)
+
+    spec = compile_spec(load_spec(args.spec))
+    print("\n" + "="*70)
+    print(f"MODEL SPEC: {spec.name} ({spec.version})")
+    print("="*70)
+    print(f"\n{len(spec.inputs)} inputs ({len(spec.optional)} optional), {len(spec.facts)} facts, "
+          f"{len(spec.nodes)} formulas, {len(spec.outputs)} outputs")
+    print(f"{spec.stats['operations_written']} operations as written -> "
+          f"{spec.stats['operations_compiled']} after sharing and folding "
+          f"({spec.stats['stored_values']} stored values)")
+
+    if args.source:
+        print("\n" + spec.scalar_source)
+        print(spec.batch_source)
+
+    if args.check:
+        import numpy as np
+        from uber_valuation_v2_ceo_mode import UberCEOInterview
+
+        builtin, compiled = UberCEOInterview(), UberCEOInterview()
+        builtin.cache = compiled.cache = None
+        builtin.spec, compiled.spec = None, spec   # builtin ignores VALUATION_SPEC
+        rng = np.random.default_rng(0)
+        n = args.check
+        columns = {qid: rng.uniform(0.2, 2.5, n) * value for qid, value in spec.defaults.items()}
+        columns['revenue_last_week'] = rng.uniform(500, 900, n)
+
+        mismatches = 0
+        for i in range(n):
+            answers = {qid: float(values[i]) for qid, values in columns.items() if rng.random() < 0.6}
+            builtin.answers = compiled.answers = answers
+            if builtin.calculate_fair_value() != compiled.calculate_fair_value():
+                mismatches += 1
+        builtin.answers = compiled.answers = {}
+        a = builtin.calculate_fair_value_batch(columns)['fair_value_per_share']
+        b = compiled.calculate_fair_value_batch(columns)['fair_value_per_share']
+        mismatches += int(np.count_nonzero(a != b))
+
+        def per_call(fn, repeat, rounds=5):
+            best = float('inf')
+            for _ in range(rounds):
+                started = time.perf_counter()
+                for _ in range(repeat):
+                    fn()
+                best = min(best, (time.perf_counter() - started) / repeat)
+            return best
+
+        builtin.answers = compiled.answers = {qid: float(values[0]) for qid, values in columns.items()}
+        print(f"\n{'':<28}{'built-in':>14}{'spec':>14}")
+        scalar = [per_call(m.calculate_fair_value, 20_000) * 1e6 for m in (builtin, compiled)]
+        print(f"{'calculate_fair_value':<28}{scalar[0]:>12.2f}µs{scalar[1]:>12.2f}µs")
+        batch = [per_call(lambda: m.calculate_fair_value_batch(columns), 5) / n * 1e9 for m in (builtin, compiled)]
+        print(f"{'batch, per scenario':<28}{batch[0]:>12.2f}ns{batch[1]:>12.2f}ns")
+        if mismatches:
+            print(f"\n⚠️  {mismatches} results differ from the built-in model\n")
+            return 1
+        print(f"\n✓ {n:,} scenarios (scalar and batch) match the built-in model exactly\n")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Valuation Oracle - Live Mispricing Signals
+
+Watches a stream of market prices and says, tick by tick, how far the
+stock trades from YOUR fair value and what show_valuation would tell you
+to do (buy / hold / trim).
+
+The fair value is computed once and only recomputed when an answer
+changes; a price tick is a subtraction and a comparison. (In V2 the
+price also sets the buyback share count, so a tick re-evaluates just
+that and the per-share value, through the incremental graph.) The queue of
+ticks waiting to be processed is bounded: if signals fall behind the
+feed, the oldest prices are dropped, so latency stays bounded.
+
+Feeds (one price per line, optionally "timestamp,price"; headers, blank
+and malformed lines are skipped):
+    --file PATH           follow a file as it grows (like tail -f)
+    --connect HOST:PORT   read lines from a TCP socket
+    --simulate N          N ticks from a local random-walk publisher
+
+    python3 uber_valuation_v2_ceo_mode.py stream --simulate 100000
+    python3 uber_valuation_v2_ceo_mode.py publish --port 9009 &
+    python3 uber_valuation_v2_ceo_mode.py stream --connect localhost:9009
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import random
+import time
+from collections import deque
+
+from uber_valuation_v2_ceo_mode import valuation_action
+
+
+def _parse_tick(line):
+    """(timestamp, price), or None for a header, blank or malformed line"""
+    parts = line.strip().split(',')
+    try:
+        if len(parts) == 1:
+            tick = time.time(), float(parts[0])
+        else:
+            tick = float(parts[0]), float(parts[1])
+    except ValueError:
+        return None
+    if not (math.isfinite(tick[1]) and tick[1] > 0):
+        return None
+    return tick
+
+
+# === FEEDS (async iterators of (timestamp, price)) ===
+
+async def tail_file(path, poll_interval=0.05, from_start=True):
+    """Follow a price file as lines are appended"""
+    with open(path, 'r') as f:
+        if not from_start:
+            f.seek(0, os.SEEK_END)
+        partial = ''
+        while True:
+            line = f.readline()
+            if not line:
+                await asyncio.sleep(poll_interval)
+                continue
+            partial += line
+            if not partial.endswith('\n'):
+                continue
+            tick = _parse_tick(partial)
+            partial = ''
+            if tick is not None:
+                yield tick
+
+
+async def read_socket(host, port):
+    """Price lines from a TCP publisher, until it disconnects"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            tick = _parse_tick(line.decode())
+            if tick is not None:
+                yield tick
+    finally:
+        writer.close()
+
+
+async def simulated_feed(start_price=75.0, ticks=10_000, rate=None, volatility=0.0005, seed=None):
+    """
+    Local stand-in publisher: a random walk. `rate` is ticks/second
+    (None = as fast as the consumer takes them).
+    """
+    rng = random.Random(seed)
+    price = start_price
+    batch = 100
+    started = time.perf_counter()
+    for i in range(ticks):
+        price *= 1 + rng.gauss(0, volatility)
+        yield time.time(), price
+        if i % batch == batch - 1:
+            if rate:
+                # Pace in batches so sleep granularity doesn't cap throughput
+                delay = started + (i + 1) / rate - time.perf_counter()
+                await asyncio.sleep(max(delay, 0))
+            else:
+                await asyncio.sleep(0)
+
+
+async def publish_feed(host='127.0.0.1', port=9009, **feed_options):
+    """Serve a simulated feed to every client that connects"""
+
+    async def handle(reader, writer):
+        try:
+            async for ts, price in simulated_feed(**feed_options):
+                writer.write(f"{ts:.6f},{price:.4f}\n".encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+# === MONITOR ===
+
+class MispricingMonitor:
+    """Cached fair value compared against every incoming price"""
+
+    def __init__(self, model, band=10):
+        self.model = model
+        self.band = band
+        self.fair_value = None
+        # V2: fair value depends on the market price (buybacks), kept
+        # current per tick through the incremental graph
+        self._graph = None
+        self.refresh()
+
+    def refresh(self):
+        """Recompute fair value (call after answers change)"""
+        self.fair_value = self.model.calculate_fair_value()['fair_value_per_share']
+        if hasattr(self.model, 'update_answer'):
+            from valuation_graph import ValuationGraph
+
+            self._graph = ValuationGraph.from_interview(self.model)
+        return self.fair_value
+
+    def _reprice(self, price):
+        """Move the V2 model to a new market price and re-evaluate what it touches"""
+        self.model.market_price = price
+        if self._graph.set_input('market_price', price):
+            node = self._graph.outputs['fair_value_per_share']
+            self.fair_value = round(self._graph.value(node), 2)
+
+    def update_answer(self, question_id, value):
+        """Change one answer on the underlying model and refresh"""
+        if hasattr(self.model, 'update_answer'):
+            self.model.update_answer(question_id, value)
+        else:
+            self.model.update_estimate(question_id, value)
+        return self.refresh()
+
+    def signal(self, timestamp, price):
+        """Gap and action for one tick, like show_valuation"""
+        if self._graph is not None and price != self.model.market_price:
+            self._reprice(price)
+        gap = self.fair_value - price
+        return {
+            'timestamp': timestamp,
+            'price': price,
+            'fair_value': self.fair_value,
+            'gap': gap,
+            'gap_pct': gap / price * 100,
+            'action': valuation_action(self.fair_value, price, self.band),
+        }
+
+
+def _percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+async def run_stream(monitor, feed, on_signal, emit='changes', backlog=1000):
+    """
+    Consume a feed, emitting signals through on_signal(signal).
+
+    emit='changes' only emits when the action flips; 'all' emits every
+    processed tick. At most `backlog` ticks wait to be processed; beyond
+    that the oldest are dropped. Returns throughput and latency stats.
+    """
+    pending = deque(maxlen=backlog)
+    arrived = asyncio.Event()
+    done = False
+    stats = {'ticks': 0, 'processed': 0, 'dropped': 0, 'signals': 0}
+    latencies = []
+
+    async def produce():
+        nonlocal done
+        try:
+            async for ts, price in feed:
+                stats['ticks'] += 1
+                if len(pending) == backlog:
+                    stats['dropped'] += 1  # the oldest waiting tick falls off
+                pending.append((ts, price, time.perf_counter()))
+                arrived.set()
+        finally:
+            done = True
+            arrived.set()
+
+    producer = asyncio.ensure_future(produce())
+    last_action = None
+    started = time.perf_counter()
+
+    try:
+        while pending or not done:
+            await arrived.wait()
+            arrived.clear()
+            while pending:
+                ts, price, received = pending.popleft()
+                signal = monitor.signal(ts, price)
+                stats['processed'] += 1
+                if emit == 'all' or signal['action'] != last_action:
+                    last_action = signal['action']
+                    on_signal(signal)
+                    stats['signals'] += 1
+                latencies.append(time.perf_counter() - received)
+        await producer  # surfaces feed errors
+    finally:
+        producer.cancel()
+
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    stats.update({
+        'seconds': round(elapsed, 3),
+        'ticks_per_second': round(stats['ticks'] / elapsed) if elapsed else 0,
+        'latency_p50_us': round(_percentile(latencies, 50) * 1e6, 1),
+        'latency_p99_us': round(_percentile(latencies, 99) * 1e6, 1),
+        'latency_max_us': round(latencies[-1] * 1e6, 1) if latencies else 0.0,
+    })
+    return stats
+
+
+def _print_signal(signal):
+    marker = {'buy': '📈', 'trim': '📉', 'hold': '🎯'}[signal['action']]
+    print(f"{marker} {time.strftime('%H:%M:%S', time.localtime(signal['timestamp']))} "
+          f"price ${signal['price']:.2f}  fair ${signal['fair_value']:.2f}  "
+          f"gap ${signal['gap']:+.2f} ({signal['gap_pct']:+.1f}%)  → {signal['action'].upper()}")
+
+
+def main(argv, model_key):
+    """CLI: stream (--file PATH | --connect HOST:PORT | --simulate N) / publish"""
+    from valuation_sweep import load_model, MODELS
+
+    script = MODELS[model_key][0] + '.py'
+    if argv and argv[0] == 'publish':
+        parser = argparse.ArgumentParser(prog=f"{script} publish")
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=9009)
+        parser.add_argument('--ticks', type=int, default=1_000_000)
+        parser.add_argument('--rate', type=float, default=1000)
+        args = parser.parse_args(argv[1:])
+        print(f"📡 Publishing {args.ticks:,} simulated ticks per client on {args.host}:{args.port}")
+        try:
+            asyncio.run(publish_feed(args.host, args.port, ticks=args.ticks, rate=args.rate))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    parser = argparse.ArgumentParser(prog=f"{script} stream")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--file', help='follow a price file')
+    source.add_argument('--connect', help='HOST:PORT of a price publisher')
+    source.add_argument('--simulate', type=int, help='number of simulated ticks')
+    parser.add_argument('--rate', type=float, default=None, help='simulated ticks/second')
+    parser.add_argument('--band', type=float, default=10, help='$/share gap before buy/trim')
+    parser.add_argument('--all', action='store_true', help='print every tick, not just action changes')
+    args = parser.parse_args(argv[1:])
+
+    model = load_model(model_key)
+    model.load_state()
+    monitor = MispricingMonitor(model, band=args.band)
+
+    if args.file:
+        feed = tail_file(args.file)
+    elif args.connect:
+        host, port = args.connect.rsplit(':', 1)
+        feed = read_socket(host, int(port))
+    else:
+        feed = simulated_feed(start_price=getattr(model, 'market_price', 75), ticks=args.simulate, rate=args.rate)
+
+    print(f"\n💰 Your fair value: ${monitor.fair_value}/share — watching prices...\n")
+    try:
+        stats = asyncio.run(run_stream(monitor, feed, _print_signal, emit='all' if args.all else 'changes'))
+    except KeyboardInterrupt:
+        return 0
+
+    print("\n" + "="*70)
+    print(f"{stats['ticks']:,} ticks in {stats['seconds']}s ({stats['ticks_per_second']:,}/s), "
+          f"{stats['signals']:,} signals, {stats['dropped']:,} stale ticks dropped")
+    print(f"Latency p50 {stats['latency_p50_us']}µs, p99 {stats['latency_p99_us']}µs, "
+          f"max {stats['latency_max_us']}µs")
+    print("="*70 + "\n")
+    return 0
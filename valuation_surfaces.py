@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Valuation Oracle - Precomputed Fair-Value Surfaces
+
+Answer "what if X were Y?" by table lookup instead of re-running the
+model. A surface is a K-dimensional grid of fair values over the K
+highest-impact inputs (impact_per_point in V1, impact_weight in V2),
+with every other input held at your current answers. It is built once,
+saved as a .npy (memory-mapped on load) plus a .json of metadata, and
+looked up with multilinear interpolation.
+
+A surface is only used while it still describes the model:
+  - model_version: hash of the model's formula source and defaults
+    (and the spec's version, when V2 values through a model spec)
+  - facts and the fixed (non-axis) inputs it was built with
+If any of these differ, load() returns None and callers fall back to
+the exact model.
+
+Error bound: for multilinear interpolation on a grid with spacing h_i,
+    |f - interp| <= sum_i (h_i^2 / 8) * max |d^2 f / dx_i^2|
+The build estimates the right-hand side from second differences of the
+table ('error_bound', $/share) and also records the largest error seen
+on random points checked against the exact model ('max_sampled_error').
+Step-function inputs (V2's rider growth -> multiple) are never used as
+axes, since interpolating across the step has no useful bound.
+"""
+
+import hashlib
+import importlib
+import inspect
+import json
+import time
+
+from valuation_sweep import MODELS, batch_fair_values, load_model
+
+# Inputs whose effect on fair value is a step, not a smooth curve
+STEP_INPUTS = {'monthly_active_riders_growth'}
+
+# Functions and constants that define each model's arithmetic
+_MODEL_CODE = {
+    'v1': (['project_fair_value'], []),
+    'v2': (['quarterly_revenue_from_week', 'growth_multiple', 'growth_multiple_batch', 'annualize_revenue',
+            'apply_margin', 'annual_sbc', 'regulatory_drag', 'advertising_ebitda',
+            'combine_true_ebitda', 'apply_multiple', 'net_of_debt',
+            'buyback_adjusted_shares', 'per_share_value', 'project_fair_value'],
+           ['MODEL_DEFAULTS']),
+}
+
+_FACTS = {
+    'v1': ('current_revenue', 'net_debt', 'shares_outstanding'),
+    'v2': ('last_quarter_revenue', 'shares_outstanding', 'net_debt', 'market_price'),
+}
+
+
+def model_version(model_key, model=None):
+    """Fingerprint of the model's formulas (and loaded spec); changes whenever they do"""
+    module = importlib.import_module(MODELS[model_key][0])
+    functions, constants = _MODEL_CODE[model_key]
+    digest = hashlib.sha256()
+    for name in functions:
+        digest.update(inspect.getsource(getattr(module, name)).encode())
+    for name in constants:
+        digest.update(repr(getattr(module, name)).encode())
+    spec = getattr(model, 'spec', None)
+    if spec is not None:
+        digest.update(spec.version.encode())
+    return digest.hexdigest()[:16]
+
+
+def input_names(model_key, model):
+    """Inputs the model's formulas read (the spec's, when one is loaded)"""
+    spec = getattr(model, 'spec', None)
+    if spec is not None:
+        return spec.inputs
+    return importlib.import_module(MODELS[model_key][0]).MODEL_INPUTS
+
+
+def ranked_inputs(model_key, model):
+    """Smooth model inputs, highest impact first"""
+    inputs = input_names(model_key, model)
+    eligible = [q for q in model.questions
+                if q['id'] in inputs and q['id'] not in STEP_INPUTS]
+    if model_key == 'v1':
+        eligible.sort(key=lambda q: abs(q['impact_per_point']), reverse=True)
+    else:
+        eligible.sort(key=lambda q: q['impact_weight'], reverse=True)
+    return [q['id'] for q in eligible]
+
+
+def current_input(model_key, model, question_id):
+    """The value the model is using for an input right now"""
+    if model_key == 'v1':
+        return model.get_estimate(question_id)
+    return model.model_input(question_id)
+
+
+def _state(model_key, model, axes_names):
+    facts = {name: float(getattr(model, name)) for name in _FACTS[model_key]}
+    fixed = {qid: float(current_input(model_key, model, qid))
+             for qid in input_names(model_key, model) if qid not in axes_names}
+    if model_key == 'v2' and 'revenue_last_week' not in axes_names:
+        # An unanswered revenue_last_week means "use last quarter" exactly
+        fixed['revenue_last_week_answered'] = float('revenue_last_week' in model.answers)
+    return facts, fixed
+
+
+class FairValueSurface:
+    """A memory-mapped fair-value table with multilinear lookup"""
+
+    def __init__(self, path):
+        import numpy as np
+
+        with open(path + '.json', 'r') as f:
+            self.meta = json.load(f)
+        self.path = path
+        self.table = np.load(path + '.npy', mmap_mode='r')
+        self.names = [axis['id'] for axis in self.meta['axes']]
+        self.starts = [axis['start'] for axis in self.meta['axes']]
+        self.steps = [(axis['stop'] - axis['start']) / (axis['num'] - 1) for axis in self.meta['axes']]
+        self.sizes = [axis['num'] for axis in self.meta['axes']]
+
+    @classmethod
+    def load(cls, path, model_key, model):
+        """The surface at path if it still matches the model, else None"""
+        try:
+            surface = cls(path)
+        except FileNotFoundError:
+            return None
+        return surface if surface.stale_reason(model_key, model) is None else None
+
+    def stale_reason(self, model_key, model):
+        """Why this surface can't be used for the model as it stands (None if it can)"""
+        if self.meta['model'] != model_key:
+            return f"built for {self.meta['model']}"
+        if self.meta['model_version'] != model_version(model_key, model):
+            return "model formulas changed"
+        facts, fixed = _state(model_key, model, self.names)
+        if facts != self.meta['facts']:
+            return "company facts changed"
+        if fixed != self.meta['fixed_inputs']:
+            return "answers outside the surface changed"
+        return None
+
+    def lookup(self, point):
+        """Interpolated fair value at one point (values in axis order), or None if outside"""
+        lows, fracs = [], []
+        for x, start, step, size in zip(point, self.starts, self.steps, self.sizes):
+            t = (x - start) / step
+            if t < 0 or t > size - 1:
+                return None
+            i = min(int(t), size - 2)
+            lows.append(i)
+            fracs.append(t - i)
+
+        # 2^K corner values, then collapse one axis at a time
+        corners = self.table[tuple(slice(i, i + 2) for i in lows)].tolist()
+        for frac in reversed(fracs):
+            corners = _collapse(corners, frac)
+        return corners
+
+    def lookup_many(self, points):
+        """Vectorized lookup for an (n, K) array; NaN where outside the table"""
+        import numpy as np
+
+        points = np.asarray(points, dtype=np.float64)
+        n, k = points.shape
+        t = (points - np.array(self.starts)) / np.array(self.steps)
+        sizes = np.array(self.sizes)
+        outside = ((t < 0) | (t > sizes - 1)).any(axis=1)
+        lows = np.clip(np.floor(t).astype(np.int64), 0, sizes - 2)
+        fracs = t - lows
+
+        # Flat offsets of the 2^K corners from each point's low corner
+        strides = np.array(self.table.strides) // self.table.itemsize
+        flat = self.table.reshape(-1)
+        base = lows @ strides
+        result = np.zeros(n)
+        for corner in range(2 ** k):
+            offsets = [(corner >> (k - 1 - d)) & 1 for d in range(k)]
+            weight = np.ones(n)
+            for d, upper in enumerate(offsets):
+                weight *= fracs[:, d] if upper else 1 - fracs[:, d]
+            result += weight * flat[base + int(np.dot(offsets, strides))]
+        result[outside] = np.nan
+        return result
+
+    def what_if(self, model_key, model, changes):
+        """
+        Fair value if the given {question id: value} changes were made to the
+        model's current answers. None if a change is off the surface.
+        """
+        if any(qid not in self.names for qid in changes):
+            return None
+        point = [changes.get(name, current_input(model_key, model, name)) for name in self.names]
+        return self.lookup(point)
+
+
+def _collapse(corners, frac):
+    """Interpolate away the last axis of a nested-list block of corners"""
+    if isinstance(corners[0], list):
+        return [_collapse(c, frac) for c in corners]
+    return corners[0] + (corners[1] - corners[0]) * frac
+
+
+def build_surface(model_key, model, path, dims=4, points=33, span=0.5, samples=20_000, seed=0):
+    """
+    Tabulate fair value over the top `dims` inputs, each on `points`
+    values spanning ±span around its current value. Writes path.npy and
+    path.json and returns the loaded surface.
+    """
+    import numpy as np
+
+    started = time.perf_counter()
+    names = ranked_inputs(model_key, model)[:dims]
+    axes = []
+    for name in names:
+        center = float(current_input(model_key, model, name))
+        half = span * abs(center) or 1.0
+        axes.append({'id': name, 'start': center - half, 'stop': center + half, 'num': points})
+    grids = [np.linspace(a['start'], a['stop'], a['num']) for a in axes]
+
+    mesh = np.meshgrid(*grids, indexing='ij')
+    columns = {name: m.ravel() for name, m in zip(names, mesh)}
+    table = batch_fair_values(model_key, model, columns, mesh[0].size).reshape(mesh[0].shape)
+    np.save(path + '.npy', table)
+
+    # sum_i h_i^2/8 * max|f_ii|, with h_i^2 * f_ii estimated by second differences
+    error_bound = sum(float(np.abs(np.diff(table, 2, axis=i)).max()) / 8
+                      for i in range(len(names)) if table.shape[i] > 2)
+
+    facts, fixed = _state(model_key, model, names)
+    meta = {
+        'model': model_key,
+        'model_version': model_version(model_key, model),
+        'built_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'axes': axes,
+        'facts': facts,
+        'fixed_inputs': fixed,
+        'error_bound': error_bound,
+        'max_sampled_error': None,
+        'build_seconds': None,
+    }
+    with open(path + '.json', 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    # Check against the exact model at random points inside the table
+    surface = FairValueSurface(path)
+    rng = np.random.default_rng(seed)
+    sample = np.column_stack([rng.uniform(a['start'], a['stop'], samples) for a in axes])
+    exact = batch_fair_values(model_key, model, dict(zip(names, sample.T)), samples)
+    meta['max_sampled_error'] = float(np.abs(surface.lookup_many(sample) - exact).max())
+    meta['build_seconds'] = round(time.perf_counter() - started, 3)
+    with open(path + '.json', 'w') as f:
+        json.dump(meta, f, indent=2)
+    surface.meta = meta
+    return surface
+
+
+def main(argv, model_key):
+    """CLI: surface [--dims K] [--points N] | whatif QUESTION=VALUE [...]"""
+    import argparse
+
+    script = MODELS[model_key][0] + '.py'
+    path = {'v1': 'uber_estimates.surface', 'v2': 'uber_ceo_interview.surface'}[model_key]
+    model = load_model(model_key)
+    model.load_state()
+
+    if argv[0] == 'surface':
+        parser = argparse.ArgumentParser(prog=f"{script} surface")
+        parser.add_argument('--dims', type=int, default=4, help='number of inputs tabulated')
+        parser.add_argument('--points', type=int, default=33, help='grid points per input')
+        parser.add_argument('--span', type=float, default=0.5, help='±fraction around current values')
+        args = parser.parse_args(argv[1:])
+
+        surface = build_surface(model_key, model, path, dims=args.dims, points=args.points, span=args.span)
+        meta = surface.meta
+        print("\n" + "="*70)
+        print(f"SURFACE BUILT in {meta['build_seconds']}s → {path}.npy")
+        print("="*70)
+        for axis in meta['axes']:
+            print(f"   {axis['id']}: {axis['start']:.4g} … {axis['stop']:.4g} ({axis['num']} points)")
+        print(f"\nInterpolation error bound: ±${meta['error_bound']:.4f}/share")
+        print(f"Largest error on {20_000:,} random checks: ${meta['max_sampled_error']:.4f}/share\n")
+        return 0
+
+    inputs = input_names(model_key, model)
+    changes = {}
+    for arg in argv[1:]:
+        qid, sep, value = arg.partition('=')
+        try:
+            if not sep:
+                raise ValueError
+            changes[qid] = float(value)
+        except ValueError:
+            print(f"\n❌ Expected QUESTION=VALUE, got {arg!r}")
+            return 1
+    if not changes:
+        print(f"Usage: python3 {script} whatif QUESTION=VALUE [...]")
+        return 1
+    unknown = [qid for qid in changes if qid not in inputs]
+    if unknown:
+        print(f"\n❌ Not model inputs: {', '.join(unknown)}")
+        print(f"   Choose from: {', '.join(inputs)}")
+        return 1
+
+    surface = FairValueSurface.load(path, model_key, model)
+    started = time.perf_counter()
+    value = surface.what_if(model_key, model, changes) if surface is not None else None
+    source = 'surface lookup'
+    if value is None:
+        estimates = getattr(model, 'user_estimates' if model_key == 'v1' else 'answers')
+        estimates.update(changes)
+        value = model.calculate_fair_value()['fair_value_per_share']
+        source = 'exact model'
+    elapsed = time.perf_counter() - started
+
+    print(f"\n💭 What if {', '.join(f'{k} = {v:g}' for k, v in changes.items())}?")
+    print(f"💰 Fair value: ${value:.2f}/share  ({source}, {elapsed * 1e6:.0f}µs)\n")
+    return 0
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Valuation Oracle - Scenario Sweep
+
+Value every combination of a grid of answers across all cores.
+
+Grid spec (JSON), keyed by question id:
+    {
+      "ebitda_margin_2027": {"start": 10, "stop": 20, "num": 101},
+      "ebitda_multiple": [12, 15, 18, 20]
+    }
+
+Questions not in the grid keep your saved answer (or the default).
+Workers get the grid axes once, then only (start, stop) offsets into
+the flattened cartesian product, and send back a float64 array of fair
+values. Results stream into a .npy file as chunks finish, so the grid
+never has to fit in memory. Point i of the output is grid index
+numpy.unravel_index(i, shape) with axes in the order listed in the
+sidecar <out>.json.
+"""
+
+import argparse
+import json
+import os
+import time
+
+MODELS = {
+    'v1': ('uber_valuation_v1', 'UberValuation'),
+    'v2': ('uber_valuation_v2_ceo_mode', 'UberCEOInterview'),
+}
+
+# Per-process state, set once by _init_worker
+_worker = {}
+
+
+def load_model(model_key):
+    """Import and build a fresh model by key ('v1' or 'v2')"""
+    import importlib
+
+    module_name, class_name = MODELS[model_key]
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+def _estimates_attr(model_key):
+    return 'user_estimates' if model_key == 'v1' else 'answers'
+
+
+def parse_grid(spec):
+    """Turn a grid spec into ([names], [numpy axes])"""
+    import numpy as np
+
+    names, axes = [], []
+    for name, axis in spec.items():
+        if isinstance(axis, dict):
+            values = np.linspace(axis['start'], axis['stop'], int(axis['num']))
+        else:
+            values = np.asarray(axis, dtype=np.float64)
+        if values.ndim != 1 or values.size == 0:
+            raise ValueError(f"Grid axis for {name!r} must be a non-empty list or range")
+        names.append(name)
+        axes.append(values.astype(np.float64))
+    return names, axes
+
+
+def _init_worker(model_key, estimates, names, axes):
+    model = load_model(model_key)
+    setattr(model, _estimates_attr(model_key), dict(estimates))
+    _worker.update(model_key=model_key, model=model, names=names, axes=axes,
+                   shape=tuple(len(a) for a in axes))
+
+
+def batch_fair_values(model_key, model, columns, n):
+    """
+    Fair value for n scenarios given {question id: column array}; other
+    inputs come from the model's current answers
+    """
+    import numpy as np
+
+    if model_key == 'v1':
+        params = list(model.consensus)
+        scenarios = np.empty((n, len(params)))
+        scenarios[:] = model.assumption_vector()
+        for name, values in columns.items():
+            scenarios[:, params.index(name)] = values
+        fair_values = model.calculate_fair_value_batch(scenarios)['fair_value_per_share']
+    else:
+        fair_values = model.calculate_fair_value_batch(columns)['fair_value_per_share']
+
+    return np.broadcast_to(fair_values, (n,)).astype(np.float64)
+
+
+def evaluate_chunk(bounds):
+    """Fair values for flat grid points [start, stop) (runs in a worker)"""
+    import numpy as np
+
+    start, stop = bounds
+    names, axes = _worker['names'], _worker['axes']
+    index = np.unravel_index(np.arange(start, stop), _worker['shape'])
+    columns = {name: axis[i] for name, axis, i in zip(names, axes, index)}
+
+    return start, batch_fair_values(_worker['model_key'], _worker['model'], columns, stop - start)
+
+
+def run_sweep(model_key, estimates, spec, out_path, workers=None, chunk_size=1_000_000):
+    """
+    Evaluate the full grid, streaming fair values to out_path (.npy).
+
+    Returns a summary dict (points, seconds, min/max fair value and the
+    answers that produced them).
+    """
+    import numpy as np
+    from multiprocessing import Pool
+
+    names, axes = parse_grid(spec)
+    shape = tuple(len(a) for a in axes)
+    total = int(np.prod(shape, dtype=np.int64))
+    workers = workers or os.cpu_count() or 1
+
+    with open(out_path + '.json', 'w') as f:
+        json.dump({
+            'model': model_key,
+            'shape': list(shape),
+            'axes': {name: axis.tolist() for name, axis in zip(names, axes)},
+            'fixed_estimates': estimates,
+        }, f, indent=2)
+
+    out = np.lib.format.open_memmap(out_path, mode='w+', dtype=np.float64, shape=(total,))
+    chunks = [(start, min(start + chunk_size, total)) for start in range(0, total, chunk_size)]
+    best = (np.inf, -1)
+    worst = (-np.inf, -1)
+    started = time.perf_counter()
+
+    def collect(results):
+        nonlocal best, worst
+        for start, fair_values in results:
+            out[start:start + fair_values.size] = fair_values
+            lo, hi = int(fair_values.argmin()), int(fair_values.argmax())
+            if fair_values[lo] < best[0]:
+                best = (float(fair_values[lo]), start + lo)
+            if fair_values[hi] > worst[0]:
+                worst = (float(fair_values[hi]), start + hi)
+
+    init_args = (model_key, estimates, names, axes)
+    if workers == 1:
+        _init_worker(*init_args)
+        collect(evaluate_chunk(c) for c in chunks)
+    else:
+        with Pool(workers, initializer=_init_worker, initargs=init_args) as pool:
+            collect(pool.imap_unordered(evaluate_chunk, chunks))
+
+    out.flush()
+    del out
+    elapsed = time.perf_counter() - started
+
+    def point(flat_index):
+        index = np.unravel_index(flat_index, shape)
+        return {name: float(axis[i]) for name, axis, i in zip(names, axes, index)}
+
+    return {
+        'points': total,
+        'seconds': round(elapsed, 3),
+        'min_fair_value': round(best[0], 2),
+        'min_at': point(best[1]),
+        'max_fair_value': round(worst[0], 2),
+        'max_at': point(worst[1]),
+    }
+
+
+def main(argv, model_key):
+    """CLI: sweep <grid.json> <out.npy> [--workers N] [--chunk N]"""
+    parser = argparse.ArgumentParser(prog=f"{MODELS[model_key][0]}.py sweep")
+    parser.add_argument('grid', help='grid spec JSON (question id -> values or range)')
+    parser.add_argument('out', help='output .npy file (fair value per grid point)')
+    parser.add_argument('--workers', type=int, default=None, help='processes (default: all cores)')
+    parser.add_argument('--chunk', type=int, default=1_000_000, help='grid points per task')
+    args = parser.parse_args(argv)
+
+    with open(args.grid, 'r') as f:
+        spec = json.load(f)
+
+    model = load_model(model_key)
+    model.load_state()
+    question_ids = {q['id'] for q in model.questions}
+    unknown = [name for name in spec if name not in question_ids]
+    if unknown:
+        print(f"\n❌ Unknown question ids: {', '.join(unknown)}")
+        return 1
+
+    estimates = getattr(model, _estimates_attr(model_key))
+    result = run_sweep(model_key, estimates, spec, args.out,
+                       workers=args.workers, chunk_size=args.chunk)
+
+    print("\n" + "="*70)
+    print(f"SWEEP: {result['points']:,} scenarios in {result['seconds']}s")
+    print("="*70)
+    print(f"\n📉 Lowest fair value:  ${result['min_fair_value']}/share at {result['min_at']}")
+    print(f"📈 Highest fair value: ${result['max_fair_value']}/share at {result['max_at']}")
+    print(f"\n✓ Results: {args.out} (grid layout in {args.out}.json)\n")
+    return 0